@@ -1,9 +1,23 @@
-from django.http import JsonResponse
+from django.http import HttpResponse, JsonResponse
 from django.shortcuts import redirect, render
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
+from django.views.decorators.http import require_POST
 from .forms import FormEditarUsuario
 from .models import Ejercicio
+from .utils import InterpolanteHermite, interpolacion_hermite_lote, estadisticas_cache_expresiones, estudio_convergencia, evaluar_constante, integracion_quasi_montecarlo
+from .sandbox import LimiteExcedido, ejecutar_aislado, obtener_pool
+import json
+import numpy as np
+
+# Límite de abscisas por solicitud en la evaluación múltiple de Hermite
+MAX_PUNTOS_EVALUACION = 100000
+# Límite de nodos de interpolación (la tabla de diferencias divididas es O(n²))
+MAX_NODOS_HERMITE = 1000
+# Límite de conjuntos de puntos por solicitud en la interpolación por lotes
+MAX_CONJUNTOS_LOTE = 10000
+# Límite de nodos sumando todos los conjuntos del lote (cada conjunto respeta MAX_NODOS_HERMITE)
+MAX_NODOS_LOTE = 200000
 
 @login_required
 def editar_usuario(request):
@@ -47,4 +61,184 @@ def eliminar_simplex(request, id_ejercicio):
         messages.success(request, 'Ejercicio eliminado correctamente.')
     except Ejercicio.DoesNotExist:
         messages.error(request, 'El ejercicio no existe o no pertenece a tu cuenta.')
-    return redirect('metodos_numericos:history')
\ No newline at end of file
+    return redirect('metodos_numericos:history')
+
+def _leer_datos_solicitud(request):
+    """Obtiene los datos de la solicitud, ya sea como JSON o como formulario"""
+    if request.content_type == 'application/json':
+        datos = json.loads(request.body or b'{}')
+        if not isinstance(datos, dict):
+            raise ValueError('El cuerpo JSON debe ser un objeto con los datos de la solicitud.')
+        return datos
+    return request.POST
+
+def _lista_json(valores):
+    """Arreglo como lista para JSON, con null en lugar de NaN e infinitos (que JSON no admite)"""
+    valores = np.asarray(valores, dtype=float)
+    return np.where(np.isfinite(valores), valores, None).tolist()
+
+def _parsear_puntos_hermite(puntos):
+    """Acepta 'x1,f1,df1;x2,f2,df2;...' o una lista [[x, f, df], ...]"""
+    if isinstance(puntos, str):
+        puntos = [p.split(',') for p in puntos.strip().split(';') if p.strip()]
+    puntos = [tuple(float(v) for v in p) for p in puntos]
+    if any(len(p) != 3 for p in puntos):
+        raise ValueError('Cada punto debe tener la forma x,f(x),f\'(x)')
+    if not np.isfinite(puntos).all():
+        raise ValueError('Los puntos deben ser números finitos.')
+    if len(puntos) < 2:
+        raise ValueError('Se necesitan al menos 2 puntos para la interpolación.')
+    x_values = [p[0] for p in puntos]
+    if len(set(x_values)) != len(x_values):
+        raise ValueError('Los valores de x deben ser únicos.')
+    return puntos
+
+def _parsear_limites_caja(limites):
+    """Acepta 'a1,b1;a2,b2;...' o una lista [[a1, b1], [a2, b2], ...]"""
+    if isinstance(limites, str):
+        limites = [l.split(',') for l in limites.strip().split(';') if l.strip()]
+    limites = [tuple(float(v) for v in l) for l in limites]
+    if not limites or any(len(l) != 2 for l in limites):
+        raise ValueError('Cada límite debe tener la forma a,b')
+    return limites
+
+#Evalúa el polinomio de Hermite en muchas abscisas con una sola construcción
+@require_POST
+def hermite_evaluar(request):
+    try:
+        datos = _leer_datos_solicitud(request)
+        puntos = _parsear_puntos_hermite(datos.get('puntos', ''))
+        if len(puntos) > MAX_NODOS_HERMITE:
+            raise ValueError(f'Se permiten como máximo {MAX_NODOS_HERMITE} nodos de interpolación.')
+
+        x_eval = datos.get('x', '')
+        if isinstance(x_eval, str):
+            x_eval = [v for v in x_eval.replace(';', ',').split(',') if v.strip()]
+        x_eval = np.asarray(x_eval, dtype=float).ravel()
+        if x_eval.size == 0:
+            raise ValueError('Debe indicar al menos un punto de evaluación.')
+        if x_eval.size > MAX_PUNTOS_EVALUACION:
+            raise ValueError(f'Se permiten como máximo {MAX_PUNTOS_EVALUACION} puntos de evaluación.')
+        if not np.isfinite(x_eval).all():
+            raise ValueError('Los puntos de evaluación deben ser números finitos.')
+
+        derivada = str(datos.get('derivada', '')).lower() in ('1', 'true', 'si', 'sí', 'on')
+        formato = datos.get('formato', 'json')
+    except (ValueError, TypeError) as e:
+        return JsonResponse({'error': str(e)}, status=400)
+
+    interpolante = InterpolanteHermite(*zip(*puntos))
+    with np.errstate(over='ignore', invalid='ignore'):
+        if derivada:
+            y, dy = interpolante.evaluar(x_eval, derivada=True)
+            columnas = [x_eval, y, dy]
+        else:
+            y = interpolante.evaluar(x_eval)
+            columnas = [x_eval, y]
+
+    if formato == 'binario':
+        # Matriz float64 little-endian fila por fila: x, H(x)[, H'(x)]
+        respuesta = HttpResponse(np.column_stack(columnas).astype('<f8').tobytes(), content_type='application/octet-stream')
+        respuesta['X-Columnas'] = 'x,H,dH' if derivada else 'x,H'
+        respuesta['X-Filas'] = str(x_eval.size)
+        return respuesta
+
+    # Lejos de los nodos H(x) puede desbordarse: los valores no finitos van como null
+    data = {'x': x_eval.tolist(), 'H': _lista_json(y), 'grado': interpolante.grado}
+    if derivada:
+        data['dH'] = _lista_json(dy)
+    return JsonResponse(data)
+
+#Interpolación de Hermite para muchos conjuntos de puntos en una sola llamada
+@require_POST
+def hermite_lote(request):
+    try:
+        datos = json.loads(request.body or b'{}')
+        if not isinstance(datos, dict):
+            raise ValueError('El cuerpo JSON debe ser un objeto con los datos de la solicitud.')
+        conjuntos = datos.get('datos', [])
+        if not conjuntos:
+            raise ValueError('Debe enviar al menos un conjunto de puntos.')
+        if len(conjuntos) > MAX_CONJUNTOS_LOTE:
+            raise ValueError(f'Se permiten como máximo {MAX_CONJUNTOS_LOTE} conjuntos de puntos.')
+        nodos = [len(c) for c in conjuntos]
+        if max(nodos) > MAX_NODOS_HERMITE:
+            raise ValueError(f'Se permiten como máximo {MAX_NODOS_HERMITE} nodos por conjunto.')
+        if sum(nodos) > MAX_NODOS_LOTE:
+            raise ValueError(f'Se permiten como máximo {MAX_NODOS_LOTE} nodos sumando todos los conjuntos.')
+        x_eval = datos.get('x')
+        if x_eval is not None and np.size(x_eval) > MAX_PUNTOS_EVALUACION:
+            raise ValueError(f'Se permiten como máximo {MAX_PUNTOS_EVALUACION} puntos de evaluación.')
+        # Si todos los conjuntos tienen el mismo tamaño se resuelven como un arreglo 3-D
+        if len({len(c) for c in conjuntos}) == 1:
+            conjuntos = np.asarray(conjuntos, dtype=float)
+        derivada = bool(datos.get('derivada', False))
+        with np.errstate(over='ignore', invalid='ignore'):
+            resultado = interpolacion_hermite_lote(conjuntos, x_eval, derivada=derivada)
+    except (ValueError, TypeError) as e:
+        return JsonResponse({'error': str(e)}, status=400)
+
+    data = {clave: [_lista_json(v) for v in valores] for clave, valores in resultado.items()}
+    return JsonResponse(data)
+
+@login_required
+def cache_expresiones(request):
+    """Aciertos y fallos de la cache de expresiones compiladas, sumados entre el proceso web y los trabajadores del sandbox"""
+    procesos = [estadisticas_cache_expresiones()]
+    pool = obtener_pool()
+    if pool is not None:
+        try:
+            procesos += pool.ejecutar_en_todos(estadisticas_cache_expresiones)
+        except LimiteExcedido as e:
+            return JsonResponse({'error': str(e)}, status=503)
+    totales = {clave: sum(p[clave] for p in procesos) for clave in ('aciertos', 'fallos', 'entradas')}
+    totales['capacidad'] = procesos[0]['capacidad']
+    totales['procesos'] = len(procesos)
+    return JsonResponse(totales)
+
+#Estudio de convergencia de una regla compuesta (n = n0, 2n0, 4n0, ...) con mallas anidadas
+@require_POST
+def integracion_convergencia(request):
+    try:
+        datos = _leer_datos_solicitud(request)
+        funcion = datos.get('funcion', '')
+        if not funcion:
+            raise ValueError('Debe indicar la función a integrar.')
+        referencia = str(datos.get('valor_referencia') or '').strip()
+        resultado = ejecutar_aislado(
+            estudio_convergencia,
+            funcion,
+            float(datos.get('a', 0)),
+            float(datos.get('b', 1)),
+            metodo=datos.get('metodo', 'trapecio'),
+            n_inicial=int(datos.get('n_inicial', 2)),
+            niveles=int(datos.get('niveles', 16)),
+            valor_referencia=ejecutar_aislado(evaluar_constante, referencia) if referencia else None,
+        )
+    except (ValueError, TypeError, LimiteExcedido) as e:
+        return JsonResponse({'error': str(e)}, status=400)
+
+    return JsonResponse(resultado)
+
+#Integral en una caja de 1 a 10 dimensiones por quasi-Monte Carlo con error estándar objetivo
+@require_POST
+def integracion_qmc(request):
+    try:
+        datos = _leer_datos_solicitud(request)
+        funcion = datos.get('funcion', '')
+        if not funcion:
+            raise ValueError('Debe indicar la función a integrar.')
+        semilla = datos.get('semilla')
+        resultado = ejecutar_aislado(
+            integracion_quasi_montecarlo,
+            funcion,
+            _parsear_limites_caja(datos.get('limites', '')),
+            secuencia=datos.get('secuencia', 'sobol'),
+            error_objetivo=float(datos.get('error_objetivo', 1e-4)),
+            replicas=int(datos.get('replicas', 16)),
+            semilla=int(semilla) if semilla not in (None, '') else None,
+        )
+    except (ValueError, TypeError, LimiteExcedido) as e:
+        return JsonResponse({'error': str(e)}, status=400)
+
+    return JsonResponse(resultado)
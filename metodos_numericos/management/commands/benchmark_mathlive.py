@@ -0,0 +1,172 @@
+"""
+Compara la latencia del parser de MathLive (mathlive.py) con la cascada de
+expresiones regulares que usaba limpiar_funcion_mathlive.
+
+    python manage.py benchmark_mathlive [--repeticiones N]
+"""
+import time
+
+from django.core.management.base import BaseCommand
+from sympy import lambdify, symbols, sympify
+
+from metodos_numericos.mathlive import parsear, a_texto, a_sympy, compilar_numpy
+
+# Entradas reales: LaTeX tal como lo envía MathLive y notación tipo Python
+CORPUS = [
+    r'x^2+2x+1',
+    r'x^{2}+2x+1',
+    r'\sin\left(x\right)',
+    r'\sin(x)+\cos(x)',
+    r'\frac{1}{1+x^2}',
+    r'\frac{1}{1+25x^{2}}',
+    r'e^{-x^{2}}',
+    r'\sqrt{x^2+1}',
+    r'\ln\left(x+1\right)',
+    r'x\cdot\exp(-x)',
+    r'\frac{\sqrt{\frac{x}{2}}}{1+\frac{1}{x}}',
+    r'\left|x-1\right|',
+    r'\sin^2(x)+\cos^{2}\left(x\right)',
+    r'x^{2}\sin\left(\frac{1}{x}\right)',
+    r'2\pi x',
+    'x**2 + 2*x + 1',
+    '1/(1+x**2)',
+    'exp(-x)*cos(3*x)',
+    'sqrt(x)',
+    'sin(x)/x',
+]
+
+def limpiar_funcion_regex(funcion_str):
+    """
+    Versión anterior de limpiar_funcion_mathlive (cascada de re.sub), solo para comparar
+    """
+    import re
+    
+    if not funcion_str:
+        return ""
+    
+    # Eliminar espacios extra
+    funcion_str = funcion_str.strip()
+    
+    # Conversiones básicas de LaTeX a Python
+    conversiones = [
+        # Funciones trigonométricas
+        (r'\\sin\s*\(', 'sin('),
+        (r'\\cos\s*\(', 'cos('),
+        (r'\\tan\s*\(', 'tan('),
+        (r'\\sec\s*\(', '1/cos('),
+        (r'\\csc\s*\(', '1/sin('),
+        (r'\\cot\s*\(', '1/tan('),
+        
+        # Funciones inversas
+        (r'\\arcsin\s*\(', 'asin('),
+        (r'\\arccos\s*\(', 'acos('),
+        (r'\\arctan\s*\(', 'atan('),
+        
+        # Funciones hiperbólicas
+        (r'\\sinh\s*\(', 'sinh('),
+        (r'\\cosh\s*\(', 'cosh('),
+        (r'\\tanh\s*\(', 'tanh('),
+        
+        # Funciones logarítmicas
+        (r'\\ln\s*\(', 'log('),
+        (r'\\log\s*\(', 'log10('),
+        
+        # Exponencial
+        (r'\\exp\s*\(', 'exp('),
+        (r'e\^', 'exp('),
+        
+        # Raíz cuadrada
+        (r'\\sqrt\s*\{([^}]+)\}', r'sqrt(\1)'),
+        (r'\\sqrt\s*\(', 'sqrt('),
+        
+        # Valor absoluto
+        (r'\\left\|([^|]+)\\right\|', r'abs(\1)'),
+        
+        # Limpiar comandos LaTeX
+        (r'\\left\(', '('),
+        (r'\\right\)', ')'),
+        (r'\\left\{', '('),
+        (r'\\right\}', ')'),
+        (r'\{', '('),
+        (r'\}', ')'),
+        
+        # Potencias
+        (r'\^', '**'),
+        
+        # Constantes matemáticas
+        (r'\\pi', 'pi'),
+        (r'\\e\b', 'E'),
+        
+        # Fracciones simples
+        (r'\\frac\s*\{([^}]+)\}\s*\{([^}]+)\}', r'(\1)/(\2)'),
+        
+        # Limpiar asteriscos múltiples (solo 3 o más, para no romper potencias)
+        (r'\*{3,}', '*'),
+        
+        # Multiplicación implícita
+        (r'(\d)([a-zA-Z])', r'\1*\2'),
+        (r'([a-zA-Z])(\d)', r'\1*\2'),
+        (r'\)\(', ')*('),
+        (r'\)([a-zA-Z])', r')*\1'),
+        (r'([a-zA-Z])\(', r'\1*('),
+    ]
+    
+    # Aplicar todas las conversiones
+    for patron, reemplazo in conversiones:
+        funcion_str = re.sub(patron, reemplazo, funcion_str)
+    
+    # Limpiar espacios finales
+    funcion_str = re.sub(r'\s+', '', funcion_str)
+    
+    return funcion_str
+
+
+def _medir(funcion, entrada, repeticiones):
+    """Tiempo medio por llamada en microsegundos, o None si la llamada falla"""
+    try:
+        funcion(entrada)
+    except Exception:
+        return None
+    inicio = time.perf_counter()
+    for _ in range(repeticiones):
+        funcion(entrada)
+    return (time.perf_counter() - inicio) / repeticiones * 1e6
+
+
+class Command(BaseCommand):
+    help = 'Compara el parser de MathLive con la versión basada en expresiones regulares'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--repeticiones', type=int, default=2000)
+
+    def handle(self, *args, **opciones):
+        repeticiones = opciones['repeticiones']
+        etapas = [
+            ('limpiar', limpiar_funcion_regex, lambda s: a_texto(parsear(s))),
+            ('a sympy', lambda s: sympify(limpiar_funcion_regex(s)), lambda s: a_sympy(parsear(s))),
+            ('a función de NumPy',
+             lambda s: lambdify(symbols('x'), sympify(limpiar_funcion_regex(s)), 'numpy'),
+             lambda s: compilar_numpy(parsear(s))),
+        ]
+        for nombre, anterior, nuevo in etapas:
+            # sympify es mucho más lento: menos repeticiones para la segunda etapa
+            n = repeticiones if nombre == 'limpiar' else max(1, repeticiones // 20)
+            self.stdout.write(f"\n=== {nombre} ({n} repeticiones, µs por llamada) ===")
+            self.stdout.write(f"{'entrada':<45} {'regex':>10} {'parser':>10}")
+            total_anterior = total_nuevo = 0.0
+            fallos_anterior = fallos_nuevo = 0
+            for entrada in CORPUS:
+                t_anterior = _medir(anterior, entrada, n)
+                t_nuevo = _medir(nuevo, entrada, n)
+                if t_anterior is None:
+                    fallos_anterior += 1
+                else:
+                    total_anterior += t_anterior
+                if t_nuevo is None:
+                    fallos_nuevo += 1
+                else:
+                    total_nuevo += t_nuevo
+                formato = lambda t: 'error' if t is None else f"{t:.1f}"
+                self.stdout.write(f"{entrada:<45} {formato(t_anterior):>10} {formato(t_nuevo):>10}")
+            self.stdout.write(f"{'total':<45} {total_anterior:>10.1f} {total_nuevo:>10.1f}")
+            self.stdout.write(f"{'entradas con error':<45} {fallos_anterior:>10} {fallos_nuevo:>10}")
@@ -0,0 +1,534 @@
+"""
+Traductor del subconjunto de LaTeX que envía MathLive (y de la notación tipo
+Python que escriben los usuarios) a un árbol de expresión.
+
+El texto se recorre una sola vez: un tokenizador basado en una única expresión
+regular precompilada y un parser descendente recursivo que construye el árbol.
+A partir del árbol se genera la cadena compatible con sympy
+(limpiar_funcion_mathlive), directamente la expresión de sympy, sin volver a
+parsear texto, o una función de NumPy que no necesita sympy (compilar_numpy).
+
+Nodos del árbol (Nodo(tipo, valor, hijos)):
+    num    valor = literal numérico ('2', '0.5')
+    var    valor = nombre de la variable ('x', o 'x_1' con subíndice)
+    const  valor = 'pi' o 'E'
+    + - * / ^   operaciones binarias, hijos = (izquierdo, derecho)
+    neg    negación, hijos = (operando,)
+    func   valor = nombre de la función, hijos = argumentos
+           ('log' admite un segundo argumento con la base)
+"""
+import math
+import re
+from collections import namedtuple
+
+import numpy as np
+
+Nodo = namedtuple('Nodo', ['tipo', 'valor', 'hijos'])
+
+# Nombres escritos sin barra invertida (notación Python o LaTeX sin '\')
+_NOMBRES = {
+    'arcsin': ('func', 'asin'), 'arccos': ('func', 'acos'), 'arctan': ('func', 'atan'),
+    'asin': ('func', 'asin'), 'acos': ('func', 'acos'), 'atan': ('func', 'atan'),
+    'sinh': ('func', 'sinh'), 'cosh': ('func', 'cosh'), 'tanh': ('func', 'tanh'),
+    'sin': ('func', 'sin'), 'cos': ('func', 'cos'), 'tan': ('func', 'tan'),
+    'sec': ('func', 'sec'), 'csc': ('func', 'csc'), 'cot': ('func', 'cot'),
+    'log10': ('log', '10'), 'log2': ('log', '2'),
+    'ln': ('func', 'log'), 'log': ('func', 'log'), 'exp': ('func', 'exp'),
+    'sqrt': ('sqrt', None), 'Abs': ('func', 'abs'), 'abs': ('func', 'abs'),
+    'dfrac': ('frac', None), 'tfrac': ('frac', None), 'frac': ('frac', None),
+    'cdot': ('op', '*'), 'times': ('op', '*'), 'div': ('op', '/'),
+    'left': ('ignorar', None), 'right': ('ignorar', None),
+    'pi': ('const', 'pi'), 'E': ('const', 'E'), 'e': ('const', 'E'),
+}
+# Los nombres más largos primero para que 'sinh' gane a 'sin' y 'exp' a 'e'
+_PATRON_NOMBRES = re.compile('|'.join(sorted(map(re.escape, _NOMBRES), key=len, reverse=True)))
+
+# Comandos de LaTeX (sin la barra invertida)
+_COMANDOS = dict(_NOMBRES)
+_COMANDOS.update({
+    'log': ('log', '10'),  # \log se interpreta en base 10, \ln es el natural
+    'ast': ('op', '*'),
+    'exponentialE': ('const', 'E'),
+    'lvert': ('barra', None), 'rvert': ('barra', None), 'vert': ('barra', None), 'mid': ('barra', None),
+    'mathrm': ('texto', None), 'operatorname': ('texto', None), 'text': ('texto', None),
+    ',': ('ignorar', None), ';': ('ignorar', None), ':': ('ignorar', None), '!': ('ignorar', None),
+    ' ': ('ignorar', None),
+    '{': ('abre', '{'), '}': ('cierra', '}'), '|': ('barra', None),
+})
+
+# \sin^{-1} y compañía: notación de función inversa
+_MENOS_UNO = Nodo('neg', None, (Nodo('num', '1', ()),))
+_INVERSAS = {'sin': 'asin', 'cos': 'acos', 'tan': 'atan'}
+_TRIGONOMETRICAS = {'sin', 'cos', 'tan', 'sec', 'csc', 'cot', 'sinh', 'cosh', 'tanh'}
+
+_SIMBOLOS = {'−': '-', '·': '*', '×': '*', '÷': '/', '**': '^'}
+
+_TOKEN = re.compile(r"""
+    (?P<espacio>\s+)
+  | (?P<num>\d+\.?\d*|\.\d+)
+  | (?P<cmd>\\(?:[a-zA-Z]+|.))
+  | (?P<op>\*\*|[-+*/^_−·×÷])
+  | (?P<abre>[(\[{])
+  | (?P<cierra>[)\]}])
+  | (?P<barra>\|)
+  | (?P<coma>,)
+  | (?P<pi>π)
+  | (?P<letras>[a-zA-Z]+(?:(?<=log)(?:10|2))?)
+""", re.VERBOSE)
+
+_PAREJAS = {'(': ')', '[': ']', '{': '}'}
+
+
+def tokenizar(texto):
+    """
+    Divide el texto en tokens (tipo, valor, posición) en una sola pasada
+    """
+    tokens = []
+    pos = 0
+    largo = len(texto)
+    while pos < largo:
+        m = _TOKEN.match(texto, pos)
+        if m is None:
+            raise ValueError(f"Carácter no reconocido '{texto[pos]}' en la posición {pos}")
+        tipo = m.lastgroup
+        valor = m.group()
+        if tipo == 'num':
+            tokens.append(('num', valor, pos))
+        elif tipo == 'op':
+            tokens.append(('op', _SIMBOLOS.get(valor, valor), pos))
+        elif tipo in ('abre', 'cierra', 'barra', 'coma'):
+            tokens.append((tipo, valor, pos))
+        elif tipo == 'pi':
+            tokens.append(('const', 'pi', pos))
+        elif tipo == 'cmd':
+            nombre = valor[1:]
+            if nombre not in _COMANDOS:
+                raise ValueError(f"Comando no soportado '{valor}' en la posición {pos}")
+            clase, dato = _COMANDOS[nombre]
+            if (clase, dato) == ('op', '*') and tokens and tokens[-1][:2] == ('op', '*'):
+                # x\ast\ast 2: MathLive escribe así el '**' tecleado
+                tokens[-1] = ('op', '^', tokens[-1][2])
+            elif clase != 'ignorar':
+                tokens.append((clase, dato, pos))
+        elif tipo == 'letras':
+            _tokenizar_letras(valor, pos, tokens)
+        pos = m.end()
+    tokens.append(('fin', None, largo))
+    return tokens
+
+
+def _tokenizar_letras(letras, pos, tokens):
+    """Separa una secuencia de letras en nombres conocidos y variables de una letra"""
+    i = 0
+    while i < len(letras):
+        m = _PATRON_NOMBRES.match(letras, i)
+        if m:
+            clase, dato = _NOMBRES[m.group()]
+            if clase != 'ignorar':
+                tokens.append((clase, dato, pos + i))
+            i = m.end()
+        else:
+            tokens.append(('var', letras[i], pos + i))
+            i += 1
+
+
+class _Parser:
+    """Parser descendente recursivo sobre la lista de tokens"""
+
+    # Tokens que pueden iniciar un factor (para la multiplicación implícita)
+    _INICIO_FACTOR = {'num', 'var', 'const', 'func', 'log', 'sqrt', 'frac', 'abre', 'texto'}
+    # Factores que extienden el argumento de una función sin paréntesis (\sin 2x);
+    # otra función o un operador explícito lo terminan (\sin x \cos x)
+    _INICIO_ARGUMENTO = {'num', 'var', 'const', 'abre'}
+
+    def __init__(self, tokens):
+        self.tokens = tokens
+        self.i = 0
+        self.barras_abiertas = 0
+
+    def actual(self):
+        return self.tokens[self.i]
+
+    def avanzar(self):
+        token = self.tokens[self.i]
+        self.i += 1
+        return token
+
+    def error(self, mensaje):
+        raise ValueError(f"{mensaje} en la posición {self.actual()[2]}")
+
+    def esperar(self, tipo, valor=None):
+        token = self.actual()
+        if token[0] != tipo or (valor is not None and token[1] != valor):
+            self.error(f"Se esperaba '{valor or tipo}'")
+        return self.avanzar()
+
+    def parsear(self):
+        if self.actual()[0] == 'fin':
+            self.error("Expresión vacía")
+        nodo = self.expresion()
+        if self.actual()[0] != 'fin':
+            self.error(f"Símbolo inesperado '{self.actual()[1]}'")
+        return nodo
+
+    def expresion(self):
+        nodo = self.termino()
+        while self.actual()[0] == 'op' and self.actual()[1] in '+-':
+            op = self.avanzar()[1]
+            nodo = Nodo(op, None, (nodo, self.termino()))
+        return nodo
+
+    def termino(self):
+        nodo = self.unario()
+        while True:
+            tipo, valor, _ = self.actual()
+            if tipo == 'op' and valor in '*/':
+                self.avanzar()
+                nodo = Nodo(valor, None, (nodo, self.unario()))
+            elif tipo in self._INICIO_FACTOR or (tipo == 'barra' and self.barras_abiertas == 0):
+                # Multiplicación implícita: 2x, x\sin(x), (x+1)(x-1)
+                nodo = Nodo('*', None, (nodo, self.potencia()))
+            else:
+                return nodo
+
+    def unario(self):
+        tipo, valor, _ = self.actual()
+        if tipo == 'op' and valor in '+-':
+            self.avanzar()
+            operando = self.unario()
+            return Nodo('neg', None, (operando,)) if valor == '-' else operando
+        return self.potencia()
+
+    def potencia(self):
+        base = self.primario()
+        if self.actual()[:2] == ('op', '^'):
+            self.avanzar()
+            return Nodo('^', None, (base, self.unario()))
+        return base
+
+    def grupo(self):
+        """Argumento entre llaves/paréntesis, o un solo token como en x^2 o \\frac12"""
+        tipo, valor, _ = self.actual()
+        if tipo == 'abre':
+            self.avanzar()
+            nodo = self.expresion()
+            self.esperar('cierra', _PAREJAS[valor])
+            return nodo
+        if tipo == 'num' and len(valor) > 1 and valor.isdigit():
+            # \frac12 -> 1/2: cada dígito es un argumento
+            self.tokens[self.i] = ('num', valor[1:], self.actual()[2] + 1)
+            return Nodo('num', valor[0], ())
+        return self.primario()
+
+    def argumento_funcion(self):
+        """
+        Argumento de una función sin paréntesis: \\sin{x}, o el siguiente factor junto
+        con los que lo siguen por multiplicación implícita (\\sin 2x = \\sin(2x))
+        """
+        if self.actual()[0] == 'abre':
+            return self.primario()
+        nodo = self.unario()
+        while self.actual()[0] in self._INICIO_ARGUMENTO:
+            nodo = Nodo('*', None, (nodo, self.potencia()))
+        return nodo
+
+    def primario(self):
+        tipo, valor, _ = self.actual()
+        if tipo == 'num':
+            self.avanzar()
+            return Nodo('num', valor, ())
+        if tipo == 'var':
+            self.avanzar()
+            if self.actual()[:2] == ('op', '_'):
+                # Variable con subíndice entero: x_1, x_{10} (x_10 se lee como x_{10})
+                self.avanzar()
+                if self.actual()[0] == 'num':
+                    subindice = Nodo('num', self.avanzar()[1], ())
+                else:
+                    subindice = self.grupo()
+                if subindice.tipo != 'num' or not subindice.valor.isdigit():
+                    self.error("Solo se admiten subíndices enteros en las variables")
+                return Nodo('var', f"{valor}_{subindice.valor}", ())
+            return Nodo('var', valor, ())
+        if tipo == 'const':
+            self.avanzar()
+            return Nodo('const', valor, ())
+        if tipo == 'abre':
+            self.avanzar()
+            nodo = self.expresion()
+            if self.actual()[0] == 'coma':
+                self.error("Coma fuera de una función")
+            self.esperar('cierra', _PAREJAS[valor])
+            return nodo
+        if tipo == 'barra':
+            self.avanzar()
+            self.barras_abiertas += 1
+            nodo = self.expresion()
+            self.barras_abiertas -= 1
+            self.esperar('barra')
+            return Nodo('func', 'abs', (nodo,))
+        if tipo == 'frac':
+            self.avanzar()
+            numerador = self.grupo()
+            return Nodo('/', None, (numerador, self.grupo()))
+        if tipo == 'sqrt':
+            self.avanzar()
+            indice = None
+            if self.actual()[:2] == ('abre', '['):
+                self.avanzar()
+                indice = self.expresion()
+                self.esperar('cierra', ']')
+            radicando = self.grupo()
+            if indice is None:
+                return Nodo('func', 'sqrt', (radicando,))
+            return Nodo('^', None, (radicando, Nodo('/', None, (Nodo('num', '1', ()), indice))))
+        if tipo == 'texto':
+            # \mathrm{e}, \operatorname{sen}, ...: el contenido se trata como un nombre
+            self.avanzar()
+            self.esperar('abre', '{')
+            partes = []
+            while self.actual()[0] != 'cierra':
+                if self.actual()[0] == 'fin':
+                    self.error("Falta '}'")
+                partes.append(self.avanzar())
+            self.avanzar()
+            if len(partes) != 1:
+                self.error("Nombre no soportado")
+            self.tokens[self.i - 1] = partes[0]
+            self.i -= 1
+            return self.primario()
+        if tipo in ('func', 'log'):
+            return self.funcion()
+        self.error(f"Símbolo inesperado '{valor}'" if tipo != 'fin' else "Expresión incompleta")
+
+    def funcion(self):
+        tipo, nombre, _ = self.avanzar()
+        base = Nodo('num', nombre, ()) if tipo == 'log' else None
+        nombre = 'log' if tipo == 'log' else nombre
+
+        # \log_{2}(x)
+        if self.actual()[:2] == ('op', '_'):
+            self.avanzar()
+            base = self.grupo()
+
+        # \sin^2(x) = (\sin x)^2, pero \sin^{-1}(x) es la función inversa
+        exponente = None
+        if self.actual()[:2] == ('op', '^'):
+            self.avanzar()
+            exponente = self.grupo()
+            if exponente == _MENOS_UNO and nombre in _TRIGONOMETRICAS:
+                if nombre not in _INVERSAS:
+                    self.error(f"No se admite \\{nombre}^{{-1}}: la inversa de {nombre} no está disponible")
+                nombre = _INVERSAS[nombre]
+                exponente = None
+
+        if self.actual()[:2] == ('abre', '('):
+            argumentos = self.argumento_lista()
+        else:
+            argumentos = [self.argumento_funcion()]
+        if nombre == 'log' and len(argumentos) == 2:
+            base = argumentos.pop()
+        if len(argumentos) != 1:
+            self.error(f"Número de argumentos inválido para {nombre}")
+        if base is not None:
+            argumentos.append(base)
+        nodo = Nodo('func', nombre, tuple(argumentos))
+        return Nodo('^', None, (nodo, exponente)) if exponente is not None else nodo
+
+    def argumento_lista(self):
+        """Argumentos entre paréntesis separados por comas: log(x, 2)"""
+        self.esperar('abre', '(')
+        argumentos = [self.expresion()]
+        while self.actual()[0] == 'coma':
+            self.avanzar()
+            argumentos.append(self.expresion())
+        self.esperar('cierra', ')')
+        return argumentos
+
+
+def parsear(texto):
+    """
+    Convierte la entrada de MathLive en un árbol de expresión
+
+    Raises:
+        ValueError: si el texto no pertenece al subconjunto soportado
+    """
+    return _Parser(tokenizar(texto)).parsear()
+
+
+# Precedencias para decidir los paréntesis al generar texto
+_PRECEDENCIA = {'+': 1, '-': 1, '*': 2, '/': 2, 'neg': 3, '^': 4}
+
+
+def _precedencia(nodo):
+    if nodo.tipo == 'num' and nodo.valor.startswith('-'):
+        return 3
+    return _PRECEDENCIA.get(nodo.tipo, 5)
+
+
+def a_texto(nodo):
+    """Genera la cadena equivalente en notación de Python/sympy"""
+    tipo = nodo.tipo
+    if tipo in ('num', 'var', 'const'):
+        return nodo.valor
+    if tipo == 'func':
+        argumentos = ', '.join(a_texto(h) for h in nodo.hijos)
+        return f"{nodo.valor}({argumentos})"
+    if tipo == 'neg':
+        operando = nodo.hijos[0]
+        texto = a_texto(operando)
+        return f"-({texto})" if _precedencia(operando) < 2 else f"-{texto}"
+
+    izquierdo, derecho = nodo.hijos
+    prec = _PRECEDENCIA[tipo]
+    texto_izq = a_texto(izquierdo)
+    texto_der = a_texto(derecho)
+    if tipo == '^':
+        if _precedencia(izquierdo) <= prec:
+            texto_izq = f"({texto_izq})"
+        if _precedencia(derecho) < prec:
+            texto_der = f"({texto_der})"
+        return f"{texto_izq}**{texto_der}"
+    if _precedencia(izquierdo) < prec:
+        texto_izq = f"({texto_izq})"
+    # a-(b+c), a/(b*c): el operando derecho de - y / necesita paréntesis con igual precedencia
+    if _precedencia(derecho) < prec or (_precedencia(derecho) == prec and tipo in '-/'):
+        texto_der = f"({texto_der})"
+    return f"{texto_izq}{tipo}{texto_der}"
+
+
+def a_sympy(nodo, simbolos=None):
+    """
+    Construye la expresión de sympy directamente desde el árbol
+
+    Args:
+        simbolos: Dict opcional nombre -> Symbol para reutilizar símbolos existentes
+    """
+    import sympy as sp
+
+    funciones = {
+        'sin': sp.sin, 'cos': sp.cos, 'tan': sp.tan,
+        'sec': sp.sec, 'csc': sp.csc, 'cot': sp.cot,
+        'asin': sp.asin, 'acos': sp.acos, 'atan': sp.atan,
+        'sinh': sp.sinh, 'cosh': sp.cosh, 'tanh': sp.tanh,
+        'exp': sp.exp, 'log': sp.log, 'sqrt': sp.sqrt, 'abs': sp.Abs,
+    }
+    simbolos = {} if simbolos is None else simbolos
+
+    def construir(n):
+        tipo = n.tipo
+        if tipo == 'num':
+            return sp.Float(n.valor) if '.' in n.valor else sp.Integer(n.valor)
+        if tipo == 'var':
+            if n.valor not in simbolos:
+                simbolos[n.valor] = sp.Symbol(n.valor)
+            return simbolos[n.valor]
+        if tipo == 'const':
+            return sp.pi if n.valor == 'pi' else sp.E
+        if tipo == 'func':
+            return funciones[n.valor](*(construir(h) for h in n.hijos))
+        if tipo == 'neg':
+            return -construir(n.hijos[0])
+        a, b = (construir(h) for h in n.hijos)
+        if tipo == '+':
+            return a + b
+        if tipo == '-':
+            return a - b
+        if tipo == '*':
+            return a * b
+        if tipo == '/':
+            return a / b
+        return a ** b
+
+    return construir(nodo)
+
+
+def _log_base(x, base):
+    return np.log(x) / np.log(base)
+
+
+_FUNCIONES_NUMPY = {
+    'sin': np.sin, 'cos': np.cos, 'tan': np.tan,
+    'sec': lambda x: 1 / np.cos(x), 'csc': lambda x: 1 / np.sin(x), 'cot': lambda x: 1 / np.tan(x),
+    'asin': np.arcsin, 'acos': np.arccos, 'atan': np.arctan,
+    'sinh': np.sinh, 'cosh': np.cosh, 'tanh': np.tanh,
+    'exp': np.exp, 'sqrt': np.sqrt, 'abs': np.abs,
+}
+_OPERACIONES_NUMPY = {
+    '+': np.add, '-': np.subtract, '*': np.multiply, '/': np.divide, '^': np.power,
+    'neg': np.negative,
+}
+_CONSTANTES = {'pi': math.pi, 'E': math.e}
+
+
+def compilar_numpy(nodo, variables=('x',)):
+    """
+    Compila el árbol en una función f(x) (o f(x, y, ...)) de NumPy sin pasar por sympy
+
+    Los subárboles repetidos se evalúan una sola vez (eliminación de
+    subexpresiones comunes) y los que no dependen de las variables se calculan
+    al compilar.
+
+    Args:
+        variables: Nombres de las variables, en el orden de los argumentos de f
+
+    Returns:
+        Función que acepta escalares o arreglos (que se combinan con las reglas
+        de broadcasting de NumPy); si la expresión es constante devuelve un
+        escalar, igual que lambdify
+
+    Raises:
+        ValueError: si aparece una variable que no está en `variables`
+    """
+    # Programa lineal: cada instrucción guarda su resultado en una posición de `valores`
+    iniciales = [None] * len(variables)     # posiciones 0..k-1: las variables
+    programa = []             # (destino, función, posiciones de los argumentos)
+    posiciones = {}           # subárbol -> posición (los Nodo son hashables)
+    constantes = set()
+
+    def agregar_constante(n, valor):
+        posiciones[n] = len(iniciales)
+        constantes.add(posiciones[n])
+        iniciales.append(valor)
+        return posiciones[n]
+
+    def visitar(n):
+        if n in posiciones:
+            return posiciones[n]
+        if n.tipo == 'var':
+            if n.valor not in variables:
+                raise ValueError(f"Variable no soportada '{n.valor}', solo se admite {', '.join(variables)}")
+            return variables.index(n.valor)
+        if n.tipo in ('num', 'const'):
+            valor = float(n.valor) if n.tipo == 'num' else _CONSTANTES[n.valor]
+            return agregar_constante(n, valor)
+
+        argumentos = tuple(visitar(h) for h in n.hijos)
+        if n.tipo == 'func' and n.valor == 'log':
+            funcion = _log_base if len(argumentos) == 2 else np.log
+        elif n.tipo == 'func':
+            funcion = _FUNCIONES_NUMPY[n.valor]
+        else:
+            funcion = _OPERACIONES_NUMPY[n.tipo]
+
+        if all(a in constantes for a in argumentos):
+            with np.errstate(all='ignore'):
+                valor = funcion(*(iniciales[a] for a in argumentos))
+            return agregar_constante(n, float(valor))
+
+        posiciones[n] = len(iniciales)
+        iniciales.append(None)
+        programa.append((posiciones[n], funcion, argumentos))
+        return posiciones[n]
+
+    resultado = visitar(nodo)
+
+    def f(*argumentos):
+        valores = iniciales.copy()
+        valores[:len(variables)] = [np.asarray(valor, dtype=float) for valor in argumentos]
+        for destino, funcion, argumentos in programa:
+            valores[destino] = funcion(*[valores[a] for a in argumentos])
+        return valores[resultado]
+
+    f.instrucciones = len(programa)
+    return f
@@ -0,0 +1,371 @@
+"""
+Ejecución aislada de los cálculos con expresiones del usuario
+
+Parsear y evaluar una expresión arbitraria puede tardar minutos o agotar la
+memoria (potencias enteras enormes, anidamientos profundos). Para que eso no
+bloquee al proceso web, los cálculos se mandan a un pool de procesos
+trabajadores creados de antemano, cada uno con límites de:
+
+- tiempo de CPU por trabajo (RLIMIT_CPU): al llegar al límite blando el
+  trabajo recibe SIGXCPU y se cancela; si el cálculo no vuelve al intérprete
+  (un bucle en C que no atiende la señal) el sistema mata al trabajador en el
+  límite duro, unos segundos después
+- espacio de direcciones (RLIMIT_AS)
+- tiempo real: el proceso web espera como máximo limite_tiempo segundos
+
+Un trabajo que se pasa de un límite se cancela y se informa con
+LimiteExcedido; si hubo que matar al trabajador se crea otro en su lugar.
+Los trabajadores sanos se reutilizan para el trabajo siguiente.
+
+Las funciones que se ejecutan y sus argumentos y resultados deben poder
+serializarse con pickle (funciones de módulo, datos simples, arrays).
+"""
+import atexit
+import math
+import multiprocessing
+import os
+import queue
+import signal
+import threading
+
+try:
+    import resource
+except ImportError:  # Windows: sin límites de recursos, solo el de tiempo real
+    resource = None
+
+
+class LimiteExcedido(Exception):
+    """El cálculo superó un límite del sandbox y se canceló"""
+
+
+class _CPUAgotada(BaseException):
+    # BaseException para que no la atrapen los `except Exception` del cálculo
+    pass
+
+
+def _al_agotar_cpu(signum, frame):
+    raise _CPUAgotada()
+
+
+def _tiempo_cpu_usado():
+    uso = resource.getrusage(resource.RUSAGE_SELF)
+    return uso.ru_utime + uso.ru_stime
+
+
+def _fijar_limite_cpu(segundos):
+    """Límite blando de CPU a `segundos` desde ahora (None lo lleva al duro); el duro no se toca"""
+    _, duro = resource.getrlimit(resource.RLIMIT_CPU)
+    if segundos is None:
+        blando = duro
+    else:
+        blando = math.ceil(_tiempo_cpu_usado()) + segundos
+        if duro != resource.RLIM_INFINITY:
+            blando = min(blando, duro)
+    resource.setrlimit(resource.RLIMIT_CPU, (blando, duro))
+
+
+def _fijar_limite_cpu_duro(segundos):
+    """
+    Límite duro de CPU a `segundos` desde ahora
+
+    Sin privilegios el límite duro no se puede volver a subir, así que se fija
+    una sola vez al crear el trabajador: todos sus trabajos comparten ese margen.
+    """
+    blando, duro = resource.getrlimit(resource.RLIMIT_CPU)
+    nuevo = math.ceil(_tiempo_cpu_usado()) + segundos
+    if duro != resource.RLIM_INFINITY:
+        nuevo = min(nuevo, duro)
+    if blando == resource.RLIM_INFINITY or blando > nuevo:
+        blando = nuevo
+    resource.setrlimit(resource.RLIMIT_CPU, (blando, nuevo))
+
+
+def _queda_cpu_para_otro_trabajo(limite_cpu):
+    """Si el límite duro deja el límite blando completo y al menos un segundo más"""
+    _, duro = resource.getrlimit(resource.RLIMIT_CPU)
+    return duro == resource.RLIM_INFINITY or math.ceil(_tiempo_cpu_usado()) + limite_cpu + 1 <= duro
+
+
+def _bucle_trabajador(conexion, limite_cpu, limite_memoria, margen_cpu):
+    """
+    Proceso trabajador: recibe (funcion, args, kwargs) y responde (estado, valor, retirarse)
+
+    `retirarse` indica que el trabajador ya no tiene margen de CPU bajo el
+    límite duro para otro trabajo: sale del bucle y el pool lo cambia por uno nuevo.
+    """
+    # El Ctrl+C de runserver lo atiende el proceso web, que cierra el pool
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    # Grupo de procesos propio: al matar al trabajador caen también los
+    # procesos que haya abierto (la integración por bloques usa un pool propio)
+    if hasattr(os, 'setpgrp'):
+        os.setpgrp()
+    if resource is not None:
+        signal.signal(signal.SIGXCPU, _al_agotar_cpu)
+        if limite_memoria:
+            resource.setrlimit(resource.RLIMIT_AS, (limite_memoria, limite_memoria))
+        if limite_cpu:
+            _fijar_limite_cpu_duro(limite_cpu + margen_cpu)
+
+    while True:
+        try:
+            trabajo = conexion.recv()
+        except (EOFError, OSError):
+            break
+        if trabajo is None:
+            break
+        funcion, args, kwargs = trabajo
+        try:
+            if resource is not None and limite_cpu:
+                _fijar_limite_cpu(limite_cpu)
+            try:
+                respuesta = ('ok', funcion(*args, **kwargs))
+            finally:
+                if resource is not None and limite_cpu:
+                    _fijar_limite_cpu(None)
+        except _CPUAgotada:
+            _fijar_limite_cpu(None)
+            respuesta = ('cpu', None)
+        except MemoryError:
+            respuesta = ('memoria', None)
+        except RecursionError:
+            respuesta = ('error_valor', 'La expresión está anidada demasiado profundamente')
+        except ValueError as e:
+            respuesta = ('error_valor', str(e))
+        except Exception as e:
+            respuesta = ('error', f'{type(e).__name__}: {e}')
+
+        retirarse = bool(resource is not None and limite_cpu and not _queda_cpu_para_otro_trabajo(limite_cpu))
+        try:
+            conexion.send((*respuesta, retirarse))
+        except MemoryError:
+            conexion.send(('memoria', None, retirarse))
+        except Exception as e:
+            conexion.send(('error', f'El resultado no se pudo enviar al proceso web: {e}', retirarse))
+        if retirarse:
+            break
+
+
+class _Trabajador:
+    """Un proceso trabajador y el extremo de su tubería en el proceso web"""
+
+    def __init__(self, contexto, limite_cpu, limite_memoria, margen_cpu):
+        self.conexion, extremo = contexto.Pipe()
+        # No es daemon: la integración por bloques puede abrir sus propios procesos
+        self.proceso = contexto.Process(target=_bucle_trabajador,
+                                        args=(extremo, limite_cpu, limite_memoria, margen_cpu),
+                                        name='sandbox-trabajador')
+        self.proceso.start()
+        extremo.close()
+
+    def vivo(self):
+        return self.proceso.is_alive()
+
+    def detener(self):
+        """Cierre ordenado: el trabajador sale de su bucle al recibir None"""
+        try:
+            self.conexion.send(None)
+        except (OSError, ValueError):
+            pass
+        self.proceso.join(1)
+        if self.proceso.is_alive():
+            self.matar()
+        else:
+            self.conexion.close()
+
+    def matar(self):
+        if hasattr(os, 'killpg'):
+            try:
+                os.killpg(self.proceso.pid, signal.SIGKILL)
+            except (ProcessLookupError, PermissionError):
+                pass  # Aún no había creado su grupo
+        self.proceso.kill()
+        self.proceso.join()
+        self.conexion.close()
+
+
+class PoolSandbox:
+    """
+    Pool de procesos trabajadores con límites de CPU, memoria y tiempo real
+
+    Args:
+        trabajadores: Número de procesos (trabajos simultáneos)
+        limite_cpu: Segundos de CPU por trabajo (0 = sin límite)
+        limite_memoria: Bytes de espacio de direcciones por proceso (0 = sin límite)
+        limite_tiempo: Segundos de espera del proceso web por trabajo
+        margen_cpu: Segundos de CPU de cada trabajador por encima de limite_cpu
+            hasta el límite duro, en el que el sistema lo mata. Lo consumen
+            todos sus trabajos: cuando ya no alcanza, el trabajador se renueva
+        metodo_inicio: Método de multiprocessing; por defecto 'forkserver' donde
+            exista, para no hacer fork de un proceso web con hilos
+    """
+
+    def __init__(self, trabajadores=2, limite_cpu=10, limite_memoria=1024 * 1024 * 1024, limite_tiempo=15,
+                 margen_cpu=5, metodo_inicio=None):
+        if trabajadores <= 0:
+            raise ValueError("El pool necesita al menos un trabajador")
+        if metodo_inicio is None:
+            metodo_inicio = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+        self.contexto = multiprocessing.get_context(metodo_inicio)
+        if metodo_inicio == 'forkserver':
+            # Cada trabajador nace con NumPy y el módulo de cálculo ya importados
+            self.contexto.set_forkserver_preload(['metodos_numericos.utils'])
+        self.limite_cpu = limite_cpu
+        self.limite_memoria = limite_memoria
+        self.limite_tiempo = limite_tiempo
+        self.margen_cpu = margen_cpu
+        self.reinicios = 0
+        self._libres = queue.Queue()
+        self._todos = []
+        self._lock = threading.Lock()
+        self._lock_todos = threading.Lock()
+        for _ in range(trabajadores):
+            trabajador = self._crear_trabajador()
+            self._libres.put(trabajador)
+
+    def _crear_trabajador(self):
+        trabajador = _Trabajador(self.contexto, self.limite_cpu, self.limite_memoria, self.margen_cpu)
+        with self._lock:
+            self._todos.append(trabajador)
+        return trabajador
+
+    def _reemplazar(self, trabajador):
+        """Mata a un trabajador que se pasó de un límite y crea otro en su lugar"""
+        trabajador.matar()
+        with self._lock:
+            self._todos.remove(trabajador)
+            self.reinicios += 1
+        return self._crear_trabajador()
+
+    def _renovar(self, trabajador):
+        """Cambia por uno nuevo a un trabajador que se retiró por su cuenta"""
+        trabajador.detener()
+        with self._lock:
+            self._todos.remove(trabajador)
+        return self._crear_trabajador()
+
+    def _ejecutar_en(self, trabajador, funcion, args, kwargs):
+        """
+        Manda el trabajo a `trabajador` y espera la respuesta
+
+        Returns:
+            Tupla (trabajador, estado, valor); el trabajador es otro si hubo que
+            reemplazarlo (estado 'tiempo' o 'terminado') o si se retiró
+        """
+        if not trabajador.vivo():
+            trabajador = self._reemplazar(trabajador)
+        try:
+            trabajador.conexion.send((funcion, args, kwargs))
+        except (OSError, ValueError):
+            # Murió después de la comprobación anterior (tubería rota)
+            return self._reemplazar(trabajador), 'terminado', None
+        if not trabajador.conexion.poll(self.limite_tiempo):
+            return self._reemplazar(trabajador), 'tiempo', None
+        try:
+            estado, valor, retirarse = trabajador.conexion.recv()
+        except (EOFError, OSError):
+            # El sistema mató al trabajador (límite duro de CPU o falta de memoria)
+            return self._reemplazar(trabajador), 'terminado', None
+        if retirarse:
+            trabajador = self._renovar(trabajador)
+        return trabajador, estado, valor
+
+    def _resultado(self, estado, valor):
+        if estado == 'ok':
+            return valor
+        if estado == 'tiempo':
+            raise LimiteExcedido(f"El cálculo superó el límite de {self.limite_tiempo} s y se canceló")
+        if estado == 'terminado':
+            raise LimiteExcedido("El proceso de cálculo terminó de forma inesperada y se canceló")
+        if estado == 'cpu':
+            raise LimiteExcedido(f"El cálculo superó el límite de {self.limite_cpu} s de CPU y se canceló")
+        if estado == 'memoria':
+            raise LimiteExcedido("El cálculo superó el límite de memoria y se canceló")
+        if estado == 'error_valor':
+            raise ValueError(valor)
+        raise RuntimeError(valor)
+
+    def ejecutar(self, funcion, *args, **kwargs):
+        """
+        Ejecuta funcion(*args, **kwargs) en un trabajador y devuelve su resultado
+
+        Los ValueError del cálculo se vuelven a lanzar como ValueError con el
+        mismo mensaje; el resto de errores, como RuntimeError.
+
+        Raises:
+            LimiteExcedido: El trabajo superó el límite de CPU, de memoria o de tiempo
+        """
+        trabajador = self._libres.get()
+        try:
+            trabajador, estado, valor = self._ejecutar_en(trabajador, funcion, args, kwargs)
+        finally:
+            self._libres.put(trabajador)
+        return self._resultado(estado, valor)
+
+    def ejecutar_en_todos(self, funcion, *args, **kwargs):
+        """
+        Ejecuta funcion(*args, **kwargs) una vez en cada trabajador
+
+        Sirve para consultar el estado de los procesos (por ejemplo, su cache de
+        expresiones). Espera a que cada trabajador quede libre.
+
+        Returns:
+            Lista con el resultado de cada trabajador
+        """
+        with self._lock_todos:
+            with self._lock:
+                total = len(self._todos)
+            tomados = [self._libres.get() for _ in range(total)]
+            resultados = []
+            try:
+                for i, trabajador in enumerate(tomados):
+                    tomados[i], estado, valor = self._ejecutar_en(trabajador, funcion, args, kwargs)
+                    resultados.append(self._resultado(estado, valor))
+            finally:
+                for trabajador in tomados:
+                    self._libres.put(trabajador)
+        return resultados
+
+    def cerrar(self):
+        """Detiene todos los trabajadores"""
+        with self._lock:
+            trabajadores, self._todos = self._todos, []
+        for trabajador in trabajadores:
+            trabajador.detener()
+
+
+_pool = None
+_lock_pool = threading.Lock()
+
+
+def obtener_pool():
+    """
+    Pool del proceso, creado en el primer uso con la configuración de Django
+
+    Devuelve None si SANDBOX_TRABAJADORES es 0 (los cálculos se hacen en el
+    mismo proceso, sin límites).
+    """
+    global _pool
+    if _pool is None:
+        from django.conf import settings
+        trabajadores = getattr(settings, 'SANDBOX_TRABAJADORES', 0)
+        if trabajadores <= 0:
+            return None
+        with _lock_pool:
+            if _pool is None:
+                _pool = PoolSandbox(
+                    trabajadores,
+                    limite_cpu=getattr(settings, 'SANDBOX_LIMITE_CPU', 10),
+                    limite_memoria=getattr(settings, 'SANDBOX_LIMITE_MEMORIA_MB', 1024) * 1024 * 1024,
+                    limite_tiempo=getattr(settings, 'SANDBOX_LIMITE_TIEMPO', 15),
+                    margen_cpu=getattr(settings, 'SANDBOX_MARGEN_CPU', 5),
+                )
+                atexit.register(_pool.cerrar)
+    return _pool
+
+
+def ejecutar_aislado(funcion, *args, **kwargs):
+    """funcion(*args, **kwargs) en el pool del sandbox, o en este proceso si está desactivado"""
+    pool = obtener_pool()
+    if pool is None:
+        return funcion(*args, **kwargs)
+    return pool.ejecutar(funcion, *args, **kwargs)
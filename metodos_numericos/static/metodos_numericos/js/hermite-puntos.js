@@ -9,6 +9,13 @@ document.addEventListener("DOMContentLoaded", () => {
   const form = document.getElementById("hermiteForm")
   if (form) {
     form.addEventListener("submit", (e) => {
+      // En el modo "desde una función" los puntos se generan en el servidor
+      if (document.getElementById("modo")?.value === "funcion") {
+        const mathField = document.getElementById("funcion")
+        const hidden = document.getElementById("funcion-hidden")
+        if (mathField && hidden) hidden.value = mathField.value
+        return true
+      }
       if (!validarYActualizarPuntos()) {
         e.preventDefault()
         return false
@@ -17,6 +24,17 @@ document.addEventListener("DOMContentLoaded", () => {
   }
 })
 
+// Mostrar la tabla de puntos o los campos de la función según el modo
+document.addEventListener("DOMContentLoaded", () => {
+  const modo = document.getElementById("modo")
+  if (!modo) return
+  modo.addEventListener("change", () => {
+    const desdeFuncion = modo.value === "funcion"
+    document.getElementById("campos-puntos").style.display = desdeFuncion ? "none" : ""
+    document.getElementById("campos-funcion").style.display = desdeFuncion ? "" : "none"
+  })
+})
+
 function inicializarTablaPuntos() {
   // No cargar puntos por defecto aquí, se hará desde el template si es necesario
   // Solo agregar puntos por defecto si no hay datos existentes
@@ -23,6 +23,11 @@ function initializeIntegrationGraph(datosGrafica) {
   const graphDiv = document.getElementById("integration-graph")
   if (!graphDiv) return
 
+  if (datosGrafica.tipo === "superficie") {
+    initializeSurfaceGraph(datosGrafica, graphDiv)
+    return
+  }
+
   // Filtrar datos no numéricos para cada traza
   const curvaPairs = filterNumericPairs(datosGrafica.curva_x, datosGrafica.curva_y)
   const areaPairs = filterNumericPairs(datosGrafica.area_x, datosGrafica.area_y)
@@ -95,6 +100,44 @@ function initializeIntegrationGraph(datosGrafica) {
     })
   }
 
+  // Integral acumulada F(x) en un eje secundario
+  const tieneAcumulada = Array.isArray(datosGrafica.acumulada_x) && datosGrafica.acumulada_x.length > 0
+  if (tieneAcumulada) {
+    const acumuladaPairs = filterNumericPairs(datosGrafica.acumulada_x, datosGrafica.acumulada_y)
+    traces.push({
+      x: acumuladaPairs.map(p => p[0]),
+      y: acumuladaPairs.map(p => p[1]),
+      type: "scatter",
+      mode: "lines",
+      name: "F(x) = ∫ₐˣ f",
+      yaxis: "y2",
+      line: {
+        color: "#6f42c1",
+        width: 2,
+        dash: "dot",
+      },
+      hovertemplate: "F(%{x:.4f}) = %{y:.6f}<extra></extra>",
+    })
+  }
+
+  // Nodos de Gauss–Legendre
+  if (datosGrafica.metodo === "gauss_legendre" && Array.isArray(datosGrafica.nodos_gauss_x) && datosGrafica.nodos_gauss_x.length > 0) {
+    const gaussPairs = filterNumericPairs(datosGrafica.nodos_gauss_x, datosGrafica.nodos_gauss_y)
+    traces.push({
+      x: gaussPairs.map(p => p[0]),
+      y: gaussPairs.map(p => p[1]),
+      type: "scatter",
+      mode: "markers",
+      name: "Nodos de Gauss",
+      marker: {
+        color: "#dc3545",
+        size: 7,
+        symbol: "diamond",
+      },
+      hovertemplate: "x=%{x:.5f}<br>f(x)=%{y:.5f}<extra></extra>",
+    })
+  }
+
   // Líneas verticales para los límites de integración
   const curvaY = curvaPairs.map(p => p[1])
   const yRange = [
@@ -183,6 +226,16 @@ function initializeIntegrationGraph(datosGrafica) {
     ],
   }
 
+  if (tieneAcumulada) {
+    layout.yaxis2 = {
+      title: "F(x)",
+      overlaying: "y",
+      side: "right",
+      showgrid: false,
+    }
+    layout.margin.r = 70
+  }
+
   // Configuración
   const config = {
     displayModeBar: true,
@@ -212,6 +265,56 @@ function initializeIntegrationGraph(datosGrafica) {
   showIntegrationInfo(datosGrafica)
 }
 
+// Integral doble: superficie z = f(x, y) sobre el rectángulo de integración
+function initializeSurfaceGraph(datosGrafica, graphDiv) {
+  const traces = [
+    {
+      x: datosGrafica.x,
+      y: datosGrafica.y,
+      z: datosGrafica.z,
+      type: "surface",
+      colorscale: "Viridis",
+      name: "f(x, y)",
+      hovertemplate: "x=%{x:.3f}<br>y=%{y:.3f}<br>f=%{z:.4f}<extra></extra>",
+    },
+  ]
+
+  const layout = {
+    title: {
+      text: `Integral doble - ${datosGrafica.metodo.charAt(0).toUpperCase() + datosGrafica.metodo.slice(1)}`,
+      font: { size: 16, color: "#333" },
+    },
+    scene: {
+      xaxis: { title: "x" },
+      yaxis: { title: "y" },
+      zaxis: { title: "f(x, y)" },
+    },
+    paper_bgcolor: "#ffffff",
+    margin: { t: 60, r: 20, b: 20, l: 20 },
+    height: 550,
+  }
+
+  Plotly.newPlot(graphDiv, traces, layout, { responsive: true })
+  integrationPlot = graphDiv
+
+  const infoDiv = document.getElementById("integration-info")
+  if (infoDiv) {
+    infoDiv.innerHTML = `
+            <div class="alert alert-info ps-3 pt-1 pb-2 text-dark">
+                <h6><i class="fas fa-info-circle me-2"></i>Regla producto (${datosGrafica.metodo})</h6>
+                <p class="mb-2">Pesos 2-D = producto exterior de los pesos 1-D en x y en y</p>
+                <div class="small">
+                    <strong>Fórmula:</strong> <code>∬f dA ≈ ∑ᵢ∑ⱼ wᵢ⁽ˣ⁾ wⱼ⁽ʸ⁾ f(xᵢ, yⱼ)</code><br>
+                    <strong>Región:</strong> [${datosGrafica.a}, ${datosGrafica.b}] × [${datosGrafica.c}, ${datosGrafica.d}]<br>
+                    <strong>Subintervalos:</strong> ${datosGrafica.nx} × ${datosGrafica.ny}<br>
+                    <strong>Evaluaciones:</strong> ${datosGrafica.evaluaciones} en ${(datosGrafica.tiempo * 1000).toFixed(1)} ms<br>
+                    <strong>Resultado:</strong> ${datosGrafica.resultado.toFixed(8)}
+                </div>
+            </div>
+        `
+  }
+}
+
 function showIntegrationInfo(datosGrafica) {
   const infoDiv = document.getElementById("integration-info")
   if (infoDiv) {
@@ -231,6 +334,33 @@ function showIntegrationInfo(datosGrafica) {
         descripcion: "Aproxima usando cúbicas (n debe ser múltiplo de 3)",
         formula: "∫f(x)dx ≈ (3h/8)[f(x₀) + 3∑f(x₃ᵢ₋₂) + 3∑f(x₃ᵢ₋₁) + 2∑f(x₃ᵢ) + f(xₙ)]",
       },
+      adaptativo: {
+        nombre: "Cuadratura adaptativa Gauss–Kronrod 7/15",
+        descripcion: "Divide solo los subintervalos con mayor error estimado (h es el más pequeño)",
+        formula: "∫f(x)dx ≈ ∑ⱼ K₁₅(aⱼ, bⱼ),  Eⱼ = |K₁₅ − G₇|",
+      },
+      romberg: {
+        nombre: "Método de Romberg",
+        descripcion: "Extrapolación de Richardson sobre trapecios con malla duplicada (se muestran los nodos iniciales)",
+        formula: "R(k, j) = R(k, j−1) + [R(k, j−1) − R(k−1, j−1)] / (4ʲ − 1)",
+      },
+      gauss_legendre: {
+        nombre: "Cuadratura de Gauss–Legendre compuesta",
+        descripcion: "Nodos y pesos de Gauss trasladados a cada subintervalo (los rombos son los nodos evaluados)",
+        formula: "∫f(x)dx ≈ (h/2) ∑ᵢ ∑ⱼ wⱼ f(cᵢ + (h/2) tⱼ)",
+      },
+      tabulado: {
+        nombre: "Integración de datos tabulados",
+        descripcion: "Serie reducida de los datos leídos (la integral usa todos los puntos; h es el ancho promedio)",
+        formula: datosGrafica.regla === "simpson13"
+          ? "Simpson no uniforme: (h₀+h₁)/6 [(2 − h₁/h₀) y₀ + (h₀+h₁)²/(h₀h₁) y₁ + (2 − h₀/h₁) y₂]"
+          : "∫y dx ≈ ∑ (xᵢ₊₁ − xᵢ)(yᵢ + yᵢ₊₁)/2",
+      },
+      comparacion: {
+        nombre: "Comparación de reglas de Newton–Cotes",
+        descripcion: "Trapecio, Simpson 1/3 y Simpson 3/8 sobre los mismos nodos (n múltiplo de 6)",
+        formula: "∫f(x)dx ≈ k·h ∑ cᵢ f(xᵢ), con los coeficientes cᵢ de cada regla",
+      },
     }
 
     const info = metodosInfo[datosGrafica.metodo] || metodosInfo["trapecio"]
@@ -251,6 +381,111 @@ function showIntegrationInfo(datosGrafica) {
   }
 }
 
+// Estudio de convergencia: n = n₀, 2n₀, 4n₀, ... con mallas anidadas (gráfica log–log)
+function cargarEstudioConvergencia(boton) {
+  const graphDiv = document.getElementById("convergence-graph")
+  const tablaDiv = document.getElementById("convergence-table")
+  if (!graphDiv || !boton) return
+
+  const mathField = document.getElementById("funcion")
+  const csrf = document.querySelector("[name=csrfmiddlewaretoken]")
+  const referencia = document.getElementById("valor_referencia")
+  const datos = {
+    funcion: mathField ? mathField.value : "",
+    a: parseFloat(document.getElementById("a").value),
+    b: parseFloat(document.getElementById("b").value),
+    metodo: boton.dataset.metodo,
+    n_inicial: parseInt(boton.dataset.nInicial, 10),
+    niveles: 16,
+    valor_referencia: referencia ? referencia.value : "",
+  }
+
+  boton.disabled = true
+  fetch(boton.dataset.url, {
+    method: "POST",
+    headers: {
+      "Content-Type": "application/json",
+      "X-CSRFToken": csrf ? csrf.value : "",
+    },
+    body: JSON.stringify(datos),
+  })
+    .then((respuesta) => respuesta.json())
+    .then((estudio) => {
+      if (estudio.error) {
+        tablaDiv.innerHTML = `<div class="alert alert-danger">${estudio.error}</div>`
+        return
+      }
+      dibujarEstudioConvergencia(estudio, graphDiv, tablaDiv)
+    })
+    .catch(() => {
+      tablaDiv.innerHTML = '<div class="alert alert-danger">No se pudo calcular el estudio de convergencia</div>'
+    })
+    .finally(() => {
+      boton.disabled = false
+    })
+}
+
+function dibujarEstudioConvergencia(estudio, graphDiv, tablaDiv) {
+  const grafica = estudio.grafica
+  const etiqueta = grafica.tipo === "error" ? "Error |Iₙ − I|" : "Diferencia |Iₙ − Iₙ/₂|"
+  const traces = [
+    {
+      x: grafica.n,
+      y: grafica.valores,
+      type: "scatter",
+      mode: "lines+markers",
+      name: etiqueta,
+      line: { color: "#007bff", width: 2 },
+      hovertemplate: "n=%{x}<br>%{y:.3e}<extra></extra>",
+    },
+  ]
+
+  // Recta de referencia con la pendiente del orden teórico: C·n^(−p)
+  if (grafica.n.length > 0) {
+    const n0 = grafica.n[0]
+    const y0 = grafica.valores[0]
+    const p = estudio.orden_teorico
+    traces.push({
+      x: grafica.n,
+      y: grafica.n.map((n) => y0 * Math.pow(n0 / n, p)),
+      type: "scatter",
+      mode: "lines",
+      name: `Pendiente −${p}`,
+      line: { color: "#dc3545", width: 1, dash: "dash" },
+      hoverinfo: "skip",
+    })
+  }
+
+  Plotly.newPlot(graphDiv, traces, {
+    xaxis: { title: "n", type: "log", gridcolor: "#e0e0e0" },
+    yaxis: { title: etiqueta, type: "log", exponentformat: "e", gridcolor: "#e0e0e0" },
+    plot_bgcolor: "#fafafa",
+    paper_bgcolor: "#ffffff",
+    margin: { t: 30 },
+    height: 400,
+  }, { responsive: true, displayModeBar: false })
+
+  const formato = (valor, digitos) => (valor === null || valor === undefined ? "—" : valor.toFixed(digitos))
+  const filas = estudio.niveles.map((nivel) => `
+        <tr>
+            <td>${nivel.n}</td>
+            <td>${nivel.estimacion.toFixed(12)}</td>
+            <td>${nivel.diferencia === null ? "—" : nivel.diferencia.toExponential(3)}</td>
+            <td>${formato(grafica.tipo === "error" ? nivel.orden_error : nivel.orden_observado, 3)}</td>
+        </tr>`).join("")
+  tablaDiv.innerHTML = `
+        <p class="small text-muted mt-2 mb-1">
+            Evaluaciones de f: ${estudio.evaluaciones} (sin reutilizar nodos: ${estudio.evaluaciones_sin_reutilizar}) ·
+            orden teórico: ${estudio.orden_teorico}
+        </p>
+        <table class="table table-sm table-bordered text-center">
+            <thead class="table-light">
+                <tr><th>n</th><th>Estimación</th><th>Diferencia</th><th>Orden observado</th></tr>
+            </thead>
+            <tbody>${filas}</tbody>
+        </table>`
+}
+
 // Función para actualizar tema de la gráfica de integración
 function updateIntegrationGraphTheme(isDark) {
   if (!integrationPlot) return
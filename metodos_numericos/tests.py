@@ -1,3 +1,1256 @@
-from django.test import TestCase
+import io
+import json
+import math
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+from unittest import mock, skipIf
 
-# Create your tests here.
+import numpy as np
+from django.conf import settings
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import SimpleTestCase, TestCase
+from django.urls import reverse
+
+from metodos_numericos.mathlive import a_texto, compilar_numpy, parsear
+from metodos_numericos.sandbox import LimiteExcedido, PoolSandbox, _Trabajador, resource
+from metodos_numericos.utils import (MAX_NODOS_GAUSS, MAX_NODOS_RACIONAL, MAX_PRESUPUESTO_GRAFICA,
+                                     UMBRAL_INTEGRACION_BLOQUES, CacheExpresiones, ContextoEvaluacion,
+                                     HermiteCubicoPorTramos, InterpolanteHermite, _evaluar_funcion_nodos,
+                                     _muestreo_adaptativo, _newton_cotes_por_bloques, compilar_funcion,
+                                     diferencias_divididas_hermite, estadisticas_cache_expresiones,
+                                     estudio_convergencia, formatear_polinomio, generar_datos_grafica_hermite,
+                                     generar_datos_grafica_integracion, hermite_desde_funcion, integracion_compuesta,
+                                     integracion_doble, integracion_quasi_montecarlo, integracion_tabulada,
+                                     integral_acumulada, interpolacion_hermite, interpolacion_hermite_por_tramos,
+                                     interpolante_hermite_incremental, newton_a_monomios, nodos_gauss_legendre,
+                                     secuencia_halton, secuencia_sobol)
+
+
+def _hermite_referencia(puntos):
+    """Nodos duplicados y tabla 2n×2n de diferencias divididas de la implementación original"""
+    n = len(puntos)
+    z = [p[0] for p in puntos for _ in range(2)]
+    Q = [[0.0] * (2 * n) for _ in range(2 * n)]
+    for i, (_, f, df) in enumerate(puntos):
+        Q[2 * i][0] = Q[2 * i + 1][0] = f
+        Q[2 * i + 1][1] = df
+        if i > 0:
+            Q[2 * i][1] = (Q[2 * i][0] - Q[2 * i - 1][0]) / (z[2 * i] - z[2 * i - 1])
+    for i in range(2, 2 * n):
+        for j in range(2, i + 1):
+            Q[i][j] = (Q[i][j - 1] - Q[i - 1][j - 1]) / (z[i] - z[i - j])
+    return z, Q
+
+
+def _evaluar_newton(z, coeficientes, x):
+    resultado = coeficientes[-1]
+    for k in range(len(coeficientes) - 2, -1, -1):
+        resultado = resultado * (x - z[k]) + coeficientes[k]
+    return resultado
+
+
+def _puntos_seno(x_vals):
+    return [(float(x), float(np.sin(x)), float(np.cos(x))) for x in x_vals]
+
+
+class HermiteTests(SimpleTestCase):
+    """El motor vectorizado reproduce la tabla de diferencias divididas original"""
+
+    CASOS = [
+        [(0.0, 1.0, 0.0), (1.0, 2.0, 1.0)],
+        [(-1.0, 0.5, -2.0), (0.5, 1.5, 0.0), (2.0, -1.0, 3.0)],
+        _puntos_seno(np.linspace(0, 3, 6)),
+        [(1.0, 0.0, 1.0), (2.0, 0.6931471805599453, 0.5), (4.0, 1.3862943611198906, 0.25),
+         (5.5, 1.7047480922384253, 0.18181818181818182)],
+    ]
+
+    def test_coeficientes_iguales_a_la_implementacion_original(self):
+        for puntos in self.CASOS:
+            with self.subTest(n=len(puntos)):
+                z, Q = _hermite_referencia(puntos)
+                interpolante = InterpolanteHermite(*zip(*puntos))
+                np.testing.assert_allclose(interpolante.z, z)
+                np.testing.assert_allclose(np.asarray(interpolante.coeficientes, dtype=float), np.diag(Q),
+                                           rtol=1e-10, atol=1e-12)
+
+    def test_tabla_completa_solo_si_se_pide(self):
+        puntos = self.CASOS[3]
+        _, Q = _hermite_referencia(puntos)
+        coeficientes, _, tabla, _, cota = diferencias_divididas_hermite(*zip(*puntos), tabla=True)
+        np.testing.assert_allclose(tabla, Q, rtol=1e-10, atol=1e-12)
+        np.testing.assert_allclose(coeficientes, np.diag(Q), rtol=1e-10, atol=1e-12)
+        self.assertIsNone(cota)
+        self.assertIsNone(diferencias_divididas_hermite(*zip(*puntos))[2])
+
+    def test_resultado_igual_a_la_implementacion_original(self):
+        for puntos in self.CASOS:
+            x_eval = (puntos[0][0] + puntos[-1][0]) / 2 + 0.1
+            with self.subTest(n=len(puntos)):
+                resultado = interpolacion_hermite(puntos, x_eval)
+                z, Q = _hermite_referencia(puntos)
+                self.assertAlmostEqual(resultado['resultado'], _evaluar_newton(z, np.diag(Q), x_eval), places=9)
+                for clave in ('resultado', 'polinomio', 'polinomio_latex', 'pasos'):
+                    self.assertIn(clave, resultado)
+
+
+class EvaluacionHermiteTests(SimpleTestCase):
+    """H(x) y H'(x) se evalúan por Horner sobre la forma de Newton, sin sympy"""
+
+    def setUp(self):
+        # Con dos nodos el interpolante de Hermite reproduce cualquier cúbica
+        self.f = lambda x: x**3 - 2 * x + 1
+        self.df = lambda x: 3 * x**2 - 2
+        self.puntos = [(x, self.f(x), self.df(x)) for x in (0.0, 1.5)]
+        self.interpolante = InterpolanteHermite(*zip(*self.puntos))
+
+    def test_reproduce_una_cubica(self):
+        x = np.linspace(-2, 3, 11)
+        y, dy = self.interpolante.evaluar(x, derivada=True)
+        np.testing.assert_allclose(y, self.f(x), atol=1e-12)
+        np.testing.assert_allclose(dy, self.df(x), atol=1e-12)
+
+    def test_escalar_igual_a_arreglo(self):
+        x = np.array([-1.25, 0.3, 2.0])
+        y, dy = self.interpolante.evaluar(x, derivada=True)
+        for xi, yi, dyi in zip(x, y, dy):
+            p, dp = self.interpolante.evaluar(float(xi), derivada=True)
+            self.assertIsInstance(p, float)
+            self.assertAlmostEqual(p, yi, places=12)
+            self.assertAlmostEqual(dp, dyi, places=12)
+
+    def test_sin_expandir_ni_pasos(self):
+        resultado = interpolacion_hermite(self.puntos, 2.0, con_pasos=False, expandir=False, derivada=True)
+        self.assertAlmostEqual(resultado['resultado'], self.f(2.0))
+        self.assertAlmostEqual(resultado['derivada'], self.df(2.0))
+        self.assertIsNone(resultado['polinomio'])
+        self.assertIsNone(resultado['polinomio_latex'])
+        self.assertEqual(resultado['pasos'], [])
+
+
+class MonomiosHermiteTests(SimpleTestCase):
+    """Expansión de la forma de Newton a coeficientes monomiales con NumPy"""
+
+    def test_newton_a_monomios(self):
+        # 1 + 2(x - 1) + 3(x - 1)(x - 2) = 3x² - 7x + 5
+        np.testing.assert_allclose(newton_a_monomios([1.0, 2.0, 3.0], np.array([1.0, 2.0])), [5, -7, 3])
+
+    def test_polinomio_de_una_cubica(self):
+        puntos = [(0.0, 1.0, -2.0), (1.5, 1.375, 4.75)]
+        interpolante = InterpolanteHermite(*zip(*puntos))
+        np.testing.assert_allclose(interpolante.coeficientes_monomiales(), [1, -2, 0, 1], atol=1e-12)
+        self.assertEqual(interpolante.polinomio_texto(), 'x**3 - 2*x + 1')
+        self.assertEqual(interpolante.polinomio_latex(), 'x^{3} - 2 x + 1')
+        resultado = interpolacion_hermite(puntos, 1.0)
+        self.assertEqual(resultado['polinomio'], 'x**3 - 2*x + 1')
+        self.assertIn('$$H(x) = x^{3} - 2 x + 1$$', resultado['pasos'])
+
+    def test_formatear_polinomio(self):
+        self.assertEqual(formatear_polinomio([0.0, 0.0]), '0')
+        self.assertEqual(formatear_polinomio([-1.5, 0.0, 2.25e-7]), '2.25e-07*x**2 - 1.5')
+        self.assertEqual(formatear_polinomio([1 / 3, 1.0], precision=3), 'x + 0.333')
+
+
+class HermiteEvaluarTests(TestCase):
+    """Endpoint /hermite/evaluar/: muchas abscisas con una sola construcción"""
+
+    PUNTOS = [[0.0, 1.0, -2.0], [1.5, 1.375, 4.75]]  # x³ - 2x + 1
+
+    def setUp(self):
+        self.url = reverse('metodos_numericos:hermite_evaluar')
+
+    def enviar(self, datos):
+        return self.client.post(self.url, json.dumps(datos), content_type='application/json')
+
+    def test_valores_y_derivadas(self):
+        x = [-1.0, 0.5, 2.0]
+        respuesta = self.enviar({'puntos': self.PUNTOS, 'x': x, 'derivada': True})
+        self.assertEqual(respuesta.status_code, 200)
+        datos = respuesta.json()
+        self.assertEqual(datos['x'], x)
+        self.assertEqual(datos['grado'], 3)
+        np.testing.assert_allclose(datos['H'], [2.0, 0.125, 5.0], atol=1e-12)
+        np.testing.assert_allclose(datos['dH'], [1.0, -1.25, 10.0], atol=1e-12)
+
+    def test_formulario_y_formato_binario(self):
+        respuesta = self.client.post(self.url, {'puntos': '0,1,-2;1.5,1.375,4.75', 'x': '0.5;2', 'formato': 'binario'})
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertEqual(respuesta['X-Columnas'], 'x,H')
+        filas = np.frombuffer(respuesta.content, dtype='<f8').reshape(int(respuesta['X-Filas']), 2)
+        np.testing.assert_allclose(filas, [[0.5, 0.125], [2.0, 5.0]], atol=1e-12)
+
+    def test_desborde_como_null(self):
+        respuesta = self.enviar({'puntos': self.PUNTOS, 'x': [1.0, 1e200], 'derivada': True})
+        self.assertEqual(respuesta.status_code, 200)
+        datos = json.loads(respuesta.content, parse_constant=lambda c: self.fail(f'JSON inválido: {c}'))
+        self.assertAlmostEqual(datos['H'][0], 0.0)
+        self.assertIsNone(datos['H'][1])
+        self.assertIsNone(datos['dH'][1])
+
+    def test_entrada_invalida(self):
+        # Import local: los trabajadores del sandbox importan este módulo sin
+        # configurar Django y api.py carga los modelos
+        from metodos_numericos.api import MAX_NODOS_HERMITE, MAX_PUNTOS_EVALUACION
+        casos = {
+            'un solo punto': {'puntos': self.PUNTOS[:1], 'x': [0.5]},
+            'x repetidos': {'puntos': [[0, 1, 0], [0, 2, 1]], 'x': [0.5]},
+            'sin abscisas': {'puntos': self.PUNTOS, 'x': []},
+            'abscisa no finita': {'puntos': self.PUNTOS, 'x': 'inf'},
+            'nodo no finito': {'puntos': [[0, 1, 0], [1, 'nan', 1]], 'x': [0.5]},
+            'demasiadas abscisas': {'puntos': self.PUNTOS, 'x': [0.5] * (MAX_PUNTOS_EVALUACION + 1)},
+            'demasiados nodos': {'puntos': [[i, 0, 0] for i in range(MAX_NODOS_HERMITE + 1)], 'x': [0.5]},
+        }
+        for nombre, datos in casos.items():
+            with self.subTest(nombre):
+                respuesta = self.enviar(datos)
+                self.assertEqual(respuesta.status_code, 400)
+                self.assertIn('error', respuesta.json())
+
+    def test_cuerpo_que_no_es_objeto(self):
+        respuesta = self.enviar([self.PUNTOS])
+        self.assertEqual(respuesta.status_code, 400)
+
+
+class HermiteIncrementalTests(SimpleTestCase):
+    """Agregar nodos a un estado guardado equivale a reconstruir el interpolante"""
+
+    def test_agregar_puntos_igual_a_reconstruir(self):
+        puntos = _puntos_seno(np.linspace(0, 3, 8))
+        estado = json.loads(json.dumps(interpolante_hermite_incremental(puntos[:3]).a_dict()))
+        incremental = interpolante_hermite_incremental(puntos, estado)
+        completo = InterpolanteHermite(*zip(*puntos), umbral_precision=1e-8)
+        self.assertEqual(incremental.nodos_agregados, 5)
+        self.assertEqual(incremental.puntos, completo.puntos)
+        np.testing.assert_allclose(np.asarray(incremental.coeficientes, dtype=float),
+                                   np.asarray(completo.coeficientes, dtype=float), rtol=1e-13, atol=1e-15)
+        self.assertEqual(incremental.precision['nivel'], completo.precision['nivel'])
+        x = np.linspace(0, 3, 17)
+        np.testing.assert_allclose(incremental.evaluar(x), completo.evaluar(x), rtol=1e-12, atol=1e-14)
+
+    def test_estado_con_otros_nodos_se_reconstruye(self):
+        puntos = _puntos_seno(np.linspace(0, 3, 5))
+        estado = interpolante_hermite_incremental(_puntos_seno([0.0, 0.7])).a_dict()
+        interpolante = interpolante_hermite_incremental(puntos, estado)
+        self.assertEqual(interpolante.nodos_agregados, 0)
+        self.assertEqual(interpolante.puntos, [tuple(p) for p in puntos])
+
+    def test_estado_escalado_es_json(self):
+        # 60 nodos a 0.01: por encima de MAX_NODOS_RACIONAL se conservan los coeficientes longdouble
+        puntos = _puntos_seno(np.arange(60) * 0.01)
+        interpolante = interpolante_hermite_incremental(puntos)
+        self.assertNotEqual(interpolante.precision['nivel'], 'float64')
+        estado = json.loads(json.dumps(interpolante.a_dict()))
+        recuperado = interpolante_hermite_incremental(puntos, estado)
+        self.assertEqual(recuperado.precision['nivel'], interpolante.precision['nivel'])
+
+    def test_pasos_con_tabla_sin_estado(self):
+        puntos = _puntos_seno(np.linspace(0, 3, 4))
+        for estado in (None, interpolante_hermite_incremental(_puntos_seno([5.0, 6.0])).a_dict(),
+                       interpolante_hermite_incremental(puntos).a_dict()):
+            interpolante = interpolante_hermite_incremental(puntos, estado, tabla=True)
+            pasos = interpolacion_hermite(puntos, 1.0, interpolante=interpolante)['pasos']
+            self.assertIn("   Xi    |  F[Xi]  |  Primera D.D  |  ...", pasos)
+            self.assertFalse(any('incremental' in linea for linea in pasos))
+
+    def test_pasos_con_nodos_agregados(self):
+        puntos = _puntos_seno(np.linspace(0, 3, 5))
+        estado = interpolante_hermite_incremental(puntos[:3]).a_dict()
+        interpolante = interpolante_hermite_incremental(puntos, estado, tabla=True)
+        pasos = interpolacion_hermite(puntos, 1.0, interpolante=interpolante)['pasos']
+        self.assertIn("   (2 nodos agregados de forma incremental: se muestran la diagonal y la última fila)", pasos)
+
+
+class HermiteVistaTests(TestCase):
+    """Vista /hermite/: el interpolante de un ejercicio guardado se conserva en la sesión"""
+
+    def test_sesion_con_nodos_agrupados(self):
+        url = reverse('metodos_numericos:hermite_id', args=[7])
+        # 60 nodos a 0.01 se quedan en longdouble; el segundo envío agrega un nodo
+        for n in (60, 61):
+            puntos = _puntos_seno(np.arange(n) * 0.01)
+            datos = ';'.join(','.join(repr(v) for v in p) for p in puntos)
+            with self.subTest(n=n):
+                respuesta = self.client.post(url, {'puntos': datos, 'x_eval': '0.05'})
+                self.assertEqual(respuesta.status_code, 200)
+                estado = self.client.session['hermite_interpolante_7']
+                self.assertEqual(len(estado['x']), n)
+                self.assertAlmostEqual(respuesta.context['resultado'], np.sin(0.05), places=6)
+
+
+class HermitePorTramosTests(SimpleTestCase):
+    """Hermite cúbico por tramos para conjuntos grandes de puntos"""
+
+    def test_reproduce_una_cubica(self):
+        f = lambda x: 2 * x**3 - x**2 + 3
+        df = lambda x: 6 * x**2 - 2 * x
+        x_nodos = np.array([-2.0, -0.5, 0.1, 1.0, 2.5])
+        # Los nodos desordenados se ordenan al construir
+        interpolante = HermiteCubicoPorTramos(x_nodos[::-1], f(x_nodos[::-1]), df(x_nodos[::-1]))
+        x = np.linspace(-3, 3, 25)
+        y, dy = interpolante.evaluar(x, derivada=True)
+        np.testing.assert_allclose(y, f(x), atol=1e-10)
+        np.testing.assert_allclose(dy, df(x), atol=1e-10)
+        self.assertIsInstance(interpolante.evaluar(0.3), float)
+
+    def test_busqueda_del_tramo(self):
+        interpolante = HermiteCubicoPorTramos([0.0, 1.0, 2.0, 3.0], [0.0] * 4, [0.0] * 4)
+        np.testing.assert_array_equal(interpolante.tramo(np.array([-1.0, 0.0, 0.5, 1.0, 2.9, 3.0, 7.0])),
+                                      [0, 0, 0, 1, 2, 2, 2])
+
+    def test_nodos_invalidos(self):
+        with self.assertRaises(ValueError):
+            HermiteCubicoPorTramos([0.0], [1.0], [0.0])
+        with self.assertRaises(ValueError):
+            HermiteCubicoPorTramos([0.0, 1.0, 1.0], [0.0] * 3, [0.0] * 3)
+
+    def test_resultado(self):
+        puntos = _puntos_seno(np.linspace(0, 10, 201))
+        resultado = interpolacion_hermite_por_tramos(puntos, 3.33)
+        self.assertAlmostEqual(resultado['resultado'], np.sin(3.33), places=7)
+        self.assertIsNone(resultado['polinomio'])
+        self.assertEqual(resultado['tramo'], 'Tramo 66: [3.3000000000000003, 3.35]')
+        self.assertIn(f"$$H_{{66}}(x) = {resultado['polinomio_latex']}$$", resultado['pasos'])
+        self.assertEqual(interpolacion_hermite_por_tramos(puntos, 3.33, con_pasos=False)['pasos'], [])
+
+    def test_puntos_de_la_grafica(self):
+        for n, esperado in ((5, 120), (101, 800), (10001, MAX_PRESUPUESTO_GRAFICA)):
+            puntos = _puntos_seno(np.linspace(0, 10, n))
+            interpolante = HermiteCubicoPorTramos(*zip(*puntos))
+            with self.subTest(n=n):
+                datos = generar_datos_grafica_hermite(puntos, interpolante, 1.0)
+                self.assertEqual(len(datos['curva_x']), esperado)
+                self.assertAlmostEqual(datos['eval_y'], interpolante.evaluar(1.0))
+
+
+class HermiteLoteTests(TestCase):
+    """Endpoint /hermite/lote/: resultados por conjunto y errores de entrada como 400"""
+
+    def setUp(self):
+        self.url = reverse('metodos_numericos:hermite_lote')
+
+    def enviar(self, datos):
+        return self.client.post(self.url, json.dumps(datos), content_type='application/json')
+
+    def test_conjuntos_del_mismo_tamano(self):
+        conjuntos = [_puntos_seno([0.0, 1.0, 2.0]), _puntos_seno([0.5, 1.5, 2.5])]
+        respuesta = self.enviar({'datos': conjuntos, 'x': 1.2, 'derivada': True})
+        self.assertEqual(respuesta.status_code, 200)
+        datos = respuesta.json()
+        for conjunto, resultado, derivada in zip(conjuntos, datos['resultados'], datos['derivadas']):
+            esperado, desperado = InterpolanteHermite(*zip(*conjunto)).evaluar(1.2, derivada=True)
+            self.assertAlmostEqual(float(np.ravel(resultado)[0]), float(esperado), places=10)
+            self.assertAlmostEqual(float(np.ravel(derivada)[0]), float(desperado), places=9)
+
+    def test_conjuntos_de_tamanos_distintos(self):
+        conjuntos = [_puntos_seno([0.0, 1.0]), _puntos_seno([0.0, 1.0, 2.0, 3.0])]
+        respuesta = self.enviar({'datos': conjuntos, 'x': [0.5, 2.5]})
+        self.assertEqual(respuesta.status_code, 200)
+        resultados = respuesta.json()['resultados']
+        for conjunto, x, resultado in zip(conjuntos, (0.5, 2.5), resultados):
+            esperado = InterpolanteHermite(*zip(*conjunto)).evaluar(x)
+            self.assertAlmostEqual(float(np.ravel(resultado)[0]), float(esperado), places=10)
+
+    def test_entrada_mal_formada(self):
+        casos = {
+            'sin conjuntos': {'datos': []},
+            'puntos de dos valores': {'datos': [[[0, 1], [1, 2]]]},
+            'puntos de cuatro valores': {'datos': [[[0, 1, 0, 9], [1, 2, 1, 9]]]},
+            'conjunto irregular': {'datos': [[[0, 1, 0]], [[0, 1]]]},
+            'texto en lugar de números': {'datos': [[['a', 1, 0], [1, 2, 1]]]},
+            'x con demasiadas dimensiones': {'datos': [[[0, 1, 0], [1, 2, 1]]], 'x': [[[0.5]]]},
+        }
+        for nombre, datos in casos.items():
+            with self.subTest(nombre):
+                respuesta = self.enviar(datos)
+                self.assertEqual(respuesta.status_code, 400)
+                self.assertIn('error', respuesta.json())
+
+    def test_limites_del_lote(self):
+        from metodos_numericos.api import (MAX_CONJUNTOS_LOTE, MAX_NODOS_HERMITE, MAX_NODOS_LOTE,
+                                           MAX_PUNTOS_EVALUACION)
+        conjunto = [[0, 1, 0], [1, 2, 1]]
+        grande = [[i, 0, 0] for i in range(MAX_NODOS_HERMITE)]
+        casos = {
+            'conjuntos': {'datos': [conjunto] * (MAX_CONJUNTOS_LOTE + 1)},
+            'puntos de evaluación': {'datos': [conjunto], 'x': [0.0] * (MAX_PUNTOS_EVALUACION + 1)},
+            'nodos por conjunto': {'datos': [grande + [[-1, 0, 0]]]},
+            'nodos en total': {'datos': [grande] * (MAX_NODOS_LOTE // MAX_NODOS_HERMITE + 1)},
+        }
+        for nombre, datos in casos.items():
+            with self.subTest(nombre):
+                respuesta = self.enviar(datos)
+                self.assertEqual(respuesta.status_code, 400)
+                self.assertIn('máximo', respuesta.json()['error'])
+
+    def test_cuerpo_que_no_es_objeto(self):
+        respuesta = self.enviar([[[0, 1, 0], [1, 2, 1]]])
+        self.assertEqual(respuesta.status_code, 400)
+
+    def test_desborde_como_null(self):
+        respuesta = self.enviar({'datos': [[[0, 1, 0], [1, 2, 1]]], 'x': [[1e200]]})
+        self.assertEqual(respuesta.status_code, 200)
+        datos = json.loads(respuesta.content, parse_constant=lambda c: self.fail(f'JSON inválido: {c}'))
+        self.assertIsNone(datos['resultados'][0][0])
+
+    def test_solo_post(self):
+        self.assertEqual(self.client.get(self.url).status_code, 405)
+
+
+class GraficaHermiteTests(SimpleTestCase):
+    """La gráfica evalúa el interpolante ya construido, con muestreo adaptativo"""
+
+    def test_curva_del_interpolante(self):
+        x = np.linspace(-1, 1, 9)
+        puntos = list(zip(x, 1 / (1 + 25 * x**2), -50 * x / (1 + 25 * x**2)**2))
+        interpolante = InterpolanteHermite(*zip(*puntos))
+        datos = generar_datos_grafica_hermite(puntos, interpolante, 0.3)
+        curva_x = np.array(datos['curva_x'])
+        self.assertEqual((datos['x_min'], datos['x_max']), (-2.0, 2.0))
+        self.assertEqual((curva_x[0], curva_x[-1]), (-2.0, 2.0))
+        self.assertTrue(np.all(np.diff(curva_x) > 0))
+        # Los valores se redondean a 7 cifras: se comparan en el rango de los nodos,
+        # donde la curva no tiene las pendientes enormes de la extrapolación
+        dentro = np.abs(curva_x) <= 1
+        np.testing.assert_allclose(np.array(datos['curva_y'])[dentro], interpolante.evaluar(curva_x[dentro]),
+                                   rtol=1e-6, atol=1e-6)
+        self.assertAlmostEqual(datos['eval_y'], interpolante.evaluar(0.3))
+        self.assertLessEqual(datos['y_min'], min(datos['curva_y']))
+        self.assertGreaterEqual(datos['y_max'], max(datos['curva_y']))
+
+    def test_muestreo_mas_denso_donde_hay_curvatura(self):
+        x = np.linspace(-3, 3, 301)
+        interpolante = HermiteCubicoPorTramos(x, np.exp(-20 * x**2), -40 * x * np.exp(-20 * x**2))
+        muestra = _muestreo_adaptativo(interpolante, -3.0, 3.0, 200)
+        self.assertEqual(len(muestra), 200)
+        # La campana ocupa una décima del rango pero recibe muchos más puntos
+        self.assertGreater(np.sum(np.abs(muestra) < 0.3), 3 * np.sum(np.abs(muestra - 2.4) < 0.3))
+
+    def test_datos_invalidos(self):
+        self.assertIsNone(generar_datos_grafica_hermite([], None, 0.0))
+
+
+class PrecisionHermiteTests(SimpleTestCase):
+    """Escalado de precisión (float64, longdouble, racional) solo cuando hace falta"""
+
+    def construir(self, x, f, df):
+        return InterpolanteHermite(x, f, df, umbral_precision=1e-8)
+
+    def alternante(self, n):
+        # Valores ±1 en nodos separados 0.01: diferencias divididas enormes y con cancelación
+        return np.arange(n) * 0.01, (-1.0) ** np.arange(n), np.zeros(n)
+
+    def test_sin_umbral_no_se_controla(self):
+        self.assertIsNone(InterpolanteHermite([0.0, 1.0], [0.0, 1.0], [1.0, 1.0]).precision)
+
+    def test_bien_condicionado(self):
+        x = np.arange(8) * 0.3
+        precision = self.construir(x, np.sin(x), np.cos(x)).precision
+        self.assertEqual(precision['nivel'], 'float64')
+        self.assertEqual(len(precision['niveles']), 1)
+        self.assertIsNone(precision['niveles'][0]['error_medido'])
+
+    def test_cota_pesimista_confirmada_en_la_malla(self):
+        # La cota a priori supera el umbral, pero el error medido contra longdouble no
+        x = np.arange(20) * 0.1
+        precision = self.construir(x, np.sin(x), np.cos(x)).precision
+        self.assertEqual(precision['nivel'], 'float64')
+        nivel = precision['niveles'][0]
+        self.assertGreater(nivel['cota_a_priori'], 1e-8)
+        self.assertLessEqual(nivel['error_medido'], 1e-8)
+        self.assertEqual(precision['error_estimado'], nivel['error_medido'])
+
+    def test_racional_hasta_el_tope(self):
+        interpolante = self.construir(*self.alternante(15))
+        self.assertEqual([nivel['nivel'] for nivel in interpolante.precision['niveles']],
+                         ['float64', 'longdouble', 'racional'])
+        self.assertEqual(interpolante.precision['error_estimado'], 0.0)
+        # Con los coeficientes exactos H reproduce los datos en los nodos
+        for x, f in zip(*self.alternante(15)[:2]):
+            self.assertAlmostEqual(interpolante.evaluar(x), f, places=12)
+
+    def test_sin_racional_por_encima_del_tope(self):
+        x, f, df = self.alternante(MAX_NODOS_RACIONAL + 2)
+        interpolante = self.construir(x, f, df)
+        self.assertNotIn('racional', [nivel['nivel'] for nivel in interpolante.precision['niveles']])
+        pasos = interpolacion_hermite(list(zip(x, f, df)), 0.05, interpolante=interpolante)['pasos']
+        self.assertIn(f"   Umbral de error relativo: 1e-08; la aritmética racional solo se usa hasta "
+                      f"{MAX_NODOS_RACIONAL} nodos", pasos)
+        self.assertIn(f"   El error estimado supera el umbral: con {len(x)} nodos se conserva el mejor "
+                      "nivel de punto flotante", pasos)
+
+
+class HermiteDesdeFuncionTests(SimpleTestCase):
+    def test_reproduce_cubicas_con_dos_nodos(self):
+        resultado = hermite_desde_funcion('x**3-x', 0, 2, 2, 1.5)
+        self.assertAlmostEqual(resultado['resultado'], 1.5 ** 3 - 1.5, places=12)
+        self.assertLess(resultado['error_max'], 1e-12)
+        self.assertEqual(resultado['pasos'][0], "=== INTERPOLACIÓN DE HERMITE DE UNA FUNCIÓN ===")
+
+    def test_chebyshev_reduce_el_error_de_runge(self):
+        errores = {estrategia: hermite_desde_funcion('1/(1+25*x**2)', -1, 1, 10, 0.3, estrategia=estrategia,
+                                                     con_pasos=False)['error_max']
+                   for estrategia in ('equiespaciado', 'chebyshev')}
+        self.assertLess(errores['chebyshev'], errores['equiespaciado'] / 10)
+
+    def test_funcion_suave_sin_pasos(self):
+        resultado = hermite_desde_funcion('sin(x)', 0, 3, 6, 1.0, con_pasos=False)
+        self.assertEqual(resultado['pasos'], [])
+        self.assertAlmostEqual(resultado['resultado'], np.sin(1.0), places=8)
+        self.assertLess(resultado['error_max'], 1e-8)
+
+    def test_errores(self):
+        for argumentos in [('sin(x)', 0, 1, 1), ('sin(x)', 1, 0, 3), ('1/x', 0, 1, 3)]:
+            with self.assertRaises(ValueError):
+                hermite_desde_funcion(*argumentos, 0.5)
+        with self.assertRaises(ValueError):
+            hermite_desde_funcion('sin(x)', 0, 1, 3, 0.5, estrategia='aleatorio')
+
+
+_ENCABEZADO = r"""=== INTEGRACIÓN NUMÉRICA COMPUESTA - {metodo} ===
+Función: $$f(x) = x^{{2}} + 1$$
+Intervalo: $[0, 1]$
+Número de subintervalos: $n = {n}$
+Ancho de subintervalo: $$h = \frac{{b-a}}{{n}} = \frac{{1-0}}{{{n}}} = {h}$$
+"""
+
+# Pasos de la implementación original para ∫_0^1 (x² + 1) dx
+_PASOS_ORIGINALES = {
+    ('trapecio', 4): r"""
+Fórmula del trapecio compuesto:
+$$\int_a^b f(x)dx \approx \frac{h}{2}\left[f(x_0) + 2\sum_{i=1}^{n-1}f(x_i) + f(x_n)\right]$$
+
+Evaluación de la función en los puntos:
+f(x_0) = f(0.0000) = 1.000000
+f(x_1) = f(0.2500) = 1.062500
+f(x_2) = f(0.5000) = 1.250000
+f(x_3) = f(0.7500) = 1.562500
+f(x_4) = f(1.0000) = 2.000000
+
+Aplicando la fórmula:
+f(x₀) + f(xₙ) = 1.000000 + 2.000000 = 3.000000
+2∑f(xᵢ) = 2 × 3.875000 = 7.750000
+Suma total = 10.750000
+$$\mathrm{Resultado} = \frac{h}{2} \times \text{suma} = \frac{0.250000}{2} \times 10.750000 = 1.34375000$$""",
+    ('simpson13', 4): r"""
+Fórmula de Simpson 1/3 compuesta:
+$$\int_a^b f(x)dx \approx \frac{h}{3}\left[f(x_0) + 4\sum_{i=1}^{n/2}f(x_{2i-1}) + 2\sum_{i=1}^{n/2-1}f(x_{2i}) + f(x_n)\right]$$
+
+Evaluación de la función en los puntos:
+f(x_0) = f(0.0000) = 1.000000
+f(x_1) = f(0.2500) = 1.062500
+f(x_2) = f(0.5000) = 1.250000
+f(x_3) = f(0.7500) = 1.562500
+f(x_4) = f(1.0000) = 2.000000
+
+Aplicando la fórmula:
+f(x₀) + f(xₙ) = 1.000000 + 2.000000 = 3.000000
+4∑f(x₂ᵢ₋₁) = 4 × 2.625000 = 10.500000
+2∑f(x₂ᵢ) = 2 × 1.250000 = 2.500000
+Suma total = 16.000000
+$$\mathrm{Resultado} = \frac{h}{3} \times \text{suma} = \frac{0.250000}{3} \times 16.000000 = 1.33333333$$""",
+    ('simpson38', 6): r"""
+Fórmula de Simpson 3/8 compuesta:
+$$\int_a^b f(x)dx \approx \frac{3h}{8}\left[f(x_0) + 3\sum_{i=1}^{n/3}f(x_{3i-2}) + 3\sum_{i=1}^{n/3}f(x_{3i-1}) + 2\sum_{i=1}^{n/3-1}f(x_{3i}) + f(x_n)\right]$$
+
+Evaluación de la función en los puntos:
+f(x_0) = f(0.0000) = 1.000000
+f(x_1) = f(0.1667) = 1.027778
+f(x_2) = f(0.3333) = 1.111111
+f(x_3) = f(0.5000) = 1.250000
+f(x_4) = f(0.6667) = 1.444444
+f(x_5) = f(0.8333) = 1.694444
+f(x_6) = f(1.0000) = 2.000000
+
+Aplicando la fórmula:
+f(x₀) + f(xₙ) = 1.000000 + 2.000000 = 3.000000
+3∑f(x₃ᵢ₋₂) = 3 × 2.472222 = 7.416667
+3∑f(x₃ᵢ₋₁) = 3 × 2.805556 = 8.416667
+2∑f(x₃ᵢ) = 2 × 1.250000 = 2.500000
+Suma total = 21.333333
+$$\mathrm{Resultado} = \frac{3h}{8} \times \text{suma} = \frac{3\times0.166667}{8} \times 21.333333 = 1.33333333$$""",
+}
+
+
+class IntegracionCompuestaTests(SimpleTestCase):
+    """Las reglas compuestas muestran los mismos pasos que la implementación original"""
+
+    def test_pasos_sin_cambios(self):
+        for (metodo, n), cuerpo in _PASOS_ORIGINALES.items():
+            with self.subTest(metodo):
+                resultado = integracion_compuesta('x**2+1', 0, 1, n, metodo)
+                esperado = _ENCABEZADO.format(metodo=metodo.upper(), n=n, h=f'{1 / n:.6f}') + cuerpo
+                self.assertEqual(resultado['pasos'], esperado.split('\n'))
+
+    def test_resultados(self):
+        self.assertAlmostEqual(integracion_compuesta('x**2+1', 0, 1, 4, 'trapecio')['resultado'], 1.34375)
+        self.assertAlmostEqual(integracion_compuesta('x**2+1', 0, 1, 4, 'simpson13')['resultado'], 4 / 3)
+        self.assertAlmostEqual(integracion_compuesta('x**2+1', 0, 1, 6, 'simpson38')['resultado'], 4 / 3)
+
+    def test_n_invalido(self):
+        with self.assertRaises(ValueError):
+            integracion_compuesta('x', 0, 1, 5, 'simpson13')
+        with self.assertRaises(ValueError):
+            integracion_compuesta('x', 0, 1, 4, 'simpson38')
+
+    def test_funcion_constante(self):
+        for metodo, n in [('trapecio', 4), ('simpson13', 4), ('simpson38', 6)]:
+            self.assertAlmostEqual(integracion_compuesta('5', 0, 2, n, metodo)['resultado'], 10.0)
+
+    def test_evaluacion_escalar_por_bloques(self):
+        # math.exp no admite arreglos: se evalúa nodo a nodo en bloques de 3
+        x_vals, f_vals = _evaluar_funcion_nodos(math.exp, 0.0, 0.1, 10, tamano_bloque=3)
+        np.testing.assert_allclose(x_vals, np.arange(11) * 0.1)
+        np.testing.assert_allclose(f_vals, np.exp(x_vals))
+
+    def test_n_grande(self):
+        resultado = integracion_compuesta('sin(x)', 0, np.pi, 50_000, 'simpson13', con_pasos=False)
+        self.assertAlmostEqual(resultado['resultado'], 2.0, places=12)
+        self.assertIsInstance(resultado['resultado'], float)
+
+
+class CacheExpresionesTests(SimpleTestCase):
+    def test_aciertos_y_fallos(self):
+        cache = CacheExpresiones(capacidad=2)
+        compilada = cache.obtener('x^2')
+        # La clave es la cadena normalizada: las variantes de la misma entrada aciertan
+        self.assertIs(cache.obtener('x^{2}'), compilada)
+        self.assertEqual(cache.estadisticas(), {'aciertos': 1, 'fallos': 1, 'entradas': 1, 'capacidad': 2})
+        self.assertEqual(compilada.texto, 'x**2')
+        self.assertEqual(compilada.f(3.0), 9.0)
+
+    def test_descarta_la_menos_usada(self):
+        cache = CacheExpresiones(capacidad=2)
+        cache.obtener('x^2')
+        cache.obtener('x+1')
+        cache.obtener('x^2')
+        cache.obtener('\\sin(x)')
+        cache.obtener('x^2')
+        cache.obtener('x+1')
+        self.assertEqual(cache.estadisticas(), {'aciertos': 2, 'fallos': 4, 'entradas': 2, 'capacidad': 2})
+        cache.limpiar()
+        self.assertEqual(cache.estadisticas()['entradas'], 0)
+
+    def test_cache_del_proceso(self):
+        compilar_funcion('x^3+7*x')
+        antes = estadisticas_cache_expresiones()
+        compilar_funcion('x^{3}+7x')
+        despues = estadisticas_cache_expresiones()
+        self.assertEqual(despues['aciertos'], antes['aciertos'] + 1)
+        self.assertEqual(despues['fallos'], antes['fallos'])
+
+    def test_grafica_reutiliza_los_nodos(self):
+        contexto = ContextoEvaluacion('x^2+1')
+        with mock.patch('metodos_numericos.utils._evaluar_funcion_nodos', wraps=_evaluar_funcion_nodos) as nodos:
+            resultado = integracion_compuesta('x^2+1', 0, 1, 4, 'trapecio', contexto=contexto)
+            grafica = generar_datos_grafica_integracion('x^2+1', 0, 1, 4, 'trapecio', resultado['resultado'],
+                                                        contexto=contexto)
+        self.assertEqual(nodos.call_count, 1)
+        self.assertEqual(grafica['intervalos_y'], [1.0, 1.0625, 1.25, 1.5625, 2.0])
+
+
+class MathLiveTests(SimpleTestCase):
+    """Traducción del LaTeX de MathLive y de la notación tipo Python"""
+
+    CORPUS = {
+        r'\sin\left(x\right)': 'sin(x)',
+        r'\frac{1}{1+25x^2}': '1/(1+25*x**2)',
+        r'e^{x}': 'E**x',
+        'x**2 + 2*x + 1': 'x**2+2*x+1',
+        r'\frac{\sqrt{\frac{x}{2}}}{1+\frac{1}{x}}': 'sqrt(x/2)/(1+1/x)',
+        r'\sqrt[3]{x^2+1}': '(x**2+1)**(1/3)',
+        r'\left|x-1\right|': 'abs(x-1)',
+        '|x|+2|x-1|': 'abs(x)+2*abs(x-1)',
+        r'\sin^2(x)+\cos^{2}\left(x\right)': 'sin(x)**2+cos(x)**2',
+        r'\ln(x)': 'log(x)',
+        r'\log(x)': 'log(x, 10)',
+        r'\log_{2}(x)': 'log(x, 2)',
+        'log(x, 3)': 'log(x, 3)',
+        r'2\pi x': '2*pi*x',
+        r'x\cdot\exp(-x)': 'x*exp(-x)',
+        r'\frac12': '1/2',
+        '(x+1)(x-1)': '(x+1)*(x-1)',
+        '-x^2': '-x**2',
+        '2^3^2': '2**3**2',
+        'x^-1': 'x**(-1)',
+        r'\mathrm{e}^{2x}': 'E**(2*x)',
+        'sinleft(xright)': 'sin(x)',
+        'x(2)': 'x*2',
+        r'\arctan(x)': 'atan(x)',
+        r'\tan x^2': 'tan(x**2)',
+        r'x\times3': 'x*3',
+        '−x': '-x',
+        r'x\ast\ast2': 'x**2',
+        r'\sin 2x': 'sin(2*x)',
+        r'\sin x\cos x': 'sin(x)*cos(x)',
+        r'\sin^{-1}(x)': 'asin(x)',
+        r'\cos^{-1}x': 'acos(x)',
+    }
+
+    def test_corpus(self):
+        for latex, esperado in self.CORPUS.items():
+            with self.subTest(latex):
+                self.assertEqual(a_texto(parsear(latex)), esperado)
+
+    def test_errores(self):
+        for texto in ['', 'sin(', '(x', 'x+', r'\foo{x}', 'x,y', r'\sinh^{-1}x', r'\sec^{-1}(x)']:
+            with self.subTest(texto):
+                with self.assertRaises(ValueError):
+                    parsear(texto)
+
+    def test_compilar_numpy(self):
+        x = np.linspace(0.1, 2, 7)
+        casos = {
+            r'\sin 2x': np.sin(2 * x),
+            r'\frac{1}{1+25x^2}': 1 / (1 + 25 * x**2),
+            r'\left|x-1\right|': np.abs(x - 1),
+            r'\log_{2}(x)': np.log2(x),
+            r'\sqrt[3]{x^2+1}': np.cbrt(x**2 + 1),
+            r'\tan^{-1}(x)': np.arctan(x),
+        }
+        for latex, esperado in casos.items():
+            with self.subTest(latex):
+                np.testing.assert_allclose(compilar_numpy(parsear(latex))(x), esperado, rtol=1e-12)
+
+    def test_subexpresiones_comunes(self):
+        f = compilar_numpy(parsear(r'\sin(x)^2+\sin(x)+\frac{\pi}{2}'))
+        # sin(x) se calcula una vez y pi/2 al compilar: sin, ^, + y +
+        self.assertEqual(f.instrucciones, 4)
+        self.assertAlmostEqual(f(1.0), math.sin(1.0) ** 2 + math.sin(1.0) + math.pi / 2)
+        self.assertEqual(compilar_numpy(parsear(r'2\pi'))(np.ones(3)), 2 * math.pi)
+
+    def test_variable_no_soportada(self):
+        with self.assertRaises(ValueError):
+            compilar_numpy(parsear('x+y'))
+
+    def test_integracion_sin_sympy(self):
+        codigo = ("import sys\n"
+                  "from metodos_numericos.utils import integracion_compuesta\n"
+                  "integracion_compuesta(r'\\sin 2x', 0, 1, 4, 'trapecio', con_pasos=False)\n"
+                  "print('sympy' in sys.modules)")
+        salida = subprocess.run([sys.executable, '-c', codigo], cwd=settings.BASE_DIR, capture_output=True,
+                                text=True, check=True)
+        self.assertEqual(salida.stdout.strip(), 'False')
+
+
+class IntegracionAdaptativaTests(SimpleTestCase):
+    def test_exacta_para_polinomios(self):
+        # K15 integra exactamente polinomios de grado 22: no hay que dividir
+        resultado = integracion_compuesta('x^7', 0, 1, 1, 'adaptativo', con_pasos=False)
+        self.assertAlmostEqual(resultado['resultado'], 1 / 8, places=14)
+        self.assertEqual(resultado['evaluaciones'], 15)
+        self.assertEqual(resultado['malla'], [0.0, 1.0])
+        self.assertTrue(resultado['convergio'])
+
+    def test_refina_solo_cerca_de_la_singularidad(self):
+        resultado = integracion_compuesta(r'\sqrt{x}', 0, 1, 1, 'adaptativo', con_pasos=False)
+        self.assertTrue(resultado['convergio'])
+        self.assertAlmostEqual(resultado['resultado'], 2 / 3, delta=max(resultado['error_estimado'], 1e-10))
+        self.assertLessEqual(resultado['error_estimado'], 1e-10)
+        anchos = np.diff(resultado['malla'])
+        self.assertEqual(resultado['malla'][0], 0.0)
+        self.assertEqual(resultado['malla'][-1], 1.0)
+        self.assertLess(anchos[0], 1e-3)
+        self.assertEqual(anchos[-1], 0.5)
+        self.assertEqual(resultado['evaluaciones'] % 15, 0)
+
+    def test_maximo_de_evaluaciones(self):
+        resultado = integracion_compuesta(r'\sqrt{x}', 0, 1, 1, 'adaptativo', max_evaluaciones=45)
+        self.assertFalse(resultado['convergio'])
+        self.assertLessEqual(resultado['evaluaciones'], 45)
+        self.assertIn("Se alcanzó el máximo de evaluaciones antes de cumplir la tolerancia", resultado['pasos'])
+        self.assertAlmostEqual(resultado['resultado'], 2 / 3, places=4)
+
+
+class RombergTests(TestCase):
+    def test_extrapolacion(self):
+        resultado = integracion_compuesta('e^x', 0, 1, 1, 'romberg', con_pasos=False)
+        self.assertTrue(resultado['convergio'])
+        self.assertAlmostEqual(resultado['resultado'], math.e - 1, places=13)
+        tabla = resultado['tabla_romberg']
+        # La primera columna es el trapecio con 1, 2, 4, ... subintervalos
+        for k, fila in enumerate(tabla):
+            self.assertEqual(len(fila), k + 1)
+            trapecio = integracion_compuesta('e^x', 0, 1, 2 ** k, 'trapecio', con_pasos=False)['resultado']
+            self.assertAlmostEqual(fila[0], trapecio, places=13)
+
+    def test_evaluaciones_ahorradas(self):
+        resultado = integracion_compuesta('e^x', 0, 1, 1, 'romberg', con_pasos=False)
+        niveles = len(resultado['tabla_romberg'])
+        # Solo se evalúan los puntos medios nuevos de cada nivel
+        self.assertEqual(resultado['evaluaciones'], 2 ** (niveles - 1) + 1)
+        sin_reutilizar = sum(2 ** k + 1 for k in range(niveles))
+        self.assertEqual(resultado['evaluaciones_ahorradas'], sin_reutilizar - resultado['evaluaciones'])
+
+    def test_maximo_de_evaluaciones(self):
+        resultado = integracion_compuesta('e^x', 0, 1, 1, 'romberg', max_evaluaciones=9)
+        self.assertFalse(resultado['convergio'])
+        self.assertEqual(resultado['evaluaciones'], 9)
+        self.assertIn("Se alcanzó el máximo de evaluaciones antes de cumplir la tolerancia", resultado['pasos'])
+
+    def test_vista(self):
+        respuesta = self.client.post(reverse('metodos_numericos:integracion'),
+                                     {'funcion': 'e^x', 'a': 0, 'b': 1, 'n': 1, 'metodo': 'romberg'})
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertAlmostEqual(respuesta.context['resultado'], math.e - 1, places=8)
+        self.assertGreater(respuesta.context['evaluaciones_ahorradas'], 0)
+
+
+class GaussLegendreTests(SimpleTestCase):
+    def test_tabla_de_nodos(self):
+        for orden in (1, 2, 5, 20, 64):
+            with self.subTest(orden):
+                nodos, pesos = nodos_gauss_legendre(orden)
+                nodos_ref, pesos_ref = np.polynomial.legendre.leggauss(orden)
+                np.testing.assert_allclose(nodos, nodos_ref, atol=1e-14)
+                np.testing.assert_allclose(pesos, pesos_ref, atol=1e-14)
+        # La tabla se calcula una vez por orden y no se puede modificar
+        self.assertIs(nodos_gauss_legendre(5)[0], nodos_gauss_legendre(5)[0])
+        self.assertFalse(nodos_gauss_legendre(5)[0].flags.writeable)
+
+    def test_cache_en_disco(self):
+        from metodos_numericos import utils
+        orden = 37
+        with tempfile.TemporaryDirectory() as directorio:
+            utils._tabla_gauss_legendre.pop(orden, None)
+            nodos, pesos = nodos_gauss_legendre(orden, directorio=directorio)
+            utils._tabla_gauss_legendre.pop(orden)
+            with mock.patch('metodos_numericos.utils._golub_welsch') as golub_welsch:
+                nodos_disco, pesos_disco = nodos_gauss_legendre(orden, directorio=directorio)
+            golub_welsch.assert_not_called()
+        np.testing.assert_array_equal(nodos_disco, nodos)
+        np.testing.assert_array_equal(pesos_disco, pesos)
+
+    def test_exacta_hasta_grado_2n_menos_1(self):
+        resultado = integracion_compuesta('x^9', 0, 1, 3, 'gauss_legendre', orden_gauss=5, con_pasos=False)
+        self.assertAlmostEqual(resultado['resultado'], 0.1, places=14)
+        self.assertEqual(resultado['evaluaciones'], 15)
+        resultado = integracion_compuesta('x^{10}', 0, 1, 1, 'gauss_legendre', orden_gauss=5, con_pasos=False)
+        self.assertNotAlmostEqual(resultado['resultado'], 1 / 11, places=6)
+
+    def test_funcion_suave(self):
+        resultado = integracion_compuesta(r'\sin(x)', 0, np.pi, 4, 'gauss_legendre', orden_gauss=8, con_pasos=False)
+        self.assertAlmostEqual(resultado['resultado'], 2.0, places=13)
+
+    def test_limites(self):
+        with self.assertRaises(ValueError):
+            integracion_compuesta('x', 0, 1, MAX_NODOS_GAUSS // 4 + 1, 'gauss_legendre', orden_gauss=4)
+        with self.assertRaises(ValueError):
+            nodos_gauss_legendre(0)
+
+    def test_grafica_marca_los_nodos(self):
+        contexto = ContextoEvaluacion('x^2')
+        resultado = integracion_compuesta('x^2', 0, 1, 2, 'gauss_legendre', orden_gauss=3, contexto=contexto)
+        grafica = generar_datos_grafica_integracion('x^2', 0, 1, 2, 'gauss_legendre', resultado['resultado'],
+                                                    contexto=contexto, orden_gauss=3)
+        t = np.sqrt(0.6) / 4
+        np.testing.assert_allclose(grafica['nodos_gauss_x'], [0.25 - t, 0.25, 0.25 + t, 0.75 - t, 0.75, 0.75 + t])
+        np.testing.assert_allclose(grafica['nodos_gauss_y'], np.square(grafica['nodos_gauss_x']))
+
+
+class IntegracionPorBloquesTests(SimpleTestCase):
+    def test_igual_a_la_evaluacion_directa(self):
+        # Bloques de 7 nodos: los límites no coinciden con los grupos de Simpson
+        for metodo, n in [('trapecio', 100), ('simpson13', 100), ('simpson38', 99)]:
+            with self.subTest(metodo):
+                directo = integracion_compuesta(r'\sin(x)', 0, 1, n, metodo, con_pasos=False, por_bloques=False)
+                for procesos in (0, 2):
+                    resultado = _newton_cotes_por_bloques(ContextoEvaluacion(r'\sin(x)'), 0, 1, n, 1 / n, metodo,
+                                                          None, tamano_bloque=7, procesos=procesos)
+                    self.assertAlmostEqual(resultado['resultado'], directo['resultado'], places=14)
+                    self.assertEqual(resultado['bloques'], 15)
+                    self.assertEqual(len(resultado['sumas_bloques']), 15)
+                    self.assertEqual(resultado['evaluaciones'], n + 1)
+
+    def test_pasos_acotados(self):
+        n = 10 ** 6
+        self.assertGreaterEqual(n, UMBRAL_INTEGRACION_BLOQUES)
+        resultado = integracion_compuesta(r'\sin(x)', 0, 1, n, 'simpson13')
+        self.assertAlmostEqual(resultado['resultado'], 1 - math.cos(1), places=12)
+        self.assertEqual(resultado['bloques'], 4)
+        self.assertLess(len(resultado['pasos']), 40)
+        self.assertIn(f"⋮ ({n + 1 - 10} nodos omitidos)", resultado['pasos'])
+        self.assertIn(f"f(x_{n}) = f(1.0000) = {math.sin(1):.6f}", resultado['pasos'])
+
+
+class ComparacionIntegracionTests(SimpleTestCase):
+    def test_reglas_sobre_una_evaluacion(self):
+        with mock.patch('metodos_numericos.utils._evaluar_funcion_nodos', wraps=_evaluar_funcion_nodos) as nodos:
+            resultado = integracion_compuesta('e^x', 0, 1, 6, 'comparacion', valor_referencia=math.e - 1)
+        self.assertEqual(nodos.call_count, 1)
+        self.assertEqual(resultado['evaluaciones'], 7)
+        self.assertIn("Evaluaciones de la función: 7 (por separado serían 21)", resultado['pasos'])
+        self.assertEqual([fila['metodo'] for fila in resultado['comparacion']], ['trapecio', 'simpson13', 'simpson38'])
+        for fila in resultado['comparacion']:
+            with self.subTest(fila['metodo']):
+                individual = integracion_compuesta('e^x', 0, 1, 6, fila['metodo'], con_pasos=False)['resultado']
+                self.assertAlmostEqual(fila['resultado'], individual, places=14)
+                self.assertAlmostEqual(fila['error'], abs(individual - (math.e - 1)), places=14)
+                self.assertAlmostEqual(fila['error_relativo'], fila['error'] / (math.e - 1), places=14)
+
+    def test_sin_referencia(self):
+        resultado = integracion_compuesta('e^x', 0, 1, 4, 'comparacion', metodos_comparacion=('trapecio', 'simpson13'),
+                                          con_pasos=False)
+        self.assertIsNone(resultado['valor_referencia'])
+        self.assertNotIn('error', resultado['comparacion'][0])
+        self.assertEqual(resultado['resultado'], resultado['comparacion'][1]['resultado'])
+
+    def test_n_multiplo_de_6(self):
+        with self.assertRaises(ValueError):
+            integracion_compuesta('e^x', 0, 1, 4, 'comparacion')
+
+
+class ConvergenciaTests(TestCase):
+    def setUp(self):
+        self.url = reverse('metodos_numericos:integracion_convergencia')
+
+    def test_orden_observado(self):
+        resultado = estudio_convergencia('e^x', 0, 1, metodo='simpson13', n_inicial=2, niveles=6,
+                                         valor_referencia=math.e - 1)
+        self.assertEqual([nivel['n'] for nivel in resultado['niveles']], [2, 4, 8, 16, 32, 64, 128])
+        self.assertEqual(resultado['orden_teorico'], 4)
+        for nivel in resultado['niveles'][2:]:
+            self.assertAlmostEqual(nivel['orden_observado'], 4, delta=0.05)
+            self.assertAlmostEqual(nivel['error'], abs(nivel['estimacion'] - (math.e - 1)), places=14)
+        ultimo = resultado['niveles'][-1]
+        directo = integracion_compuesta('e^x', 0, 1, 128, 'simpson13', con_pasos=False)['resultado']
+        self.assertAlmostEqual(ultimo['estimacion'], directo, places=14)
+        # Las mallas están anidadas: solo se evalúan los 129 nodos de la más fina
+        self.assertEqual(resultado['evaluaciones'], 129)
+        self.assertEqual(resultado['evaluaciones_sin_reutilizar'], sum(n + 1 for n in (2, 4, 8, 16, 32, 64, 128)))
+        self.assertEqual(resultado['grafica']['tipo'], 'error')
+        self.assertEqual(resultado['grafica']['n'], [2, 4, 8, 16, 32, 64, 128])
+
+    def test_sin_referencia_grafica_las_diferencias(self):
+        resultado = estudio_convergencia('x^2', 0, 1, metodo='trapecio', niveles=3)
+        self.assertEqual(resultado['grafica'], {'tipo': 'diferencia', 'n': [4, 8, 16],
+                                                'valores': [0.03125, 0.0078125, 0.001953125]})
+        self.assertEqual([nivel['orden_observado'] for nivel in resultado['niveles']], [None, None, 2.0, 2.0])
+
+    def test_endpoint(self):
+        respuesta = self.client.post(self.url, json.dumps({'funcion': 'e^x', 'a': 0, 'b': 1, 'metodo': 'simpson13',
+                                                           'niveles': 4, 'valor_referencia': 'e-1'}),
+                                     content_type='application/json')
+        self.assertEqual(respuesta.status_code, 200)
+        datos = respuesta.json()
+        self.assertAlmostEqual(datos['valor_referencia'], math.e - 1, places=14)
+        self.assertEqual(len(datos['niveles']), 5)
+
+    def test_errores(self):
+        for datos in [{'funcion': ''}, {'funcion': 'x', 'metodo': 'romberg'}, {'funcion': 'x', 'niveles': 40},
+                      {'funcion': 'x', 'n_inicial': 0}]:
+            with self.subTest(datos):
+                respuesta = self.client.post(self.url, json.dumps(datos), content_type='application/json')
+                self.assertEqual(respuesta.status_code, 400)
+                self.assertIn('error', respuesta.json())
+
+
+class IntegralAcumuladaTests(SimpleTestCase):
+    def test_trapecio_en_cada_nodo(self):
+        tabla = integral_acumulada(r'\cos(x)', 0, 2, 10, 'trapecio')
+        self.assertEqual(tabla.valores[0], 0.0)
+        for i in range(1, 11):
+            parcial = integracion_compuesta(r'\cos(x)', 0, tabla.x_vals[i], i, 'trapecio', con_pasos=False)
+            self.assertAlmostEqual(tabla.valores[i], parcial['resultado'], places=14)
+
+    def test_simpson_exacta_para_parabolas(self):
+        # Los nodos impares integran la parábola del panel, así que también son exactos
+        tabla = integral_acumulada('x^2', 0, 1, 4, 'simpson13')
+        np.testing.assert_allclose(tabla.valores, tabla.x_vals ** 3 / 3, atol=1e-15)
+        self.assertAlmostEqual(tabla.total, 1 / 3, places=15)
+
+    def test_interpolacion_entre_nodos(self):
+        tabla = integral_acumulada(r'\cos(x)', 0, np.pi, 64, 'simpson13')
+        x = np.linspace(0, np.pi, 101)
+        np.testing.assert_allclose(tabla.evaluar(x), np.sin(x), atol=1e-6)
+        with self.assertRaises(ValueError):
+            tabla.evaluar(4.0)
+
+    def test_modo_acumulado_con_una_evaluacion(self):
+        with mock.patch('metodos_numericos.utils._evaluar_funcion_nodos', wraps=_evaluar_funcion_nodos) as nodos:
+            resultado = integracion_compuesta(r'\cos(x)', 0, np.pi, 8, 'simpson13', acumulada=True,
+                                              x_consulta=[0.5, 3])
+        self.assertEqual(nodos.call_count, 1)
+        self.assertAlmostEqual(resultado['integral_acumulada'].total, resultado['resultado'], places=15)
+        self.assertEqual([x for x, _ in resultado['consultas']], [0.5, 3.0])
+        for x, valor in resultado['consultas']:
+            self.assertAlmostEqual(valor, math.sin(x), places=3)
+
+    def test_muestra_compacta(self):
+        tabla = integral_acumulada('x', 0, 1, 5000, 'trapecio')
+        x_muestra, valores = tabla.muestra(max_puntos=100)
+        self.assertLessEqual(len(x_muestra), 101)
+        self.assertEqual((x_muestra[0], x_muestra[-1]), (0.0, 1.0))
+        np.testing.assert_allclose(valores, np.square(x_muestra) / 2, atol=1e-12)
+
+    def test_errores(self):
+        for metodo, n in [('simpson38', 6), ('simpson13', 3), ('trapecio', UMBRAL_INTEGRACION_BLOQUES)]:
+            with self.subTest(metodo):
+                with self.assertRaises(ValueError):
+                    integral_acumulada('x', 0, 1, n, metodo)
+
+
+class IntegracionTabuladaTests(TestCase):
+    def datos(self, puntos):
+        # Malla no uniforme en [0, 1] con y = x²
+        x = np.sort(np.concatenate([[0.0, 1.0], np.random.default_rng(0).uniform(0, 1, puntos - 2)]))
+        texto = 'x,y\n' + ''.join(f'{xi!r},{xi ** 2!r}\n' for xi in x.tolist())
+        return x, texto.encode()
+
+    def test_bloques_pequenos(self):
+        # 41 puntos: intervalos pares; 42 puntos: el último intervalo cierra con una parábola
+        for puntos in (41, 42):
+            x, contenido = self.datos(puntos)
+            for tamano_bloque in (50, 1 << 20):
+                with self.subTest(puntos=puntos, tamano_bloque=tamano_bloque):
+                    simpson = integracion_tabulada(io.BytesIO(contenido), 'simpson13', tamano_bloque=tamano_bloque,
+                                                   con_pasos=False)
+                    trapecio = integracion_tabulada(io.BytesIO(contenido), 'trapecio', tamano_bloque=tamano_bloque,
+                                                    con_pasos=False)
+                    self.assertAlmostEqual(simpson['resultado'], 1 / 3, places=14)
+                    self.assertAlmostEqual(trapecio['resultado'], np.trapezoid(x ** 2, x), places=14)
+                    self.assertEqual(simpson['puntos'], puntos)
+                    self.assertEqual((simpson['a'], simpson['b']), (0.0, 1.0))
+                    if tamano_bloque == 50:
+                        self.assertGreater(simpson['bloques'], 10)
+
+    def test_vista_previa_reducida(self):
+        _, contenido = self.datos(1000)
+        resultado = integracion_tabulada(io.BytesIO(contenido), 'trapecio', tamano_bloque=256, max_vista_previa=50)
+        self.assertLessEqual(len(resultado['vista_previa_x']), 50)
+        self.assertEqual(resultado['vista_previa_x'][0], 0.0)
+        self.assertEqual(resultado['vista_previa_x'][-1], 1.0)
+        np.testing.assert_allclose(resultado['vista_previa_y'], np.square(resultado['vista_previa_x']))
+
+    def test_separado_por_espacios(self):
+        resultado = integracion_tabulada(io.BytesIO(b'0 1\n1 2\n3 3\n'), 'trapecio')
+        self.assertEqual(resultado['resultado'], 6.5)
+        self.assertEqual(resultado['pasos'][-1], "$$\\mathrm{Resultado} = 6.5000000000$$")
+
+    def test_errores(self):
+        for contenido in [b'0 1\n1 2\n0.5 3\n', b'0 1\n', b'0 1\n1 nan\n', b'0 1\n1\n']:
+            with self.subTest(contenido):
+                with self.assertRaises(ValueError):
+                    integracion_tabulada(io.BytesIO(contenido), 'trapecio')
+        with self.assertRaises(ValueError):
+            integracion_tabulada(io.BytesIO(b'0 1\n1 2\n'), 'simpson38')
+
+    def test_vista_con_archivo(self):
+        archivo = SimpleUploadedFile('datos.csv', b'x,y\n0,0\n0.5,0.25\n1,1\n', content_type='text/csv')
+        respuesta = self.client.post(reverse('metodos_numericos:integracion'),
+                                     {'metodo': 'simpson13', 'archivo': archivo})
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertTrue(respuesta.context['tabulado'])
+        self.assertAlmostEqual(respuesta.context['resultado'], 1 / 3, places=14)
+
+
+class IntegracionDobleTests(TestCase):
+    def test_forma_cerrada(self):
+        resultado = integracion_doble(r'\sin(x)\cos(y)', 0, np.pi, 0, np.pi / 2, 64, 64, 'simpson13', con_pasos=False)
+        self.assertAlmostEqual(resultado['resultado'], 2.0, places=6)
+        self.assertEqual(resultado['evaluaciones'], 65 * 65)
+        self.assertGreaterEqual(resultado['tiempo'], 0)
+        # Simpson 1/3 y 3/8 integran exactamente x·y² y las constantes
+        resultado = integracion_doble('x*y^2', 0, 1, 0, 2, 4, 6, 'simpson13', con_pasos=False)
+        self.assertAlmostEqual(resultado['resultado'], 4 / 3, places=14)
+        resultado = integracion_doble('5', 0, 1, 0, 2, 3, 3, 'simpson38', con_pasos=False)
+        self.assertAlmostEqual(resultado['resultado'], 10.0, places=14)
+
+    def test_producto_de_reglas_1d(self):
+        # Con f(x, y) = g(x) h(y) la regla producto es el producto de las reglas 1-D
+        doble = integracion_doble(r'e^{x}\cos(y)', 0, 1, 0, 2, 8, 5, 'trapecio', con_pasos=False)['resultado']
+        en_x = integracion_compuesta('e^x', 0, 1, 8, 'trapecio', con_pasos=False)['resultado']
+        en_y = integracion_compuesta(r'\cos(x)', 0, 2, 5, 'trapecio', con_pasos=False)['resultado']
+        self.assertAlmostEqual(doble, en_x * en_y, places=13)
+
+    def test_franjas_con_memoria_acotada(self):
+        completo = integracion_doble(r'\sin(x)\cos(y)', 0, np.pi, 0, np.pi / 2, 64, 64, 'simpson13', con_pasos=False)
+        franjas = integracion_doble(r'\sin(x)\cos(y)', 0, np.pi, 0, np.pi / 2, 64, 64, 'simpson13', con_pasos=False,
+                                    max_puntos_bloque=100)
+        self.assertEqual(completo['bloques'], 1)
+        self.assertEqual(franjas['bloques'], 65)
+        self.assertAlmostEqual(franjas['resultado'], completo['resultado'], places=14)
+
+    def test_errores(self):
+        for argumentos in [('x+z', 0, 1, 0, 1, 2, 2), ('x', 0, 1, 0, 1, 3, 2, 'simpson13'), ('x', 1, 0, 0, 1, 2, 2),
+                           ('x', 0, 1, 0, 1, 0, 2), ('x', 0, 1, 0, 1, 2, 2, 'gauss_legendre')]:
+            with self.subTest(argumentos):
+                with self.assertRaises(ValueError):
+                    integracion_doble(*argumentos)
+
+    def test_vista(self):
+        respuesta = self.client.post(reverse('metodos_numericos:integracion'),
+                                     {'funcion': 'x*y', 'a': 0, 'b': 1, 'c': 0, 'd': 2, 'n': 4, 'm': 2,
+                                      'metodo': 'trapecio', 'doble': 'on'})
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertTrue(respuesta.context['doble'])
+        self.assertAlmostEqual(respuesta.context['resultado'], 1.0, places=14)
+        grafica = json.loads(respuesta.context['datos_grafica'])
+        self.assertEqual((grafica['nx'], grafica['ny']), (4, 2))
+
+
+class QuasiMonteCarloTests(TestCase):
+    def test_red_de_sobol(self):
+        # Las dos primeras dimensiones forman una (0, m, 2)-red: cada caja diádica
+        # de área 2^-m contiene exactamente un punto de los primeros 2^m
+        m = 8
+        enteros = (secuencia_sobol(0, 1 << m, 2) * (1 << m)).astype(int)
+        for i in range(m + 1):
+            cajas = (enteros[:, 0] >> (m - i)) * (1 << (m - i)) + (enteros[:, 1] >> i)
+            self.assertEqual(len(np.unique(cajas)), 1 << m)
+        # Cada coordenada de los primeros 2^m puntos es una permutación de k / 2^m
+        for j in range(10):
+            coordenada = np.sort(secuencia_sobol(0, 1 << m, 10)[:, j])
+            np.testing.assert_array_equal(coordenada, np.arange(1 << m) / (1 << m))
+
+    def test_secuencias_por_lotes(self):
+        np.testing.assert_array_equal(secuencia_sobol(0, 64, 5)[40:], secuencia_sobol(40, 24, 5))
+        np.testing.assert_array_equal(secuencia_halton(0, 64, 5)[40:], secuencia_halton(40, 24, 5))
+        np.testing.assert_allclose(secuencia_halton(1, 3, 2), [[0.5, 1 / 3], [0.25, 2 / 3], [0.75, 1 / 9]])
+
+    def test_forma_cerrada(self):
+        for secuencia in ('sobol', 'halton'):
+            with self.subTest(secuencia):
+                resultado = integracion_quasi_montecarlo(r'\exp(x_1+x_2+x_3+x_4+x_5+x_6)', [(0, 1)] * 6,
+                                                         secuencia=secuencia, error_objetivo=1e-3, semilla=2,
+                                                         con_pasos=False)
+                self.assertTrue(resultado['convergio'])
+                self.assertLessEqual(resultado['error_estimado'], 1e-3)
+                self.assertAlmostEqual(resultado['resultado'], (math.e - 1) ** 6, delta=5e-3)
+                self.assertEqual(resultado['evaluaciones'], resultado['puntos'] * resultado['replicas'])
+
+    def test_caja_no_unitaria(self):
+        resultado = integracion_quasi_montecarlo('x_1 x_2 x_3 x_4', [(0, 2), (0, 1), (1, 3), (0, 1)],
+                                                 error_objetivo=1e-4, semilla=1, con_pasos=False)
+        self.assertAlmostEqual(resultado['resultado'], 2 * 0.5 * 4 * 0.5, delta=1e-3)
+
+    def test_tope_de_puntos(self):
+        resultado = integracion_quasi_montecarlo('x_1', [(0, 1)], error_objetivo=1e-30, semilla=2, max_puntos=1024,
+                                                 tamano_lote=256, con_pasos=False)
+        self.assertFalse(resultado['convergio'])
+        self.assertEqual(resultado['puntos'], 1024)
+        self.assertEqual(resultado['lotes'], 4)
+        self.assertEqual([fila['puntos'] for fila in resultado['historia']], [256, 512, 768, 1024])
+
+    def test_errores(self):
+        for argumentos, opciones in [(('x_1', [(1, 0)]), {}), (('x_1', [(0, 1)] * 11), {}),
+                                     (('x_1', [(0, 1)]), {'replicas': 1}), (('x_1', [(0, 1)]), {'secuencia': 'lhs'}),
+                                     (('x_1', [(0, 1)]), {'error_objetivo': 0}), ((r'\sqrt{x_1}', [(-1, 1)]), {})]:
+            with self.subTest(argumentos=argumentos, opciones=opciones):
+                with self.assertRaises(ValueError):
+                    integracion_quasi_montecarlo(*argumentos, semilla=0, **opciones)
+
+    def test_endpoint(self):
+        url = reverse('metodos_numericos:integracion_qmc')
+        respuesta = self.client.post(url, json.dumps({'funcion': 'x_1 x_2', 'limites': '0,1;0,2', 'semilla': 3,
+                                                      'error_objetivo': 1e-4}), content_type='application/json')
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertAlmostEqual(respuesta.json()['resultado'], 1.0, delta=1e-3)
+        respuesta = self.client.post(url, json.dumps({'funcion': 'x_1', 'limites': '0'}),
+                                     content_type='application/json')
+        self.assertEqual(respuesta.status_code, 400)
+
+
+# Trabajos del sandbox: funciones de módulo para que los trabajadores las importen
+def _consumir_cpu():
+    while True:
+        pass
+
+
+def _consumir_cpu_sin_senal():
+    # Como un bucle en C que no vuelve al intérprete: SIGXCPU no lo detiene
+    signal.signal(signal.SIGXCPU, signal.SIG_IGN)
+    _consumir_cpu()
+
+
+def _reservar_memoria(gigas):
+    return len(bytearray(gigas * 1024**3))
+
+
+def _dormir(segundos):
+    time.sleep(segundos)
+
+
+def _dividir(a, b):
+    if b == 0:
+        raise ValueError('División por cero')
+    return a / b
+
+
+@skipIf(resource is None, 'Los límites de CPU y memoria requieren el módulo resource')
+class SandboxTests(SimpleTestCase):
+    """Límites de CPU, memoria y tiempo real del pool de trabajadores"""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.pool = PoolSandbox(1, limite_cpu=1, limite_memoria=1024**3, limite_tiempo=5, margen_cpu=2)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.pool.cerrar()
+        super().tearDownClass()
+
+    def test_resultado_y_errores(self):
+        self.assertEqual(self.pool.ejecutar(_dividir, 6, 3), 2)
+        with self.assertRaisesMessage(ValueError, 'División por cero'):
+            self.pool.ejecutar(_dividir, 1, 0)
+
+    def test_limite_cpu(self):
+        reinicios = self.pool.reinicios
+        with self.assertRaisesMessage(LimiteExcedido, 'CPU'):
+            self.pool.ejecutar(_consumir_cpu)
+        # El trabajo se cancela sin matar al trabajador (a lo sumo se renueva al quedarse sin margen)
+        self.assertEqual(self.pool.reinicios, reinicios)
+        self.assertEqual(self.pool.ejecutar(_dividir, 1, 4), 0.25)
+
+    def test_limite_duro_de_cpu(self):
+        reinicios = self.pool.reinicios
+        inicio = time.monotonic()
+        with self.assertRaisesMessage(LimiteExcedido, 'terminó de forma inesperada'):
+            self.pool.ejecutar(_consumir_cpu_sin_senal)
+        # El sistema lo mata en el límite duro, antes que el límite de tiempo real
+        self.assertLess(time.monotonic() - inicio, self.pool.limite_tiempo)
+        self.assertEqual(self.pool.reinicios, reinicios + 1)
+        self.assertEqual(self.pool.ejecutar(_dividir, 1, 2), 0.5)
+
+    def test_limite_memoria(self):
+        with self.assertRaisesMessage(LimiteExcedido, 'memoria'):
+            self.pool.ejecutar(_reservar_memoria, 4)
+        self.assertEqual(self.pool.ejecutar(_reservar_memoria, 0), 0)
+
+    def test_limite_tiempo(self):
+        reinicios = self.pool.reinicios
+        inicio = time.monotonic()
+        with self.assertRaisesMessage(LimiteExcedido, 's y se canceló'):
+            self.pool.ejecutar(_dormir, 60)
+        self.assertLess(time.monotonic() - inicio, 30)
+        # El trabajador bloqueado se reemplaza por uno nuevo
+        self.assertEqual(self.pool.reinicios, reinicios + 1)
+        self.assertEqual(self.pool.ejecutar(_dividir, 1, 2), 0.5)
+
+    def test_trabajador_muerto_antes_del_envio(self):
+        reinicios = self.pool.reinicios
+        trabajador = self.pool._todos[0]
+        trabajador.proceso.kill()
+        trabajador.proceso.join()
+        # Muere entre la comprobación de vivo() y el envío: la tubería está rota
+        with mock.patch.object(_Trabajador, 'vivo', return_value=True):
+            with self.assertRaisesMessage(LimiteExcedido, 'terminó de forma inesperada'):
+                self.pool.ejecutar(_dividir, 1, 2)
+        self.assertEqual(self.pool.reinicios, reinicios + 1)
+        self.assertEqual(self.pool.ejecutar(_dividir, 3, 2), 1.5)
+
+    def test_se_renueva_sin_margen_de_cpu(self):
+        pool = PoolSandbox(1, limite_cpu=1, limite_memoria=0, limite_tiempo=5, margen_cpu=1)
+        try:
+            primero = pool._todos[0]
+            # Con un segundo de margen no queda lugar para otro trabajo con el límite completo
+            with self.assertRaisesMessage(LimiteExcedido, 'CPU'):
+                pool.ejecutar(_consumir_cpu)
+            self.assertIsNot(pool._todos[0], primero)
+            self.assertEqual(pool.reinicios, 0)
+            self.assertEqual(pool.ejecutar(_dividir, 1, 8), 0.125)
+        finally:
+            pool.cerrar()
@@ -9,7 +9,12 @@ urlpatterns = [
     path('docs/', views.docs, name='docs_alt'),
     path('hermite/', views.hermite_view, name='hermite'),
     path('hermite/<int:id_ejercicio>/', views.hermite_view, name='hermite_id'),
+    path('hermite/evaluar/', api.hermite_evaluar, name='hermite_evaluar'),
+    path('hermite/lote/', api.hermite_lote, name='hermite_lote'),
     path('integracion/', views.integracion_view, name='integracion'),
+    path('integracion/cache/', api.cache_expresiones, name='cache_expresiones'),
+    path('integracion/convergencia/', api.integracion_convergencia, name='integracion_convergencia'),
+    path('integracion/qmc/', api.integracion_qmc, name='integracion_qmc'),
     path('simplex/', views.simplex_view, name='simplex'),
     path('simplex/<int:id_ejercicio>/', views.simplex_view, name='simplex_id'),
     path('simplex/clone/<int:id_ejercicio>/', views.simplex_view, name='simplex_id'),
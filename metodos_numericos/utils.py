@@ -1,391 +1,2626 @@
 import numpy as np
-import sympy as sp
-from sympy import symbols, lambdify, sympify
+import io
 import math
+import os
+import time
+import threading
+import warnings
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
 from fractions import Fraction
+from .mathlive import parsear as parsear_mathlive, a_texto, a_sympy, compilar_numpy
 
-def interpolacion_hermite(puntos, x_eval):
+def diferencias_divididas_hermite(x_vals, f_vals, df_vals, tabla=False, dtype=float, cota_error=False):
+    """
+    Calcula los coeficientes de Newton del polinomio de Hermite columna por columna
+
+    Acepta dimensiones iniciales adicionales (por ejemplo, un lote de conjuntos de
+    puntos con forma (B, n)); las operaciones se aplican sobre el último eje.
+
+    Args:
+        x_vals: Nodos x_i
+        f_vals: Valores f(x_i)
+        df_vals: Derivadas f'(x_i)
+        tabla: Si es True también construye la tabla triangular completa
+        dtype: Tipo de punto flotante del cálculo (float64 o np.longdouble)
+        cota_error: Si es True propaga una cota de primer orden del error de
+            redondeo de cada diferencia dividida
+
+    Returns:
+        Tupla (coeficientes, z, Q, ultima_fila, cota) donde z son los nodos
+        duplicados, Q la tabla de diferencias divididas (None si no se solicitó),
+        ultima_fila la última fila de la tabla, suficiente para agregar nodos
+        después, y cota el par (cota de cada coeficiente, cota de cada elemento
+        de ultima_fila), o None si no se solicitó
+    """
+    x_vals = np.asarray(x_vals, dtype=dtype)
+    f_vals = np.asarray(f_vals, dtype=dtype)
+    df_vals = np.asarray(df_vals, dtype=dtype)
+
+    # Necesitamos 2n puntos (cada punto original se duplica)
+    z = np.repeat(x_vals, 2, axis=-1)
+    m = z.shape[-1]
+
+    # Un único buffer de tamaño 2n: al terminar la columna j, q[j] es Q[j][j]
+    q = np.repeat(f_vals, 2, axis=-1)
+    Q = None
+    if tabla:
+        Q = np.zeros(q.shape + (m,), dtype=dtype)
+        Q[..., :, 0] = q
+
+    # Segunda columna: f'(x_i) en los nodos repetidos, cociente en los demás
+    primera = np.empty(q.shape[:-1] + (m - 1,), dtype=dtype)
+    primera[..., 0::2] = df_vals
+    primera[..., 1::2] = np.diff(f_vals, axis=-1) / np.diff(x_vals, axis=-1)
+    ultima_fila = np.empty(q.shape, dtype=dtype)
+    ultima_fila[..., 0] = q[..., -1]
+    q[..., 1:] = primera
+    ultima_fila[..., 1] = q[..., -1]
+    if tabla:
+        Q[..., 1:, 1] = primera
+
+    # Cota de error: los datos se toman exactos; cada resta y división agrega
+    # a lo sumo 3u|q| y divide el error heredado entre la separación de nodos
+    e = None
+    if cota_error:
+        u = np.finfo(dtype).eps / 2
+        e = np.zeros(q.shape, dtype=dtype)
+        e[..., 2::2] = 3 * u * np.abs(primera[..., 1::2])
+        cota_ultima_fila = np.zeros(q.shape, dtype=dtype)
+        cota_ultima_fila[..., 1] = e[..., -1]
+
+    # Resto de columnas, cada una en una sola operación vectorizada
+    for j in range(2, m):
+        separacion = z[..., j:] - z[..., :-j]
+        q[..., j:] = (q[..., j:] - q[..., j-1:-1]) / separacion
+        if cota_error:
+            e[..., j:] = (e[..., j:] + e[..., j-1:-1]) / np.abs(separacion) + 3 * u * np.abs(q[..., j:])
+            cota_ultima_fila[..., j] = e[..., -1]
+        ultima_fila[..., j] = q[..., -1]
+        if tabla:
+            Q[..., j:, j] = q[..., j:]
+
+    return q, z, Q, ultima_fila, (e, cota_ultima_fila) if cota_error else None
+
+def _horner_newton(coeficientes, z, x, derivada=False):
+    """Evalúa la forma de Newton (y su derivada) por multiplicación anidada sobre un arreglo"""
+    x = np.asarray(x, dtype=float)
+    p = np.full(x.shape, coeficientes[-1])
+    dp = np.zeros(x.shape, dtype=p.dtype)
+    for k in range(len(coeficientes) - 2, -1, -1):
+        t = x - z[k]
+        if derivada:
+            dp = dp * t + p
+        p = p * t + coeficientes[k]
+    return p, dp
+
+# Nodos máximos para repetir las diferencias divididas con Fraction: el costo
+# crece mucho más rápido que n² (unos 0.1 s con 20 nodos agrupados, 3 s con 40)
+# y el cálculo se hace en el proceso web
+MAX_NODOS_RACIONAL = 20
+
+class InterpolanteHermite:
+    """
+    Polinomio de Hermite en forma de Newton con evaluación numérica en float64
+
+    Conserva la última fila de la tabla de diferencias divididas, de modo que se
+    pueden agregar nodos en O(n) sin reconstruir la tabla (ver agregar_punto).
+
+    Si se indica umbral_precision, se estima el error de redondeo de los
+    coeficientes y, solo cuando supera el umbral, el cálculo se repite en
+    precisión extendida (np.longdouble) o en aritmética racional exacta (Fraction).
+    """
+
+    def __init__(self, x_vals, f_vals, df_vals, tabla=False, umbral_precision=None):
+        self.x_vals = np.asarray(x_vals, dtype=float)
+        self.f_vals = np.asarray(f_vals, dtype=float)
+        self.df_vals = np.asarray(df_vals, dtype=float)
+        inicio = time.perf_counter()
+        self.coeficientes, self.z, self.tabla, self._ultima_fila, cota = diferencias_divididas_hermite(
+            self.x_vals, self.f_vals, self.df_vals, tabla=tabla, cota_error=umbral_precision is not None
+        )
+        self._monomios = None
+        self._exactos = None
+        self.nodos_agregados = 0
+        # Cotas de redondeo de los coeficientes y de la última fila en float64;
+        # agregar_punto las extiende para repetir el control de precisión en O(n)
+        self._cota = cota
+        self.precision = None
+        if umbral_precision is not None:
+            self._controlar_precision(cota[0], umbral_precision, time.perf_counter() - inicio)
+
+    def controlar_precision(self, umbral):
+        """
+        Repite el control de precisión, por ejemplo después de agregar nodos
+
+        Si se conservan las cotas de float64 que propaga agregar_punto, la
+        verificación no recorre la tabla; si no (estado antiguo o nivel de
+        precisión superior), los coeficientes float64 se recalculan primero.
+        """
+        inicio = time.perf_counter()
+        if self._cota is None:
+            self.coeficientes, _, _, self._ultima_fila, self._cota = diferencias_divididas_hermite(
+                self.x_vals, self.f_vals, self.df_vals, cota_error=True
+            )
+            self._monomios = None
+            self._exactos = None
+        self._controlar_precision(self._cota[0], umbral, time.perf_counter() - inicio)
+
+    def _malla_muestra(self, muestras=129):
+        return np.linspace(self.x_vals.min(), self.x_vals.max(), muestras)
+
+    def _error_estimado(self, cota):
+        """
+        Cota relativa del error de H(x) en el rango de los nodos:
+        sum_k e_k max|w_k(x)| / max|f|, con e_k la cota de error del coeficiente k y
+        w_k(x) = (x - z_0)...(x - z_{k-1}) muestreado en una malla del rango
+        """
+        x_muestra = self._malla_muestra()
+        with np.errstate(over='ignore', invalid='ignore'):
+            w = np.cumprod(x_muestra[:, None] - self.z[None, :-1], axis=1)
+            max_w = np.concatenate(([1.0], np.abs(w).max(axis=0)))
+            terminos = np.where(cota == 0, 0.0, cota * max_w)
+            escala = max(float(np.max(np.abs(self.f_vals))), np.finfo(float).tiny)
+            error = float(np.sum(terminos)) / escala
+        return error if np.isfinite(error) else float('inf')
+
+    def _error_medido(self, coeficientes, referencia):
+        """
+        Diferencia relativa máxima entre H con `coeficientes` y H con los
+        coeficientes de `referencia` (más precisos) en la malla de muestra.
+        Se mide lejos de los nodos: en ellos H y H' reproducen los datos casi
+        exactamente aunque los coeficientes estén mal condicionados.
+        """
+        x_muestra = self._malla_muestra()
+        with np.errstate(over='ignore', invalid='ignore'):
+            h, _ = _horner_newton(coeficientes, self.z, x_muestra)
+            h_ref, _ = _horner_newton(referencia, self.z, x_muestra)
+            escala = max(float(np.max(np.abs(self.f_vals))), np.finfo(float).tiny)
+            error = float(np.max(np.abs(h.astype(np.longdouble) - h_ref))) / escala
+        return error if np.isfinite(error) else float('inf')
+
+    def _controlar_precision(self, cota, umbral, segundos):
+        """
+        Escala a longdouble o a Fraction (hasta MAX_NODOS_RACIONAL nodos) solo si hace falta
+
+        La cota a priori (separación de nodos y crecimiento de las diferencias) es
+        barata pero pesimista. Cuando la de float64 supera el umbral se calculan
+        los coeficientes en longdouble y se mide la diferencia entre ambos
+        polinomios en la malla de muestra: float64 solo se conserva si ese error
+        medido cumple el umbral, y es el que se informa como error estimado.
+        """
+        niveles = []
+
+        def registrar(nivel, cota_relativa, inicio, error_medido=None):
+            niveles.append({
+                'nivel': nivel,
+                'cota_a_priori': cota_relativa,
+                'error_medido': error_medido,
+                'error_estimado': cota_relativa if error_medido is None else error_medido,
+                'tiempo_ms': (time.perf_counter() - inicio) * 1000,
+            })
+            return niveles[-1]['error_estimado'] <= umbral
+
+        inicio = time.perf_counter() - segundos
+        cota_float = self._error_estimado(cota)
+        if cota_float <= umbral or np.finfo(np.longdouble).eps >= np.finfo(float).eps:
+            aceptado = registrar('float64', cota_float, inicio)
+        else:
+            coeficientes, _, _, ultima_fila, cota = diferencias_divididas_hermite(
+                self.x_vals, self.f_vals, self.df_vals, dtype=np.longdouble, cota_error=True
+            )
+            medido = self._error_medido(self.coeficientes, coeficientes)
+            aceptado = registrar('float64', cota_float, inicio, error_medido=medido)
+            if not aceptado:
+                inicio = time.perf_counter()
+                aceptado = registrar('longdouble', self._error_estimado(cota[0].astype(float)), inicio)
+                if aceptado or len(self.x_vals) > MAX_NODOS_RACIONAL:
+                    self.coeficientes = coeficientes
+                    self._ultima_fila = ultima_fila
+                    self._cota = None
+
+        # La aritmética racional crece muy rápido con n; por encima del tope se
+        # conserva el mejor nivel de punto flotante con su error estimado
+        if not aceptado and len(self.x_vals) <= MAX_NODOS_RACIONAL:
+            inicio = time.perf_counter()
+            self._exactos, ultima_fila = self._diferencias_racionales()
+            self.coeficientes = np.array([float(c) for c in self._exactos])
+            self._ultima_fila = np.array([float(c) for c in ultima_fila])
+            self._cota = None
+            niveles.append({
+                'nivel': 'racional',
+                'cota_a_priori': 0.0,
+                'error_medido': None,
+                'error_estimado': 0.0,
+                'tiempo_ms': (time.perf_counter() - inicio) * 1000,
+            })
+
+        self.precision = {
+            'nivel': niveles[-1]['nivel'],
+            'umbral': umbral,
+            'error_estimado': niveles[-1]['error_estimado'],
+            'tiempo_ms': sum(nivel['tiempo_ms'] for nivel in niveles),
+            'niveles': niveles,
+        }
+
+    def _diferencias_racionales(self):
+        """Diferencias divididas exactas con Fraction (los floats se convierten sin redondeo)"""
+        z = [Fraction(float(v)) for v in self.z]
+        q = [Fraction(float(v)) for v in np.repeat(self.f_vals, 2)]
+        df = [Fraction(float(v)) for v in self.df_vals]
+        m = len(z)
+        ultima_fila = [q[-1]]
+        for i in range(m - 1, 0, -1):
+            q[i] = df[i // 2] if i % 2 == 1 else (q[i] - q[i-1]) / (z[i] - z[i-1])
+        ultima_fila.append(q[-1])
+        for j in range(2, m):
+            for i in range(m - 1, j - 1, -1):
+                q[i] = (q[i] - q[i-1]) / (z[i] - z[i-j])
+            ultima_fila.append(q[-1])
+        return q, ultima_fila
+
+    @property
+    def ultima_fila(self):
+        return self._ultima_fila
+
+    @property
+    def grado(self):
+        return len(self.coeficientes) - 1
+
+    @property
+    def puntos(self):
+        return list(zip(self.x_vals.tolist(), self.f_vals.tolist(), self.df_vals.tolist()))
+
+    def agregar_punto(self, x_nuevo, f_nuevo, df_nuevo):
+        """
+        Agrega el nodo (x, f(x), f'(x)) calculando solo las dos filas nuevas de la tabla
+
+        Returns:
+            Los dos nuevos coeficientes de Newton
+        """
+        x_nuevo = float(x_nuevo)
+        if np.any(self.x_vals == x_nuevo):
+            raise ValueError('Los valores de x deben ser únicos.')
+
+        m = len(self.z)
+        z = np.append(self.z, [x_nuevo, x_nuevo])
+        anterior = self._ultima_fila
+
+        # Fila de z[m] = x_nuevo (primera aparición)
+        fila = np.empty(m + 1)
+        fila[0] = f_nuevo
+        for j in range(1, m + 1):
+            fila[j] = (fila[j-1] - anterior[j-1]) / (z[m] - z[m-j])
+
+        # Fila de z[m+1] = x_nuevo (repetido): la primera diferencia es f'(x)
+        fila_repetida = np.empty(m + 2)
+        fila_repetida[0] = f_nuevo
+        fila_repetida[1] = df_nuevo
+        for j in range(2, m + 2):
+            fila_repetida[j] = (fila_repetida[j-1] - fila[j-1]) / (z[m+1] - z[m+1-j])
+
+        # Misma propagación de la cota de redondeo que diferencias_divididas_hermite
+        if self._cota is not None:
+            u = np.finfo(float).eps / 2
+            cota_anterior = self._cota[1]
+            cota_fila = np.zeros(m + 1)
+            for j in range(1, m + 1):
+                cota_fila[j] = (cota_fila[j-1] + cota_anterior[j-1]) / abs(z[m] - z[m-j]) + 3 * u * abs(fila[j])
+            cota_repetida = np.zeros(m + 2)
+            for j in range(2, m + 2):
+                cota_repetida[j] = ((cota_repetida[j-1] + cota_fila[j-1]) / abs(z[m+1] - z[m+1-j])
+                                    + 3 * u * abs(fila_repetida[j]))
+            self._cota = (np.append(self._cota[0], [cota_fila[m], cota_repetida[m+1]]), cota_repetida)
+
+        self.x_vals = np.append(self.x_vals, x_nuevo)
+        self.f_vals = np.append(self.f_vals, float(f_nuevo))
+        self.df_vals = np.append(self.df_vals, float(df_nuevo))
+        self.z = z
+        self.coeficientes = np.append(self.coeficientes, [fila[m], fila_repetida[m+1]])
+        self._ultima_fila = fila_repetida
+        # La tabla completa, la forma monomial y el control de precisión ya no
+        # corresponden al polinomio
+        self.tabla = None
+        self._monomios = None
+        self._exactos = None
+        self.precision = None
+        self.nodos_agregados += 1
+        return self.coeficientes[-2:]
+
+    def a_dict(self):
+        """Estado serializable en JSON (por ejemplo, para guardarlo en la sesión)"""
+        return {
+            'x': self.x_vals.tolist(),
+            'f': self.f_vals.tolist(),
+            'df': self.df_vals.tolist(),
+            # En float64 aunque se haya escalado a longdouble (JSON no admite otro tipo);
+            # sin cotas guardadas, controlar_precision recalcula el nivel al cargar
+            'coeficientes': self.coeficientes.astype(float).tolist(),
+            'ultima_fila': self._ultima_fila.astype(float).tolist(),
+            # Solo en float64: un nivel superior no se puede extender con agregar_punto
+            'cota': None if self._cota is None else [c.astype(float).tolist() for c in self._cota],
+        }
+
+    @classmethod
+    def desde_dict(cls, datos):
+        """Reconstruye el interpolante guardado con a_dict sin recalcular la tabla"""
+        interpolante = cls.__new__(cls)
+        interpolante.x_vals = np.asarray(datos['x'], dtype=float)
+        interpolante.f_vals = np.asarray(datos['f'], dtype=float)
+        interpolante.df_vals = np.asarray(datos['df'], dtype=float)
+        interpolante.z = np.repeat(interpolante.x_vals, 2)
+        interpolante.coeficientes = np.asarray(datos['coeficientes'], dtype=float)
+        interpolante._ultima_fila = np.asarray(datos['ultima_fila'], dtype=float)
+        interpolante.tabla = None
+        interpolante._monomios = None
+        interpolante._exactos = None
+        interpolante.nodos_agregados = 0
+        cota = datos.get('cota')
+        interpolante._cota = None if cota is None else tuple(np.asarray(c, dtype=float) for c in cota)
+        interpolante.precision = None
+        return interpolante
+
+    def evaluar(self, x, derivada=False):
+        """
+        Evalúa H(x) por multiplicación anidada (Horner sobre la forma de Newton)
+
+        Args:
+            x: Escalar o arreglo de puntos
+            derivada: Si es True devuelve también H'(x)
+
+        Returns:
+            H(x), o la tupla (H(x), H'(x)) si se pidió la derivada
+        """
+        if np.ndim(x) == 0:
+            # Camino escalar con floats de Python: evita la sobrecarga de NumPy.
+            # Si los coeficientes se calcularon en aritmética racional, se evalúa exacto.
+            if self._exactos is not None:
+                c = self._exactos
+                z = [Fraction(float(v)) for v in self.z]
+                x = Fraction(float(x))
+            else:
+                c = self.coeficientes.tolist()
+                z = self.z.tolist()
+                x = float(x)
+            p = c[-1]
+            dp = 0
+            for k in range(len(c) - 2, -1, -1):
+                t = x - z[k]
+                dp = dp * t + p
+                p = p * t + c[k]
+            p, dp = float(p), float(dp)
+        else:
+            p, dp = _horner_newton(self.coeficientes, self.z, x, derivada=derivada)
+
+        if derivada:
+            return p, dp
+        return p
+
+    def coeficientes_monomiales(self):
+        """Coeficientes a_k de H(x) = a_0 + a_1 x + ... (calculados una sola vez)"""
+        if self._monomios is None:
+            self._monomios = newton_a_monomios(self.coeficientes, self.z)
+        return self._monomios
+
+    def polinomio_texto(self, precision=6):
+        return formatear_polinomio(self.coeficientes_monomiales(), precision)
+
+    def polinomio_latex(self, precision=6):
+        return formatear_polinomio(self.coeficientes_monomiales(), precision, latex=True)
+
+def newton_a_monomios(coeficientes, z):
+    """
+    Convierte la forma de Newton c_0 + c_1 (x - z_0) + ... a coeficientes monomiales
+
+    Aplica Horner sobre polinomios: en cada paso se multiplica por (x - z_k)
+    y se suma c_k, de modo que el costo total es O(n²) en operaciones de arreglo.
+
+    Returns:
+        Arreglo a con H(x) = a[0] + a[1] x + ... + a[m] x^m
+    """
+    coeficientes = np.asarray(coeficientes, dtype=float)
+    m = len(coeficientes) - 1
+    a = np.zeros(m + 1)
+    a[0] = coeficientes[m]
+    for k in range(m - 1, -1, -1):
+        grado = m - k
+        # a(x) * (x - z_k) + c_k
+        a[1:grado+1] = a[:grado] - z[k] * a[1:grado+1]
+        a[0] = coeficientes[k] - z[k] * a[0]
+    return a
+
+def _formatear_numero(valor, precision, latex):
+    texto = f"{valor:.{precision}g}"
+    if latex and 'e' in texto:
+        mantisa, exponente = texto.split('e')
+        texto = f"{mantisa} \\cdot 10^{{{int(exponente)}}}"
+    return texto
+
+def formatear_polinomio(coeficientes, precision=6, latex=False):
+    """
+    Genera el texto (sintaxis de Python) o el LaTeX de un polinomio a partir de
+    sus coeficientes monomiales, del término de mayor grado al de menor grado
+
+    Args:
+        coeficientes: Arreglo a con a[k] el coeficiente de x^k
+        precision: Cifras significativas de cada coeficiente
+        latex: Si es True genera LaTeX en lugar de texto
+    """
+    terminos = []
+    for k in range(len(coeficientes) - 1, -1, -1):
+        valor = float(coeficientes[k])
+        magnitud = _formatear_numero(abs(valor), precision, latex)
+        if float(magnitud.split(' ')[0]) == 0:
+            continue
+
+        if k == 0:
+            termino = magnitud
+        else:
+            if latex:
+                potencia = "x" if k == 1 else f"x^{{{k}}}"
+                termino = potencia if magnitud == "1" else f"{magnitud} {potencia}"
+            else:
+                potencia = "x" if k == 1 else f"x**{k}"
+                termino = potencia if magnitud == "1" else f"{magnitud}*{potencia}"
+
+        if not terminos:
+            terminos.append(f"-{termino}" if valor < 0 else termino)
+        else:
+            terminos.append(f"- {termino}" if valor < 0 else f"+ {termino}")
+
+    return " ".join(terminos) if terminos else "0"
+
+def interpolante_hermite_incremental(puntos, estado=None, umbral_precision=1e-8, tabla=False):
+    """
+    Obtiene el interpolante de `puntos` reutilizando un estado guardado con a_dict
+
+    Si los nodos guardados son un prefijo de `puntos`, solo se agregan los nodos
+    nuevos (O(n) cada uno) y se repite el control de precisión con las cotas
+    propagadas; en otro caso se construye el interpolante completo, con la
+    tabla de diferencias divididas si `tabla` es True. Con `tabla` y sin nodos
+    nuevos también se reconstruye, ya que el estado guardado no incluye la tabla.
+    """
+    if estado:
+        previo = InterpolanteHermite.desde_dict(estado)
+        k = len(previo.x_vals)
+        if ((k < len(puntos) or (k == len(puntos) and not tabla))
+                and previo.puntos == [tuple(float(v) for v in p) for p in puntos[:k]]):
+            for p in puntos[k:]:
+                previo.agregar_punto(*p)
+            if umbral_precision is not None:
+                previo.controlar_precision(umbral_precision)
+            return previo
+    return InterpolanteHermite(*zip(*puntos), tabla=tabla, umbral_precision=umbral_precision)
+
+def interpolacion_hermite(puntos, x_eval, con_pasos=True, expandir=True, derivada=False, precision=6, interpolante=None,
+                          umbral_precision=1e-8):
     """
     Implementa la interpolación de Hermite
     
     Args:
-        puntos: Lista de tuplas (x_i, f(x_i), f'(x_i))
-        x_eval: Punto donde evaluar el polinomio
-    
+        puntos: Lista de tuplas (x_i, f(x_i), f'(x_i))
+        x_eval: Punto donde evaluar el polinomio
+        con_pasos: Si es False se omite la tabla y el detalle de los pasos
+        expandir: Si es False no se expande el polinomio a la forma monomial
+            ('polinomio' y 'polinomio_latex' quedan en None)
+        derivada: Si es True también se devuelve H'(x_eval)
+        precision: Cifras significativas de los coeficientes del polinomio expandido
+        interpolante: InterpolanteHermite ya construido para estos puntos (opcional)
+        umbral_precision: Error relativo estimado a partir del cual se abandona
+            float64 por precisión extendida o racional (None para no estimarlo)
+    
+    Returns:
+        Dict con resultado, polinomio y pasos detallados
+    """
+    n = len(puntos)
+    
+    # Extraer coordenadas
+    x_vals = [p[0] for p in puntos]
+    f_vals = [p[1] for p in puntos]
+    df_vals = [p[2] for p in puntos]
+    
+    # Coeficientes de Newton (la tabla completa solo si se muestran los pasos)
+    # Un interpolante recibido sin la tabla (por ejemplo, con nodos agregados de
+    # forma incremental) no la reconstruye: los pasos muestran la diagonal y la última fila
+    if interpolante is None:
+        interpolante = InterpolanteHermite(x_vals, f_vals, df_vals, tabla=con_pasos, umbral_precision=umbral_precision)
+    coeficientes, z, Q = interpolante.coeficientes, interpolante.z, interpolante.tabla
+
+    # Evaluar en x_eval directamente sobre la forma de Newton
+    resultado, derivada_eval = interpolante.evaluar(x_eval, derivada=True)
+
+    polinomio = None
+    polinomio_latex = None
+    if expandir or con_pasos:
+        polinomio = interpolante.polinomio_texto(precision)
+        polinomio_latex = interpolante.polinomio_latex(precision)
+
+    pasos = []
+    if con_pasos:
+        pasos.append("=== INTERPOLACIÓN DE HERMITE ===")
+        pasos.append(f"Puntos dados: {puntos}")
+        pasos.append(f"Punto de evaluación: x = {x_eval}")
+        pasos.append("")
+        pasos.append("1. Tabla de diferencias divididas:")
+
+        # Mostrar tabla
+        if Q is not None:
+            pasos.append("   Xi    |  F[Xi]  |  Primera D.D  |  ...")
+            pasos.append("   " + "-"*50)
+            for i in range(2*n):
+                fila = f"  {z[i]:6.3f} |"
+                for j in range(i+1):
+                    fila += f"  {Q[i][j]:8.4f}  |"
+                pasos.append(fila)
+        else:
+            if interpolante.nodos_agregados:
+                pasos.append(f"   ({interpolante.nodos_agregados} nodos agregados de forma incremental: "
+                             "se muestran la diagonal y la última fila)")
+            pasos.append("   Xi    |  F[z0..zi]")
+            pasos.append("   " + "-"*50)
+            for i in range(2*n):
+                pasos.append(f"  {z[i]:6.3f} |  {coeficientes[i]:8.4f}  |")
+            pasos.append("   Última fila: " + " | ".join(f"{v:8.4f}" for v in interpolante.ultima_fila))
+
+        pasos.append("")
+        pasos.append("2. Construcción del polinomio:")
+        pasos.append(f"$$H(x) = {coeficientes[0]:.4f}$$")
+
+        # Construir términos del polinomio en LaTeX
+        termino_str = ""
+        for k in range(1, 2*n):
+            coef = coeficientes[k]
+            termino_str += f"(x - {z[k-1]:.3f})"
+            if coef >= 0:
+                pasos.append(f"     + {coef:.6f} \\cdot {termino_str}")
+            else:
+                pasos.append(f"     {coef:.6f} \\cdot {termino_str}")
+
+        pasos.append("")
+        pasos.append("3. Polinomio expandido:")
+        pasos.append(f"$$H(x) = {polinomio_latex}$$")
+        pasos.append("")
+        pasos.append("4. Evaluación:")
+        pasos.append(f"$$H({x_eval}) = {resultado:.8f}$$")
+
+        if interpolante.precision:
+            pasos.append("")
+            pasos.append("5. Control de precisión:")
+            for nivel in interpolante.precision['niveles']:
+                linea = f"   {nivel['nivel']:>10}: cota a priori {nivel['cota_a_priori']:.2e}"
+                if nivel['error_medido'] is not None:
+                    linea += f", error medido en la malla {nivel['error_medido']:.2e}"
+                pasos.append(f"{linea} ({nivel['tiempo_ms']:.3f} ms)")
+            pasos.append(f"   Precisión usada: {interpolante.precision['nivel']}")
+            pasos.append(f"   Umbral de error relativo: {interpolante.precision['umbral']:.0e}; la aritmética "
+                         f"racional solo se usa hasta {MAX_NODOS_RACIONAL} nodos")
+            if interpolante.precision['error_estimado'] > interpolante.precision['umbral']:
+                pasos.append(f"   El error estimado supera el umbral: con {n} nodos se conserva el mejor "
+                             "nivel de punto flotante")
+
+    resultado_dict = {
+        'resultado': resultado,
+        'polinomio': polinomio,
+        'polinomio_latex': polinomio_latex,
+        'pasos': pasos,
+        'puntos': puntos,
+        'interpolante': interpolante,
+        'precision': interpolante.precision
+    }
+    if derivada:
+        resultado_dict['derivada'] = derivada_eval
+    return resultado_dict
+
+def _evaluar_newton_lote(coeficientes, z, x, derivada=False):
+    """Horner sobre la forma de Newton para B polinomios: coeficientes (B, m), x (B, k)"""
+    p = np.broadcast_to(coeficientes[:, -1:], x.shape).copy()
+    dp = np.zeros(x.shape)
+    for k in range(coeficientes.shape[1] - 2, -1, -1):
+        t = x - z[:, k:k+1]
+        if derivada:
+            dp = dp * t + p
+        p = p * t + coeficientes[:, k:k+1]
+    return p, dp
+
+def interpolacion_hermite_lote(datos, x_eval=None, derivada=False):
+    """
+    Interpolación de Hermite para muchos conjuntos de puntos independientes a la vez
+
+    Args:
+        datos: Arreglo (B, n, 3) con las ternas (x, f, f') de B conjuntos con el
+            mismo número de nodos, o una lista de conjuntos de tamaños distintos
+            (se agrupan por tamaño y cada grupo se resuelve en un solo barrido)
+        x_eval: Puntos de evaluación: escalar común, arreglo (B,) con un punto por
+            conjunto o (B, k) con k puntos por conjunto (opcional)
+        derivada: Si es True también se devuelve H'(x_eval)
+
+    Returns:
+        Dict con 'coeficientes' y 'nodos' (forma de Newton) y, si se pidió
+        x_eval, 'resultados' (y 'derivadas'). Para un arreglo 3-D son arreglos
+        con B filas; para una lista, listas en el mismo orden que los datos.
+    """
+    uniforme = isinstance(datos, np.ndarray) and datos.ndim == 3
+    if uniforme:
+        if datos.shape[-1] != 3:
+            raise ValueError('Cada punto debe tener la forma (x, f(x), f\'(x))')
+        grupos = {datos.shape[1]: (np.arange(len(datos)), datos.astype(float))}
+    else:
+        conjuntos = [np.asarray(d, dtype=float) for d in datos]
+        grupos = {}
+        for i, d in enumerate(conjuntos):
+            if d.ndim != 2 or d.shape[1] != 3:
+                raise ValueError(f'Conjunto {i}: cada punto debe tener la forma (x, f(x), f\'(x))')
+            grupos.setdefault(d.shape[0], []).append(i)
+        grupos = {n: (np.array(idx), np.stack([conjuntos[i] for i in idx])) for n, idx in grupos.items()}
+
+    total = sum(len(idx) for idx, _ in grupos.values())
+    if x_eval is not None:
+        x_eval = np.asarray(x_eval, dtype=float)
+        if x_eval.ndim == 0:
+            x_eval = np.full((total, 1), float(x_eval))
+        elif x_eval.ndim == 1:
+            x_eval = x_eval[:, None]
+        if x_eval.ndim > 2 or x_eval.shape[0] != total:
+            raise ValueError('x_eval debe tener un valor (o una fila) por conjunto de puntos')
+
+    coeficientes = [None] * total
+    nodos = [None] * total
+    resultados = [None] * total
+    derivadas = [None] * total
+
+    for n, (indices, bloque) in grupos.items():
+        if n < 2:
+            raise ValueError('Se necesitan al menos 2 puntos para la interpolación.')
+        x, f, df = bloque[..., 0], bloque[..., 1], bloque[..., 2]
+        repetidos = np.any(np.diff(np.sort(x, axis=1), axis=1) == 0, axis=1)
+        if np.any(repetidos):
+            raise ValueError(f'Los valores de x deben ser únicos (conjunto {int(indices[repetidos][0])}).')
+
+        coef, z, _, _, _ = diferencias_divididas_hermite(x, f, df)
+        if x_eval is not None:
+            p, dp = _evaluar_newton_lote(coef, z, x_eval[indices], derivada=derivada)
+        for fila, i in enumerate(indices):
+            coeficientes[i] = coef[fila]
+            nodos[i] = z[fila]
+            if x_eval is not None:
+                resultados[i] = p[fila]
+                derivadas[i] = dp[fila]
+
+    if uniforme:
+        coeficientes = np.array(coeficientes)
+        nodos = np.array(nodos)
+        if x_eval is not None:
+            resultados = np.array(resultados)
+            derivadas = np.array(derivadas)
+
+    salida = {'coeficientes': coeficientes, 'nodos': nodos}
+    if x_eval is not None:
+        salida['resultados'] = resultados
+        if derivada:
+            salida['derivadas'] = derivadas
+    return salida
+
+class HermiteCubicoPorTramos:
+    """
+    Interpolante de Hermite cúbico por tramos (un polinomio de grado 3 por intervalo)
+
+    La construcción es O(n) y la búsqueda del tramo es binaria sobre los nodos ordenados.
+    """
+
+    def __init__(self, x_vals, f_vals, df_vals):
+        x_vals = np.asarray(x_vals, dtype=float)
+        orden = np.argsort(x_vals, kind='stable')
+        self.x_vals = x_vals[orden]
+        self.f_vals = np.asarray(f_vals, dtype=float)[orden]
+        self.df_vals = np.asarray(df_vals, dtype=float)[orden]
+
+        if len(self.x_vals) < 2:
+            raise ValueError('Se necesitan al menos 2 puntos para la interpolación.')
+        h = np.diff(self.x_vals)
+        if np.any(h == 0):
+            raise ValueError('Los valores de x deben ser únicos.')
+
+        # En cada tramo: p_i(s) = f_i + f'_i s + c2_i s² + c3_i s³, con s = x - x_i
+        pendiente = np.diff(self.f_vals) / h
+        d0 = self.df_vals[:-1]
+        d1 = self.df_vals[1:]
+        self.c2 = (3 * pendiente - 2 * d0 - d1) / h
+        self.c3 = (d0 + d1 - 2 * pendiente) / h**2
+
+    @property
+    def num_tramos(self):
+        return len(self.x_vals) - 1
+
+    def tramo(self, x):
+        """Índice del tramo que contiene x (los extremos extrapolan con el primero/último)"""
+        indice = np.searchsorted(self.x_vals, x, side='right') - 1
+        return np.clip(indice, 0, self.num_tramos - 1)
+
+    def evaluar(self, x, derivada=False):
+        """Evalúa H(x) (y opcionalmente H'(x)) para un escalar o un arreglo de puntos"""
+        escalar = np.ndim(x) == 0
+        x = np.asarray(x, dtype=float)
+        i = self.tramo(x)
+        s = x - self.x_vals[i]
+        c1 = self.df_vals[i]
+        c2 = self.c2[i]
+        c3 = self.c3[i]
+        p = self.f_vals[i] + s * (c1 + s * (c2 + s * c3))
+        if escalar:
+            p = float(p)
+        if derivada:
+            dp = c1 + s * (2 * c2 + s * 3 * c3)
+            return p, (float(dp) if escalar else dp)
+        return p
+
+    def tramo_latex(self, i, precision=6):
+        """LaTeX del polinomio cúbico del tramo i en potencias de (x - x_i)"""
+        xi = _formatear_numero(abs(self.x_vals[i]), precision, True)
+        base = f"(x - {xi})" if self.x_vals[i] >= 0 else f"(x + {xi})"
+        terminos = [_formatear_numero(self.f_vals[i], precision, True)]
+        for coef, potencia in ((self.df_vals[i], ""), (self.c2[i], "^{2}"), (self.c3[i], "^{3}")):
+            signo = "-" if coef < 0 else "+"
+            terminos.append(f"{signo} {_formatear_numero(abs(coef), precision, True)} {base}{potencia}")
+        return " ".join(terminos)
+
+def interpolacion_hermite_por_tramos(puntos, x_eval, con_pasos=True, precision=6):
+    """
+    Interpolación de Hermite cúbica por tramos, pensada para conjuntos grandes de puntos
+
+    Args:
+        puntos: Lista de tuplas (x_i, f(x_i), f'(x_i))
+        x_eval: Punto donde evaluar el interpolante
+        con_pasos: Si es False se omite el detalle de los pasos
+        precision: Cifras significativas de los coeficientes mostrados
+
+    Returns:
+        Dict con las mismas claves que interpolacion_hermite; 'polinomio_latex'
+        corresponde al tramo que contiene x_eval, 'tramo' lo describe y
+        'polinomio' es None (no hay un único polinomio)
+    """
+    interpolante = HermiteCubicoPorTramos(*zip(*puntos))
+    resultado = interpolante.evaluar(x_eval)
+    i = int(interpolante.tramo(x_eval))
+    polinomio_latex = interpolante.tramo_latex(i, precision)
+
+    pasos = []
+    if con_pasos:
+        x = interpolante.x_vals
+        pasos.append("=== INTERPOLACIÓN DE HERMITE CÚBICA POR TRAMOS ===")
+        pasos.append(f"Número de puntos: {len(x)} ({interpolante.num_tramos} tramos)")
+        pasos.append(f"Punto de evaluación: x = {x_eval}")
+        pasos.append("")
+        pasos.append("1. Polinomio cúbico en cada tramo $[x_i, x_{i+1}]$, con $h_i = x_{i+1} - x_i$:")
+        pasos.append("$$H_i(x) = f_i + f'_i (x - x_i) + c_{2,i} (x - x_i)^2 + c_{3,i} (x - x_i)^3$$")
+        pasos.append("$$c_{2,i} = \\frac{3 m_i - 2 f'_i - f'_{i+1}}{h_i}, \\quad c_{3,i} = \\frac{f'_i + f'_{i+1} - 2 m_i}{h_i^2}, \\quad m_i = \\frac{f_{i+1} - f_i}{h_i}$$")
+        pasos.append("")
+        pasos.append("2. Búsqueda binaria del tramo:")
+        pasos.append(f"$x = {x_eval}$ pertenece al tramo $[{x[i]:.4f}, {x[i+1]:.4f}]$ (i = {i})")
+        pasos.append(f"$$H_{{{i}}}(x) = {polinomio_latex}$$")
+        pasos.append("")
+        pasos.append("3. Evaluación:")
+        pasos.append(f"$$H({x_eval}) = {resultado:.8f}$$")
+
+    return {
+        'resultado': resultado,
+        'polinomio': None,
+        'polinomio_latex': polinomio_latex,
+        'tramo': f"Tramo {i}: [{interpolante.x_vals[i]}, {interpolante.x_vals[i+1]}]",
+        'pasos': pasos,
+        'puntos': puntos,
+        'interpolante': interpolante
+    }
+
+def _evaluar_en_arreglo(f, x):
+    """Evalúa una función vectorizada sobre un arreglo (las constantes se expanden a su forma)"""
+    return np.broadcast_to(np.asarray(f(x), dtype=float), x.shape).copy()
+
+def nodos_interpolacion(a, b, n, estrategia='equiespaciado'):
+    """
+    Genera n nodos ordenados en [a, b]
+
+    Args:
+        estrategia: 'equiespaciado' o 'chebyshev' (raíces de T_n trasladadas a [a, b])
+    """
+    if estrategia == 'equiespaciado':
+        return np.linspace(a, b, n)
+    if estrategia == 'chebyshev':
+        k = np.arange(n)
+        return np.sort((a + b) / 2 + (b - a) / 2 * np.cos((2*k + 1) * np.pi / (2*n)))
+    raise ValueError(f"Estrategia de nodos no reconocida: {estrategia}")
+
+def hermite_desde_funcion(funcion_str, a, b, n, x_eval, estrategia='equiespaciado', con_pasos=True,
+                          puntos_error=2000, precision=6):
+    """
+    Interpolación de Hermite de una función conocida en n nodos de [a, b]
+
+    Args:
+        funcion_str: Función f(x) tal como llega de MathLive
+        a, b: Extremos del intervalo
+        n: Número de nodos
+        x_eval: Punto donde evaluar el polinomio
+        estrategia: 'equiespaciado' o 'chebyshev'
+        con_pasos: Si es False se omite el detalle de los pasos
+        puntos_error: Tamaño de la malla densa para medir el error
+        precision: Cifras significativas de los coeficientes del polinomio expandido
+
+    Returns:
+        Dict de interpolacion_hermite más funcion, funcion_latex, error_max y error_rms
+    """
+    if n < 2:
+        raise ValueError("Se necesitan al menos 2 nodos para la interpolación.")
+    if a >= b:
+        raise ValueError("El límite inferior debe ser menor que el superior.")
+
+    import sympy as sp
+
+    x = sp.Symbol('x')
+    compilada = compilar_funcion(funcion_str)
+    funcion_str, funcion_sym, f = compilada.texto, compilada.expr, compilada.f
+    # La derivada se obtiene una sola vez de forma simbólica
+    derivada_sym = sp.diff(funcion_sym, x)
+    df = sp.lambdify(x, derivada_sym, 'numpy')
+
+    # f y f' en todos los nodos con una sola llamada vectorizada
+    nodos = nodos_interpolacion(a, b, n, estrategia)
+    with np.errstate(all='ignore'):
+        f_nodos = _evaluar_en_arreglo(f, nodos)
+        df_nodos = _evaluar_en_arreglo(df, nodos)
+    if not (np.all(np.isfinite(f_nodos)) and np.all(np.isfinite(df_nodos))):
+        raise ValueError("La función o su derivada no está definida en alguno de los nodos.")
+
+    puntos = list(zip(nodos.tolist(), f_nodos.tolist(), df_nodos.tolist()))
+    resultado = interpolacion_hermite(puntos, x_eval, con_pasos=con_pasos, precision=precision)
+
+    # Error de interpolación sobre una malla densa
+    x_denso = np.linspace(a, b, puntos_error)
+    with np.errstate(all='ignore'):
+        error = np.abs(_evaluar_en_arreglo(f, x_denso) - resultado['interpolante'].evaluar(x_denso))
+    error = error[np.isfinite(error)]
+    error_max = float(error.max()) if error.size else float('nan')
+    error_rms = float(np.sqrt(np.mean(error**2))) if error.size else float('nan')
+
+    funcion_latex = compilada.latex
+    if con_pasos:
+        pasos = [
+            "=== INTERPOLACIÓN DE HERMITE DE UNA FUNCIÓN ===",
+            f"Función: $$f(x) = {funcion_latex}$$",
+            f"Derivada: $$f'(x) = {sp.latex(derivada_sym)}$$",
+            f"Nodos: {n} ({estrategia}) en $[{a}, {b}]$",
+            "",
+        ] + resultado['pasos']
+        pasos.append("")
+        pasos.append(f"6. Error de interpolación en {puntos_error} puntos de $[{a}, {b}]$:")
+        pasos.append(f"$$\\max |f(x) - H(x)| = {error_max:.6e}$$")
+        pasos.append(f"$$\\sqrt{{\\frac{{1}}{{N}} \\sum (f(x) - H(x))^2}} = {error_rms:.6e}$$")
+        resultado['pasos'] = pasos
+
+    resultado.update({
+        'funcion': funcion_str,
+        'funcion_latex': funcion_latex,
+        'estrategia': estrategia,
+        'error_max': error_max,
+        'error_rms': error_rms
+    })
+    return resultado
+
+def limpiar_funcion_mathlive(funcion_str):
+    """
+    Limpia la cadena de entrada proveniente de MathLive para que sea compatible con sympy.sympify
+
+    La entrada se parsea una sola vez (ver mathlive.py) y la cadena se genera
+    desde el árbol. Si el texto no pertenece al subconjunto soportado se
+    devuelve sin espacios para que sympify informe el error.
+    """
+    if not funcion_str:
+        return ""
+    try:
+        return a_texto(parsear_mathlive(funcion_str))
+    except ValueError:
+        return "".join(funcion_str.split())
+
+def _sympify_funcion(funcion_str, error):
+    """
+    Respaldo para entradas fuera del subconjunto que reconoce el parser de MathLive
+    (por ejemplo funciones de sympy escritas a mano)
+    """
+    from sympy import sympify
+
+    try:
+        return sympify(funcion_str)
+    except Exception:
+        raise ValueError(f"No se pudo parsear la función '{funcion_str}'. Error: {str(error)}")
+
+def _tiene_variables(nodo):
+    return nodo.tipo == 'var' or any(_tiene_variables(hijo) for hijo in nodo.hijos)
+
+def evaluar_constante(texto):
+    """
+    Valor numérico de una expresión sin variables (p. ej. 2, \\pi o e^2 - 1)
+
+    Raises:
+        ValueError: si la expresión no se puede interpretar, depende de x o no es finita
+    """
+    arbol = parsear_mathlive(texto)
+    if _tiene_variables(arbol):
+        raise ValueError(f"La expresión '{texto}' no debe depender de variables")
+    with np.errstate(all='ignore'):
+        valor = float(compilar_numpy(arbol)(0.0))
+    if not math.isfinite(valor):
+        raise ValueError(f"La expresión '{texto}' no tiene un valor finito")
+    return valor
+
+class ExpresionCompilada:
+    """
+    Función de x ya parseada: función de NumPy, expresión de sympy y LaTeX
+
+    La función numérica se compila directamente desde el árbol; sympy solo se
+    carga si se pide la expresión simbólica o el LaTeX.
+    """
+
+    def __init__(self, texto, arbol=None, expr=None, variables=('x',)):
+        self.texto = texto
+        self.variables = variables
+        self._arbol = arbol
+        self._expr = expr
+        self._latex = None
+        if arbol is not None:
+            self.f = compilar_numpy(arbol, variables)
+        else:
+            from sympy import lambdify, symbols
+            self.f = lambdify(symbols(variables), expr, ['numpy', 'math'])
+
+    @property
+    def expr(self):
+        if self._expr is None:
+            from sympy import symbols
+            self._expr = a_sympy(self._arbol, {v: symbols(v) for v in self.variables})
+        return self._expr
+
+    @property
+    def latex(self):
+        if self._latex is None:
+            from sympy import latex
+            try:
+                self._latex = latex(self.expr)
+            except Exception:
+                self._latex = str(self.expr)
+        return self._latex
+
+class CacheExpresiones:
+    """
+    Cache LRU de expresiones compiladas, compartida por todo el proceso
+
+    La clave es la cadena normalizada que genera el parser de MathLive (la misma
+    que limpiar_funcion_mathlive) junto con las variables, de modo que variantes
+    de la misma entrada reutilizan la compilación.
+    """
+
+    def __init__(self, capacidad=128):
+        self.capacidad = capacidad
+        self.aciertos = 0
+        self.fallos = 0
+        self._entradas = OrderedDict()
+        self._lock = threading.Lock()
+
+    def obtener(self, funcion_str, variables=('x',)):
+        try:
+            arbol = parsear_mathlive(funcion_str)
+            texto = a_texto(arbol)
+        except ValueError as e:
+            arbol, error = None, e
+            texto = "".join(funcion_str.split())
+        clave = (texto, variables)
+        with self._lock:
+            compilada = self._entradas.get(clave)
+            if compilada is not None:
+                self._entradas.move_to_end(clave)
+                self.aciertos += 1
+                return compilada
+            self.fallos += 1
+
+        # La compilación se hace fuera del lock; si dos hilos compilan la misma
+        # expresión a la vez, el resultado es equivalente
+        if arbol is not None:
+            compilada = ExpresionCompilada(texto, arbol=arbol, variables=variables)
+        else:
+            compilada = ExpresionCompilada(texto, expr=_sympify_funcion(texto, error), variables=variables)
+        with self._lock:
+            self._entradas[clave] = compilada
+            self._entradas.move_to_end(clave)
+            while len(self._entradas) > self.capacidad:
+                self._entradas.popitem(last=False)
+        return compilada
+
+    def estadisticas(self):
+        with self._lock:
+            return {
+                'aciertos': self.aciertos,
+                'fallos': self.fallos,
+                'entradas': len(self._entradas),
+                'capacidad': self.capacidad
+            }
+
+    def limpiar(self):
+        with self._lock:
+            self._entradas.clear()
+            self.aciertos = 0
+            self.fallos = 0
+
+_cache_expresiones = CacheExpresiones()
+
+def compilar_funcion(funcion_str, variables=('x',)):
+    """Devuelve la ExpresionCompilada de funcion_str usando la cache del proceso"""
+    return _cache_expresiones.obtener(funcion_str, variables)
+
+def estadisticas_cache_expresiones():
+    """Aciertos, fallos y ocupación de la cache de expresiones"""
+    return _cache_expresiones.estadisticas()
+
+class ContextoEvaluacion:
+    """
+    Estado de evaluación de una solicitud de integración
+
+    Lo comparten integracion_compuesta y generar_datos_grafica_integracion para
+    que la función se compile una sola vez y cada nodo se evalúe una sola vez.
+    """
+
+    def __init__(self, funcion_str):
+        self.compilada = compilar_funcion(funcion_str)
+        self._nodos = {}
+
+    @property
+    def f(self):
+        return self.compilada.f
+
+    def nodos(self, a, h, n):
+        """Abscisas x_i = a + i*h (i = 0..n) y los valores de f en ellas"""
+        clave = (a, h, n)
+        if clave not in self._nodos:
+            self._nodos[clave] = _evaluar_funcion_nodos(self.f, a, h, n)
+        return self._nodos[clave]
+
+    def evaluar(self, x):
+        """Evalúa f sobre un arreglo arbitrario"""
+        return _evaluar_en_arreglo(self.f, x)
+
+    def nodos_gauss(self, a, b, n, orden):
+        """Nodos de Gauss–Legendre de los n subintervalos de [a, b] y los valores de f en ellos"""
+        clave = ('gauss', a, b, n, orden)
+        if clave not in self._nodos:
+            t, _ = nodos_gauss_legendre(orden)
+            h = (b - a) / n
+            centros = a + (np.arange(n) + 0.5) * h
+            # Fila i: los nodos de [-1, 1] trasladados al subintervalo i
+            x_vals = centros[:, None] + (h / 2) * t[None, :]
+            self._nodos[clave] = (x_vals, self.evaluar(x_vals))
+        return self._nodos[clave]
+
+def integracion_compuesta(funcion_str, a, b, n, metodo, contexto=None, con_pasos=True,
+                          tolerancia_abs=1e-10, tolerancia_rel=1e-10, max_evaluaciones=20000,
+                          orden_gauss=5, por_bloques=None, procesos=0,
+                          metodos_comparacion=('trapecio', 'simpson13', 'simpson38'), valor_referencia=None,
+                          acumulada=False, x_consulta=None):
+    """
+    Integración numérica compuesta (trapecio, Simpson 1/3, Simpson 3/8, Gauss–Legendre,
+    adaptativa o Romberg)
+
+    Args:
+        n: Número de subintervalos (en los métodos adaptativo y Romberg, los iniciales)
+        contexto: ContextoEvaluacion de la solicitud (opcional), para compartir
+            la función compilada y los nodos con la gráfica
+        con_pasos: Si es False se omite el detalle de los pasos (y no se
+            necesita sympy para el LaTeX de la función)
+        tolerancia_abs, tolerancia_rel: Tolerancias de los métodos adaptativo y Romberg
+        max_evaluaciones: Máximo de evaluaciones de f de los métodos adaptativo y Romberg
+        orden_gauss: Nodos por subintervalo de Gauss–Legendre
+        por_bloques: Recorrer la malla por bloques con memoria acotada (trapecio y
+            Simpson); por omisión se usa a partir de UMBRAL_INTEGRACION_BLOQUES
+        procesos: Procesos para repartir los bloques (0 o 1: en el mismo proceso)
+        metodos_comparacion: Reglas del método 'comparacion', todas sobre la misma evaluación
+        valor_referencia: Valor exacto (opcional) para los errores de la comparación
+        acumulada: Calcular también F(x) = ∫ₐˣ f en todos los nodos (trapecio y Simpson 1/3)
+        x_consulta: Puntos donde interpolar F(x) (requiere acumulada)
+
+    Returns:
+        Dict con resultado, pasos, metodo y funcion; el método adaptativo agrega
+        error_estimado, evaluaciones, malla y convergio, Romberg error_estimado,
+        evaluaciones, evaluaciones_ahorradas, tabla_romberg y convergio, y
+        Gauss–Legendre evaluaciones y orden_gauss. Por bloques se agregan
+        evaluaciones, bloques y sumas_bloques. La comparación agrega evaluaciones,
+        comparacion (una fila por regla) y valor_referencia. Con acumulada se agregan
+        integral_acumulada (IntegralAcumulada) y consultas (pares x, F(x))
+    """
+    # Parsear función (o reutilizar la del contexto de la solicitud)
+    if contexto is None:
+        contexto = ContextoEvaluacion(funcion_str)
+    funcion_str = contexto.compilada.texto
+    
+    h = (b - a) / n
+    pasos = [] if con_pasos else None
+    
+    if con_pasos:
+        pasos.append(f"=== INTEGRACIÓN NUMÉRICA COMPUESTA - {metodo.upper()} ===")
+        pasos.append(f"Función: $$f(x) = {contexto.compilada.latex}$$")
+        pasos.append(f"Intervalo: $[{a}, {b}]$")
+        if metodo not in ('adaptativo', 'romberg'):
+            pasos.append(f"Número de subintervalos: $n = {n}$")
+            pasos.append(f"Ancho de subintervalo: $$h = \\frac{{b-a}}{{n}} = \\frac{{{b}-{a}}}{{{n}}} = {h:.6f}$$")
+        pasos.append("")
+    
+    extra = {}
+    if metodo == 'adaptativo':
+        extra = _adaptativo_compuesto(contexto, a, b, n, pasos, tolerancia_abs, tolerancia_rel, max_evaluaciones)
+        resultado = extra.pop('resultado')
+    elif metodo == 'romberg':
+        extra = _romberg_compuesto(contexto, a, b, n, pasos, tolerancia_abs, tolerancia_rel, max_evaluaciones)
+        resultado = extra.pop('resultado')
+    elif metodo == 'gauss_legendre':
+        extra = _gauss_legendre_compuesto(contexto, a, b, n, h, pasos, orden_gauss)
+        resultado = extra.pop('resultado')
+    elif metodo == 'comparacion':
+        extra = _comparacion_compuesta(contexto, a, b, n, h, pasos, metodos_comparacion, valor_referencia,
+                                       por_bloques=por_bloques or (por_bloques is None and n >= UMBRAL_INTEGRACION_BLOQUES),
+                                       procesos=procesos)
+        resultado = extra.pop('resultado')
+    elif metodo not in _FACTORES_NEWTON_COTES:
+        raise ValueError(f"Método no reconocido: {metodo}")
+    elif metodo == 'simpson13' and n % 2 != 0:
+        raise ValueError("Para Simpson 1/3, n debe ser par")
+    elif metodo == 'simpson38' and n % 3 != 0:
+        raise ValueError("Para Simpson 3/8, n debe ser múltiplo de 3")
+    elif por_bloques or (por_bloques is None and n >= UMBRAL_INTEGRACION_BLOQUES):
+        extra = _newton_cotes_por_bloques(contexto, a, b, n, h, metodo, pasos, procesos=procesos)
+        resultado = extra.pop('resultado')
+    elif metodo == 'trapecio':
+        resultado = _trapecio_compuesto(contexto, a, b, n, h, pasos)
+    elif metodo == 'simpson13':
+        resultado = _simpson13_compuesto(contexto, a, b, n, h, pasos)
+    else:
+        resultado = _simpson38_compuesto(contexto, a, b, n, h, pasos)
+    
+    if acumulada:
+        # Los nodos ya están en el contexto: F(x) no vuelve a evaluar f
+        tabla = integral_acumulada(funcion_str, a, b, n, metodo, contexto=contexto)
+        extra['integral_acumulada'] = tabla
+        extra['consultas'] = []
+        if x_consulta is not None and len(x_consulta) > 0:
+            x_consulta = np.asarray(x_consulta, dtype=float).ravel()
+            extra['consultas'] = list(zip(x_consulta.tolist(), tabla.evaluar(x_consulta).tolist()))
+        if con_pasos:
+            pasos.append("")
+            pasos.append("Integral acumulada $F(x_i) = \\int_a^{x_i} f(x)\\,dx$ en los nodos:")
+            pasos.extend(_lineas_acotadas(
+                (f"F({x_val:.4f}) = {valor:.8f}" for x_val, valor in zip(tabla.x_vals.tolist(), tabla.valores.tolist())),
+                n + 1, 5, 'nodos'))
+            for x_val, valor in extra['consultas']:
+                pasos.append(f"$$F({x_val:g}) \\approx {valor:.8f}$$")
+            if extra['consultas']:
+                pasos.append("(interpolación de Hermite cúbica entre nodos, con F'(x) = f(x))")
+
+    return {
+        'resultado': resultado,
+        'pasos': pasos if con_pasos else [],
+        'metodo': metodo,
+        'funcion': funcion_str,
+        **extra
+    }
+
+def _evaluar_funcion_nodos(f, a, h, n, tamano_bloque=65536):
+    """
+    Evalúa f en los nodos x_i = a + i*h, i = 0..n
+
+    Se intenta una sola llamada vectorizada; si la expresión no admite arreglos
+    se evalúa nodo a nodo por bloques.
+
+    Returns:
+        Tupla (x_vals, f_vals) como arreglos de NumPy
+    """
+    x_vals = a + np.arange(n + 1) * h
+    try:
+        f_vals = np.asarray(f(x_vals), dtype=float)
+        # Las expresiones constantes devuelven un escalar
+        return x_vals, np.broadcast_to(f_vals, x_vals.shape).copy()
+    except (TypeError, ValueError, AttributeError):
+        pass
+
+    f_vals = np.empty(n + 1)
+    for inicio in range(0, n + 1, tamano_bloque):
+        bloque = x_vals[inicio:inicio + tamano_bloque].tolist()
+        f_vals[inicio:inicio + len(bloque)] = [f(x) for x in bloque]
+    return x_vals, f_vals
+
+def _pasos_evaluacion(x_vals, f_vals, pasos):
+    """Agrega a los pasos la evaluación de la función en cada nodo"""
+    pasos.append("Evaluación de la función en los puntos:")
+    pasos.extend(f"f(x_{i}) = f({x_val:.4f}) = {f_val:.6f}"
+                 for i, (x_val, f_val) in enumerate(zip(x_vals.tolist(), f_vals.tolist())))
+
+def _trapecio_compuesto(contexto, a, b, n, h, pasos):
+    """Regla del trapecio compuesta (pasos=None para omitir el detalle)"""
+    # Calcular puntos
+    x_vals, f_vals = contexto.nodos(a, h, n)
+    
+    suma_extremos = float(f_vals[0] + f_vals[-1])  # f(x₀) + f(xₙ)
+    suma_intermedia = float(f_vals[1:-1].sum())  # ∑f(xᵢ) para i=1 a n-1
+    suma = suma_extremos + 2 * suma_intermedia
+    resultado = (h/2) * suma
+    
+    if pasos is not None:
+        pasos.append("Fórmula del trapecio compuesto:")
+        pasos.append("$$\\int_a^b f(x)dx \\approx \\frac{h}{2}\\left[f(x_0) + 2\\sum_{i=1}^{n-1}f(x_i) + f(x_n)\\right]$$")
+        pasos.append("")
+        _pasos_evaluacion(x_vals, f_vals, pasos)
+        pasos.append("")
+        pasos.append("Aplicando la fórmula:")
+        pasos.append(f"f(x₀) + f(xₙ) = {f_vals[0]:.6f} + {f_vals[-1]:.6f} = {suma_extremos:.6f}")
+        pasos.append(f"2∑f(xᵢ) = 2 × {suma_intermedia:.6f} = {2*suma_intermedia:.6f}")
+        pasos.append(f"Suma total = {suma:.6f}")
+        pasos.append(f"$$\\mathrm{{Resultado}} = \\frac{{h}}{{2}} \\times \\text{{suma}} = \\frac{{{h:.6f}}}{{2}} \\times {suma:.6f} = {resultado:.8f}$$")
+
+    return resultado
+
+def _simpson13_compuesto(contexto, a, b, n, h, pasos):
+    """Regla de Simpson 1/3 compuesta (pasos=None para omitir el detalle)"""
+    # Calcular puntos
+    x_vals, f_vals = contexto.nodos(a, h, n)
+    
+    # Términos impares (coeficiente 4)
+    suma_impares = float(f_vals[1:n:2].sum())
+    # Términos pares intermedios (coeficiente 2)
+    suma_pares = float(f_vals[2:n-1:2].sum())
+    
+    suma_total = float(f_vals[0] + f_vals[-1]) + 4*suma_impares + 2*suma_pares
+    resultado = (h/3) * suma_total
+    
+    if pasos is not None:
+        pasos.append("Fórmula de Simpson 1/3 compuesta:")
+        pasos.append("$$\\int_a^b f(x)dx \\approx \\frac{h}{3}\\left[f(x_0) + 4\\sum_{i=1}^{n/2}f(x_{2i-1}) + 2\\sum_{i=1}^{n/2-1}f(x_{2i}) + f(x_n)\\right]$$")
+        pasos.append("")
+        _pasos_evaluacion(x_vals, f_vals, pasos)
+        pasos.append("")
+        pasos.append("Aplicando la fórmula:")
+        pasos.append(f"f(x₀) + f(xₙ) = {f_vals[0]:.6f} + {f_vals[-1]:.6f} = {f_vals[0] + f_vals[-1]:.6f}")
+        pasos.append(f"4∑f(x₂ᵢ₋₁) = 4 × {suma_impares:.6f} = {4*suma_impares:.6f}")
+        pasos.append(f"2∑f(x₂ᵢ) = 2 × {suma_pares:.6f} = {2*suma_pares:.6f}")
+        pasos.append(f"Suma total = {suma_total:.6f}")
+        pasos.append(f"$$\\mathrm{{Resultado}} = \\frac{{h}}{{3}} \\times \\text{{suma}} = \\frac{{{h:.6f}}}{{3}} \\times {suma_total:.6f} = {resultado:.8f}$$")
+    
+    return resultado
+
+def _simpson38_compuesto(contexto, a, b, n, h, pasos):
+    """Regla de Simpson 3/8 compuesta (pasos=None para omitir el detalle)"""
+    # Calcular puntos
+    x_vals, f_vals = contexto.nodos(a, h, n)
+    
+    # Coeficientes según posición
+    suma_3_tipo1 = float(f_vals[1:n:3].sum())    # x₁, x₄, x₇, ...
+    suma_3_tipo2 = float(f_vals[2:n:3].sum())    # x₂, x₅, x₈, ...
+    suma_2 = float(f_vals[3:n-2:3].sum())        # x₃, x₆, x₉, ...
+    
+    suma_total = float(f_vals[0] + f_vals[-1]) + 3*suma_3_tipo1 + 3*suma_3_tipo2 + 2*suma_2
+    resultado = (3*h/8) * suma_total
+    
+    if pasos is not None:
+        pasos.append("Fórmula de Simpson 3/8 compuesta:")
+        pasos.append("$$\\int_a^b f(x)dx \\approx \\frac{3h}{8}\\left[f(x_0) + 3\\sum_{i=1}^{n/3}f(x_{3i-2}) + 3\\sum_{i=1}^{n/3}f(x_{3i-1}) + 2\\sum_{i=1}^{n/3-1}f(x_{3i}) + f(x_n)\\right]$$")
+        pasos.append("")
+        _pasos_evaluacion(x_vals, f_vals, pasos)
+        pasos.append("")
+        pasos.append("Aplicando la fórmula:")
+        pasos.append(f"f(x₀) + f(xₙ) = {f_vals[0]:.6f} + {f_vals[-1]:.6f} = {f_vals[0] + f_vals[-1]:.6f}")
+        pasos.append(f"3∑f(x₃ᵢ₋₂) = 3 × {suma_3_tipo1:.6f} = {3*suma_3_tipo1:.6f}")
+        pasos.append(f"3∑f(x₃ᵢ₋₁) = 3 × {suma_3_tipo2:.6f} = {3*suma_3_tipo2:.6f}")
+        pasos.append(f"2∑f(x₃ᵢ) = 2 × {suma_2:.6f} = {2*suma_2:.6f}")
+        pasos.append(f"Suma total = {suma_total:.6f}")
+        pasos.append(f"$$\\mathrm{{Resultado}} = \\frac{{3h}}{{8}} \\times \\text{{suma}} = \\frac{{3\\times{h:.6f}}}{{8}} \\times {suma_total:.6f} = {resultado:.8f}$$")
+    
+    return resultado
+
+# A partir de este número de subintervalos los métodos de Newton–Cotes
+# recorren la malla por bloques en lugar de materializar todos los nodos
+UMBRAL_INTEGRACION_BLOQUES = 100_000
+
+_FACTORES_NEWTON_COTES = {
+    'trapecio': ('\\frac{h}{2}', 1 / 2),
+    'simpson13': ('\\frac{h}{3}', 1 / 3),
+    'simpson38': ('\\frac{3h}{8}', 3 / 8),
+}
+
+class SumaNeumaier:
+    """Suma compensada de Kahan–Babuška (Neumaier) para combinar sumas parciales"""
+
+    def __init__(self):
+        self.suma = 0.0
+        self.compensacion = 0.0
+
+    def agregar(self, valor):
+        t = self.suma + valor
+        if abs(self.suma) >= abs(valor):
+            self.compensacion += (self.suma - t) + valor
+        else:
+            self.compensacion += (valor - t) + self.suma
+        self.suma = t
+
+    @property
+    def valor(self):
+        return self.suma + self.compensacion
+
+def _pesos_newton_cotes(metodo, indices, n):
+    """Coeficientes de la regla compuesta para los nodos x_i de `indices` (sin el factor h)"""
+    if metodo == 'trapecio':
+        pesos = np.full(indices.shape, 2.0)
+    elif metodo == 'simpson13':
+        pesos = np.where(indices % 2 == 1, 4.0, 2.0)
+    else:
+        pesos = np.where(indices % 3 == 0, 2.0, 3.0)
+    pesos[(indices == 0) | (indices == n)] = 1.0
+    return pesos
+
+def _suma_bloque(f, metodos, a, h, n, inicio, fin):
+    """Sumas ponderadas de f en los nodos x_i, inicio <= i < fin, una por método"""
+    indices = np.arange(inicio, fin, dtype=np.int64)
+    f_vals = _evaluar_en_arreglo(f, a + indices * h)
+    return tuple(float(np.dot(_pesos_newton_cotes(metodo, indices, n), f_vals)) for metodo in metodos)
+
+def _suma_bloque_proceso(funcion_str, metodos, a, h, n, inicio, fin):
+    """Versión para el pool de procesos: cada proceso compila la función desde el texto"""
+    return _suma_bloque(compilar_funcion(funcion_str).f, metodos, a, h, n, inicio, fin)
+
+def _sumas_por_bloques(contexto, a, h, n, metodos, tamano_bloque, procesos):
+    """
+    Recorre la malla x_i = a + i*h por bloques y suma con cada regla de `metodos`
+
+    Cada nodo se evalúa una sola vez aunque se pidan varias reglas.
+
+    Returns:
+        Tupla (rangos, sumas_bloques, totales): los rangos de índices de cada
+        bloque, las sumas de cada bloque (una tupla por bloque) y la suma
+        compensada de cada método
+    """
+    rangos = [(inicio, min(inicio + tamano_bloque, n + 1)) for inicio in range(0, n + 1, tamano_bloque)]
+
+    if procesos and procesos > 1 and len(rangos) > 1:
+        with ProcessPoolExecutor(max_workers=min(procesos, len(rangos))) as pool:
+            sumas_bloques = list(pool.map(_suma_bloque_proceso,
+                                          *zip(*[(contexto.compilada.texto, metodos, a, h, n, inicio, fin)
+                                                 for inicio, fin in rangos])))
+    else:
+        sumas_bloques = [_suma_bloque(contexto.f, metodos, a, h, n, inicio, fin) for inicio, fin in rangos]
+
+    totales = []
+    for j in range(len(metodos)):
+        total = SumaNeumaier()
+        for sumas in sumas_bloques:
+            total.agregar(sumas[j])
+        totales.append(total.valor)
+    return rangos, sumas_bloques, totales
+
+def _pasos_evaluacion_extremos(contexto, a, h, n, k_extremos, pasos):
+    """Agrega a los pasos la evaluación de f en los primeros y últimos k nodos"""
+    indices = np.unique(np.concatenate([np.arange(min(k_extremos, n + 1)),
+                                        np.arange(max(n + 1 - k_extremos, 0), n + 1)]))
+    x_extremos = a + indices * h
+    f_extremos = contexto.evaluar(x_extremos)
+    pasos.append(f"Evaluación de la función (primeros y últimos {k_extremos} nodos):")
+    for j, (i, x_val, f_val) in enumerate(zip(indices.tolist(), x_extremos.tolist(), f_extremos.tolist())):
+        if j == k_extremos and n + 1 > 2 * k_extremos:
+            pasos.append(f"⋮ ({n + 1 - 2 * k_extremos} nodos omitidos)")
+        pasos.append(f"f(x_{i}) = f({x_val:.4f}) = {f_val:.6f}")
+
+def _lineas_acotadas(lineas, total, k, unidad):
+    """Las primeras y últimas k líneas de un iterable de `total` elementos"""
+    if total <= 2 * k:
+        return list(lineas)
+    seleccion = []
+    for i, linea in enumerate(lineas):
+        if i < k or i >= total - k:
+            seleccion.append(linea)
+        if i == k:
+            seleccion.append(f"⋮ ({total - 2 * k} {unidad} omitidos)")
+    return seleccion
+
+def _newton_cotes_por_bloques(contexto, a, b, n, h, metodo, pasos, tamano_bloque=262144,
+                              procesos=0, k_extremos=5):
+    """
+    Regla de Newton–Cotes compuesta recorriendo la malla por bloques de tamaño fijo
+
+    La memoria usada no depende de n: cada bloque de nodos se evalúa con una
+    llamada vectorizada, se reduce a su suma ponderada y se descarta. Las sumas
+    de los bloques se combinan con suma compensada. Con procesos > 1 los bloques
+    se reparten en un pool de procesos, que recompilan la función desde el texto.
+
+    Los pasos se acotan: solo se muestran los primeros y últimos k_extremos
+    nodos y las sumas de los bloques.
+
+    Returns:
+        Dict con resultado, evaluaciones, bloques y sumas_bloques
+    """
+    rangos, sumas_bloques, (suma_total,) = _sumas_por_bloques(contexto, a, h, n, (metodo,),
+                                                              tamano_bloque, procesos)
+    sumas_bloques = [sumas[0] for sumas in sumas_bloques]
+    simbolo_factor, factor = _FACTORES_NEWTON_COTES[metodo]
+    resultado = factor * h * suma_total
+
+    if pasos is not None:
+        pasos.append(f"Evaluación por bloques de {tamano_bloque} nodos ({len(rangos)} bloques, {n + 1} nodos)")
+        pasos.append("$$\\int_a^b f(x)dx \\approx " + simbolo_factor + " \\sum_{i=0}^{n} c_i f(x_i)$$")
+        pasos.append("")
+        _pasos_evaluacion_extremos(contexto, a, h, n, k_extremos, pasos)
+        pasos.append("")
+        pasos.append("Sumas ponderadas por bloque $\\sum c_i f(x_i)$:")
+        pasos.extend(_lineas_acotadas(
+            (f"Bloque {j + 1}: nodos {inicio}–{fin - 1}: {suma:.10f}"
+             for j, ((inicio, fin), suma) in enumerate(zip(rangos, sumas_bloques))),
+            len(rangos), 2 * k_extremos, 'bloques'))
+        pasos.append("")
+        pasos.append(f"Suma total (compensada) = {suma_total:.10f}")
+        pasos.append(f"$$\\mathrm{{Resultado}} = {simbolo_factor} \\times \\text{{suma}} = {resultado:.10f}$$")
+
+    return {
+        'resultado': resultado,
+        'evaluaciones': n + 1,
+        'bloques': len(rangos),
+        'sumas_bloques': sumas_bloques
+    }
+
+_NOMBRES_NEWTON_COTES = {'trapecio': 'Trapecio', 'simpson13': 'Simpson 1/3', 'simpson38': 'Simpson 3/8'}
+_DIVISORES_NEWTON_COTES = {'trapecio': 1, 'simpson13': 2, 'simpson38': 3}
+
+def _comparacion_compuesta(contexto, a, b, n, h, pasos, metodos, valor_referencia=None, por_bloques=False,
+                           procesos=0, k_extremos=5):
+    """
+    Compara varias reglas de Newton–Cotes con una sola evaluación de f
+
+    Todas las reglas se obtienen del mismo arreglo de valores en los n+1 nodos
+    (n debe ser múltiplo de 2 y/o 3 según las reglas pedidas, 6 para las tres).
+    Con valor_referencia se agregan los errores absoluto y relativo.
+
+    Returns:
+        Dict con resultado (el de la regla más precisa: la de menor error si hay
+        referencia, si no la última pedida), evaluaciones, comparacion y valor_referencia
+    """
+    metodos = tuple(dict.fromkeys(metodos))
+    if not metodos:
+        raise ValueError("Selecciona al menos un método para comparar")
+    for metodo in metodos:
+        if metodo not in _FACTORES_NEWTON_COTES:
+            raise ValueError(f"Método no reconocido: {metodo}")
+    multiplo = math.lcm(*(_DIVISORES_NEWTON_COTES[metodo] for metodo in metodos))
+    if n % multiplo != 0:
+        raise ValueError(f"Para comparar {', '.join(_NOMBRES_NEWTON_COTES[m] for m in metodos)}, "
+                         f"n debe ser múltiplo de {multiplo}")
+
+    if por_bloques:
+        # Una sola pasada por bloques con los pesos de todas las reglas
+        _, _, totales = _sumas_por_bloques(contexto, a, h, n, metodos, 262144, procesos)
+        resultados = [_FACTORES_NEWTON_COTES[metodo][1] * h * total for metodo, total in zip(metodos, totales)]
+    else:
+        # Los nodos quedan en el contexto: cada regla reutiliza la misma evaluación
+        reglas = {'trapecio': _trapecio_compuesto, 'simpson13': _simpson13_compuesto,
+                  'simpson38': _simpson38_compuesto}
+        resultados = [reglas[metodo](contexto, a, b, n, h, None) for metodo in metodos]
+
+    comparacion = []
+    for metodo, resultado in zip(metodos, resultados):
+        fila = {'metodo': metodo, 'nombre': _NOMBRES_NEWTON_COTES[metodo], 'resultado': resultado}
+        if valor_referencia is not None:
+            fila['error'] = abs(resultado - valor_referencia)
+            fila['error_relativo'] = fila['error'] / abs(valor_referencia) if valor_referencia else None
+        comparacion.append(fila)
+
+    if valor_referencia is not None:
+        mejor = min(comparacion, key=lambda fila: fila['error'])
+    else:
+        mejor = comparacion[-1]
+
+    if pasos is not None:
+        pasos.append(f"Comparación de {len(metodos)} reglas con una sola evaluación de f en {n + 1} nodos")
+        pasos.append("")
+        if por_bloques:
+            _pasos_evaluacion_extremos(contexto, a, h, n, k_extremos, pasos)
+        else:
+            x_vals, f_vals = contexto.nodos(a, h, n)
+            _pasos_evaluacion(x_vals, f_vals, pasos)
+        pasos.append("")
+        for fila in comparacion:
+            simbolo_factor = _FACTORES_NEWTON_COTES[fila['metodo']][0]
+            pasos.append(f"{fila['nombre']}: $$" + simbolo_factor + f" \\sum_{{i=0}}^{{n}} c_i f(x_i) = {fila['resultado']:.10f}$$")
+        pasos.append("")
+        pasos.append("Tabla comparativa:")
+        if valor_referencia is not None:
+            pasos.append(f"Valor de referencia: {valor_referencia:.12f}")
+            pasos.append("   Método        |    Resultado         |  Error absoluto  |  Error relativo")
+            pasos.append("   " + "-"*75)
+            for fila in comparacion:
+                relativo = f"{fila['error_relativo']:.3e}" if fila['error_relativo'] is not None else "—"
+                pasos.append(f"   {fila['nombre']:<13} | {fila['resultado']:20.12f} | {fila['error']:16.3e} | {relativo:>15}")
+        else:
+            pasos.append("   Método        |    Resultado")
+            pasos.append("   " + "-"*40)
+            for fila in comparacion:
+                pasos.append(f"   {fila['nombre']:<13} | {fila['resultado']:20.12f}")
+        pasos.append("")
+        pasos.append(f"Evaluaciones de la función: {n + 1} (por separado serían {(n + 1) * len(metodos)})")
+
+    return {
+        'resultado': mejor['resultado'],
+        'evaluaciones': n + 1,
+        'comparacion': comparacion,
+        'valor_referencia': valor_referencia
+    }
+
+class IntegralAcumulada:
+    """
+    Tabla de F(x) = ∫ₐˣ f(t) dt en los nodos de una malla uniforme
+
+    Entre nodos se interpola con Hermite cúbico por tramos, ya que F'(x) = f(x)
+    es conocida en cada nodo; así la interpolación no pierde el orden de la regla.
+    """
+
+    def __init__(self, x_vals, valores, f_vals, metodo):
+        self.x_vals = x_vals
+        self.valores = valores
+        self.metodo = metodo
+        self._interpolante = HermiteCubicoPorTramos(x_vals, valores, f_vals)
+
+    @property
+    def total(self):
+        return float(self.valores[-1])
+
+    def evaluar(self, x):
+        """F(x) para un escalar o un arreglo de puntos dentro de [a, b]"""
+        x_arr = np.asarray(x, dtype=float)
+        if np.any((x_arr < self.x_vals[0]) | (x_arr > self.x_vals[-1])):
+            raise ValueError(f"Los puntos de consulta deben estar en [{self.x_vals[0]}, {self.x_vals[-1]}]")
+        return self._interpolante.evaluar(x)
+
+    def muestra(self, max_puntos=2000):
+        """Arreglo compacto (x, F) de a lo sumo max_puntos nodos, para la gráfica"""
+        paso = max(1, -(-len(self.x_vals) // max_puntos))
+        indices = np.arange(0, len(self.x_vals), paso)
+        if indices[-1] != len(self.x_vals) - 1:
+            indices = np.append(indices, len(self.x_vals) - 1)
+        return self.x_vals[indices].tolist(), self.valores[indices].tolist()
+
+def integral_acumulada(funcion_str, a, b, n, metodo='trapecio', contexto=None):
+    """
+    Integral acumulada F(x_i) = ∫ₐ^{x_i} f en todos los nodos con una sola evaluación de f
+
+    Con el trapecio es la suma prefija de los trapecios. Con Simpson 1/3 los
+    nodos pares acumulan los paneles completos y cada nodo impar agrega medio
+    panel, integrando la parábola del panel: h/12 (5f₀ + 8f₁ - f₂).
+
+    Args:
+        metodo: 'trapecio' o 'simpson13' (n par)
+        contexto: ContextoEvaluacion de la solicitud, para reutilizar los nodos
+
+    Returns:
+        IntegralAcumulada con los nodos, los valores de F y la interpolación
+    """
+    if metodo not in ('trapecio', 'simpson13'):
+        raise ValueError("La integral acumulada admite trapecio y simpson13")
+    if metodo == 'simpson13' and n % 2 != 0:
+        raise ValueError("Para Simpson 1/3, n debe ser par")
+    if n >= UMBRAL_INTEGRACION_BLOQUES:
+        raise ValueError(f"La integral acumulada admite menos de {UMBRAL_INTEGRACION_BLOQUES} subintervalos")
+    if contexto is None:
+        contexto = ContextoEvaluacion(funcion_str)
+
+    h = (b - a) / n
+    x_vals, f_vals = contexto.nodos(a, h, n)
+    valores = np.empty(n + 1)
+    valores[0] = 0.0
+    if metodo == 'trapecio':
+        np.cumsum(h / 2 * (f_vals[:-1] + f_vals[1:]), out=valores[1:])
+    else:
+        f0, f1, f2 = f_vals[0:-1:2], f_vals[1::2], f_vals[2::2]
+        np.cumsum(h / 3 * (f0 + 4 * f1 + f2), out=valores[2::2])
+        valores[1::2] = valores[0:-1:2] + h / 12 * (5 * f0 + 8 * f1 - f2)
+
+    return IntegralAcumulada(x_vals, valores, f_vals, metodo)
+
+_ORDENES_NEWTON_COTES = {'trapecio': 2, 'simpson13': 4, 'simpson38': 4}
+MAX_NODOS_CONVERGENCIA = 2**22
+
+def _orden_observado(anterior, actual):
+    """log2 del cociente de dos errores sucesivos (None si no está definido)"""
+    if anterior is None or actual is None or anterior <= 0 or actual <= 0:
+        return None
+    return math.log2(anterior / actual)
+
+def estudio_convergencia(funcion_str, a, b, metodo='trapecio', n_inicial=2, niveles=16,
+                         valor_referencia=None, contexto=None):
+    """
+    Estudio de convergencia de una regla compuesta duplicando n en cada nivel
+
+    Las mallas son anidadas: al pasar de n a 2n solo se evalúan los n puntos
+    medios nuevos y se intercalan con los valores ya calculados.
+
+    Args:
+        metodo: 'trapecio', 'simpson13' o 'simpson38'
+        n_inicial: Subintervalos del primer nivel (debe cumplir la condición de la regla)
+        niveles: Número de duplicaciones (n_final = n_inicial * 2**niveles)
+        valor_referencia: Valor exacto (opcional) para el error y su orden
+
+    Returns:
+        Dict con metodo, funcion, orden_teorico, niveles (n, h, estimacion,
+        diferencia, orden_observado y, con referencia, error y orden_error),
+        evaluaciones, evaluaciones_sin_reutilizar y grafica (n contra error o
+        diferencia, para escala log–log)
+    """
+    if metodo not in _FACTORES_NEWTON_COTES:
+        raise ValueError("El estudio de convergencia admite trapecio, simpson13 y simpson38")
+    if n_inicial <= 0 or n_inicial % _DIVISORES_NEWTON_COTES[metodo] != 0:
+        raise ValueError(f"Para {_NOMBRES_NEWTON_COTES[metodo]}, n inicial debe ser múltiplo positivo de "
+                         f"{_DIVISORES_NEWTON_COTES[metodo]}")
+    if niveles < 1:
+        raise ValueError("Se necesita al menos un nivel de duplicación")
+    if n_inicial * 2**niveles > MAX_NODOS_CONVERGENCIA:
+        raise ValueError(f"El n final ({n_inicial} × 2^{niveles}) supera el máximo de {MAX_NODOS_CONVERGENCIA}")
+    if a >= b:
+        raise ValueError("El límite inferior debe ser menor que el superior")
+
+    if contexto is None:
+        contexto = ContextoEvaluacion(funcion_str)
+    factor = _FACTORES_NEWTON_COTES[metodo][1]
+
+    n = n_inicial
+    h = (b - a) / n
+    _, f_vals = contexto.nodos(a, h, n)
+    evaluaciones = sin_reutilizar = n + 1
+    filas = []
+
+    for nivel in range(niveles + 1):
+        if nivel > 0:
+            # Malla anidada: solo se evalúan los puntos medios
+            medios = contexto.evaluar(a + (np.arange(n) + 0.5) * h)
+            nuevos = np.empty(2 * n + 1)
+            nuevos[0::2] = f_vals
+            nuevos[1::2] = medios
+            f_vals = nuevos
+            evaluaciones += n
+            n *= 2
+            h /= 2
+            sin_reutilizar += n + 1
+
+        estimacion = factor * h * float(np.dot(_pesos_newton_cotes(metodo, np.arange(n + 1), n), f_vals))
+        if not math.isfinite(estimacion):
+            raise ValueError(f"La estimación con n = {n} no es finita; revisa la función en [{a}, {b}]")
+        fila = {'n': n, 'h': h, 'estimacion': estimacion, 'diferencia': None, 'orden_observado': None}
+        if filas:
+            fila['diferencia'] = abs(estimacion - filas[-1]['estimacion'])
+            fila['orden_observado'] = _orden_observado(filas[-1]['diferencia'], fila['diferencia'])
+        if valor_referencia is not None:
+            fila['error'] = abs(estimacion - valor_referencia)
+            fila['orden_error'] = _orden_observado(filas[-1]['error'], fila['error']) if filas else None
+        filas.append(fila)
+
+    # Para la gráfica log–log se descartan los ceros (no tienen logaritmo)
+    clave = 'error' if valor_referencia is not None else 'diferencia'
+    puntos = [(fila['n'], fila[clave]) for fila in filas if fila[clave]]
+
+    return {
+        'metodo': metodo,
+        'funcion': contexto.compilada.texto,
+        'orden_teorico': _ORDENES_NEWTON_COTES[metodo],
+        'niveles': filas,
+        'evaluaciones': evaluaciones,
+        'evaluaciones_sin_reutilizar': sin_reutilizar,
+        'valor_referencia': valor_referencia,
+        'grafica': {
+            'tipo': clave,
+            'n': [p[0] for p in puntos],
+            'valores': [p[1] for p in puntos]
+        }
+    }
+
+def _pesos_regla_1d(metodo, a, b, n):
+    """Nodos y pesos completos (con el factor h) de una regla compuesta en [a, b]"""
+    if n % _DIVISORES_NEWTON_COTES[metodo] != 0:
+        raise ValueError(f"Para {_NOMBRES_NEWTON_COTES[metodo]}, el número de subintervalos debe ser múltiplo de "
+                         f"{_DIVISORES_NEWTON_COTES[metodo]}")
+    h = (b - a) / n
+    indices = np.arange(n + 1)
+    return a + indices * h, _FACTORES_NEWTON_COTES[metodo][1] * h * _pesos_newton_cotes(metodo, indices, n)
+
+def integracion_doble(funcion_str, a, b, c, d, nx, ny, metodo='trapecio', con_pasos=True,
+                      max_puntos_bloque=1 << 20, k_extremos=5):
+    """
+    Integral doble de f(x, y) sobre el rectángulo [a, b] × [c, d]
+
+    Se usa la regla producto: los pesos 2-D son el producto exterior de los
+    pesos 1-D en x y en y. La malla se recorre por franjas de filas de x
+    (a lo sumo max_puntos_bloque puntos por franja) con np.meshgrid, de modo
+    que la memoria no crece con nx·ny; cada franja aporta wₓᵀ F w_y.
+
+    Args:
+        nx, ny: Subintervalos en x y en y
+        metodo: 'trapecio', 'simpson13' o 'simpson38' (en ambas direcciones)
+
+    Returns:
+        Dict con resultado, pasos, metodo, funcion, evaluaciones, bloques, tiempo
+        (segundos) y muestra (malla reducida de f para la gráfica)
+    """
+    if metodo not in _FACTORES_NEWTON_COTES:
+        raise ValueError("La integral doble admite trapecio, simpson13 y simpson38")
+    if nx <= 0 or ny <= 0:
+        raise ValueError("El número de subintervalos debe ser positivo")
+    if a >= b or c >= d:
+        raise ValueError("Los límites inferiores deben ser menores que los superiores")
+
+    inicio = time.perf_counter()
+    compilada = compilar_funcion(funcion_str, ('x', 'y'))
+    x_vals, w_x = _pesos_regla_1d(metodo, a, b, nx)
+    y_vals, w_y = _pesos_regla_1d(metodo, c, d, ny)
+
+    filas_bloque = max(1, max_puntos_bloque // (ny + 1))
+    total = SumaNeumaier()
+    sumas_bloques = []
+    for fila in range(0, nx + 1, filas_bloque):
+        x_bloque = x_vals[fila:fila + filas_bloque]
+        X, Y = np.meshgrid(x_bloque, y_vals, indexing='ij', sparse=True)
+        with np.errstate(all='ignore'):
+            F = np.broadcast_to(np.asarray(compilada.f(X, Y), dtype=float), (x_bloque.size, ny + 1))
+        if not np.all(np.isfinite(F)):
+            raise ValueError(f"f(x, y) no es finita en la franja x ∈ [{x_bloque[0]:.6g}, {x_bloque[-1]:.6g}]")
+        suma = float(w_x[fila:fila + filas_bloque] @ (F @ w_y))
+        total.agregar(suma)
+        sumas_bloques.append(suma)
+
+    resultado = total.valor
+    evaluaciones = (nx + 1) * (ny + 1)
+    tiempo = time.perf_counter() - inicio
+
+    pasos = []
+    if con_pasos:
+        nombre = _NOMBRES_NEWTON_COTES[metodo]
+        pasos.append(f"=== INTEGRAL DOBLE - {nombre.upper()} ===")
+        pasos.append(f"Función: $$f(x, y) = {compilada.latex}$$")
+        pasos.append(f"Región: $[{a}, {b}] \\times [{c}, {d}]$")
+        pasos.append(f"Subintervalos: $n_x = {nx}$, $n_y = {ny}$")
+        pasos.append(f"$$h_x = {(b - a) / nx:.6f}, \\quad h_y = {(d - c) / ny:.6f}$$")
+        pasos.append("")
+        pasos.append(f"Regla producto de {nombre}:")
+        pasos.append("$$\\iint_R f(x, y)\\,dA \\approx \\sum_{i=0}^{n_x} \\sum_{j=0}^{n_y} w^{(x)}_i w^{(y)}_j f(x_i, y_j)$$")
+        pasos.append("")
+        pasos.append("Pesos en x:")
+        pasos.extend(_lineas_acotadas((f"w_{i} = {w:.8f} (x = {x:.4f})" for i, (x, w) in enumerate(zip(x_vals.tolist(), w_x.tolist()))),
+                                      nx + 1, k_extremos, 'pesos'))
+        pasos.append("Pesos en y:")
+        pasos.extend(_lineas_acotadas((f"w_{j} = {w:.8f} (y = {y:.4f})" for j, (y, w) in enumerate(zip(y_vals.tolist(), w_y.tolist()))),
+                                      ny + 1, k_extremos, 'pesos'))
+        pasos.append("")
+        pasos.append(f"Suma por franjas de {filas_bloque} filas de x:")
+        pasos.extend(_lineas_acotadas((f"Franja {j + 1}: {suma:.10f}" for j, suma in enumerate(sumas_bloques)),
+                                      len(sumas_bloques), 2 * k_extremos, 'franjas'))
+        pasos.append("")
+        pasos.append(f"Evaluaciones de la función: {evaluaciones} en {tiempo * 1000:.1f} ms")
+        pasos.append(f"$$\\mathrm{{Resultado}} = {resultado:.10f}$$")
+
+    # Malla reducida para la superficie de la gráfica
+    x_muestra = np.linspace(a, b, min(nx + 1, 60))
+    y_muestra = np.linspace(c, d, min(ny + 1, 60))
+    X, Y = np.meshgrid(x_muestra, y_muestra, indexing='ij', sparse=True)
+    with np.errstate(all='ignore'):
+        Z = np.broadcast_to(np.asarray(compilada.f(X, Y), dtype=float), (x_muestra.size, y_muestra.size))
+
+    return {
+        'resultado': resultado,
+        'pasos': pasos,
+        'metodo': metodo,
+        'funcion': compilada.texto,
+        'evaluaciones': evaluaciones,
+        'bloques': len(sumas_bloques),
+        'tiempo': tiempo,
+        'muestra': {
+            'x': x_muestra.tolist(),
+            'y': y_muestra.tolist(),
+            # Plotly espera z[fila de y][columna de x]
+            'z': [[v if math.isfinite(v) else None for v in fila] for fila in Z.T.tolist()]
+        }
+    }
+
+# Secuencias de baja discrepancia para quasi-Monte Carlo
+DIMENSION_QMC_MAXIMA = 10
+_PRIMOS_HALTON = (2, 3, 5, 7, 11, 13, 17, 19, 23, 29)
+# Números de dirección de Sobol (Joe–Kuo, new-joe-kuo-6.21201) para las
+# dimensiones 2..10: grado s del polinomio primitivo, coeficientes a y m_1..m_s
+_DIRECCIONES_SOBOL = (
+    (1, 0, (1,)),
+    (2, 1, (1, 3)),
+    (3, 1, (1, 3, 1)),
+    (3, 2, (1, 1, 1)),
+    (4, 1, (1, 1, 3, 3)),
+    (4, 4, (1, 3, 5, 13)),
+    (5, 2, (1, 1, 5, 5, 17)),
+    (5, 4, (1, 1, 5, 5, 5)),
+    (5, 7, (1, 1, 7, 11, 19)),
+)
+_BITS_SOBOL = 32
+
+def _tabla_direcciones_sobol(d):
+    """Matriz (d, 32) de enteros de dirección V_j = m_j · 2^(32-j)"""
+    tabla = np.zeros((d, _BITS_SOBOL), dtype=np.uint64)
+    # Primera dimensión: m_j = 1 para todo j (la secuencia de van der Corput en base 2)
+    tabla[0] = [1 << (_BITS_SOBOL - 1 - j) for j in range(_BITS_SOBOL)]
+    for dim in range(1, d):
+        s, a, m = _DIRECCIONES_SOBOL[dim - 1]
+        v = [m[j] << (_BITS_SOBOL - 1 - j) for j in range(s)]
+        for j in range(s, _BITS_SOBOL):
+            valor = v[j - s] ^ (v[j - s] >> s)
+            for k in range(1, s):
+                if (a >> (s - 1 - k)) & 1:
+                    valor ^= v[j - k]
+            v.append(valor)
+        tabla[dim] = v
+    return tabla
+
+_TABLA_SOBOL = _tabla_direcciones_sobol(DIMENSION_QMC_MAXIMA)
+
+def secuencia_sobol(inicio, n, d):
+    """
+    Puntos inicio..inicio+n-1 de la secuencia de Sobol en [0, 1)^d
+
+    Se usa el orden de código Gray: el punto k es el XOR de los números de
+    dirección de los bits activos de k ^ (k >> 1), calculado para todo el
+    lote a la vez.
+
+    Returns:
+        Array (n, d) de floats
+    """
+    if not 1 <= d <= DIMENSION_QMC_MAXIMA:
+        raise ValueError(f"La secuencia de Sobol admite de 1 a {DIMENSION_QMC_MAXIMA} dimensiones")
+    if inicio + n > 1 << _BITS_SOBOL:
+        raise ValueError("Se agotaron los puntos de la secuencia de Sobol")
+    indices = np.arange(inicio, inicio + n, dtype=np.uint64)
+    gray = indices ^ (indices >> np.uint64(1))
+    tabla = _TABLA_SOBOL[:d]
+    enteros = np.zeros((n, d), dtype=np.uint64)
+    for j in range(_BITS_SOBOL):
+        activos = ((gray >> np.uint64(j)) & np.uint64(1)).astype(bool)
+        enteros[activos] ^= tabla[:, j]
+    return enteros.astype(float) / float(1 << _BITS_SOBOL)
+
+def secuencia_halton(inicio, n, d):
+    """
+    Puntos inicio..inicio+n-1 de la secuencia de Halton en [0, 1)^d
+
+    La coordenada j es el inverso radical de k en la base del j-ésimo primo.
+
+    Returns:
+        Array (n, d) de floats
+    """
+    if not 1 <= d <= DIMENSION_QMC_MAXIMA:
+        raise ValueError(f"La secuencia de Halton admite de 1 a {DIMENSION_QMC_MAXIMA} dimensiones")
+    puntos = np.zeros((n, d))
+    for j, base in enumerate(_PRIMOS_HALTON[:d]):
+        k = np.arange(inicio, inicio + n, dtype=np.int64)
+        escala = 1.0 / base
+        while np.any(k):
+            k, digito = np.divmod(k, base)
+            puntos[:, j] += digito * escala
+            escala /= base
+    return puntos
+
+_SECUENCIAS_QMC = {'sobol': secuencia_sobol, 'halton': secuencia_halton}
+_NOMBRES_SECUENCIAS_QMC = {'sobol': 'Sobol', 'halton': 'Halton'}
+
+def integracion_quasi_montecarlo(funcion_str, limites, secuencia='sobol', error_objetivo=1e-4, replicas=16,
+                                 tamano_lote=4096, max_puntos=1 << 22, max_memoria=64 * 1024 * 1024,
+                                 semilla=None, con_pasos=True, k_extremos=5):
+    """
+    Integral de f(x_1, ..., x_d) sobre la caja Π [a_j, b_j] por quasi-Monte Carlo
+
+    Las reglas producto necesitan (n+1)^d evaluaciones, lo que deja de ser
+    práctico pasadas 3 dimensiones. Aquí se promedia f sobre una secuencia de
+    baja discrepancia (Sobol o Halton) con R desplazamientos aleatorios de
+    Cranley–Patterson, u ↦ (u + Δ_r) mod 1: cada réplica da una estimación
+    insesgada y su dispersión da el error estándar. Los puntos se generan y
+    evalúan por lotes de tamaño fijo (acotado por max_memoria) hasta que el
+    error estándar baja de error_objetivo o se llega a max_puntos por réplica.
+
+    Args:
+        limites: Lista de pares (a_j, b_j), uno por variable x_j
+        secuencia: 'sobol' o 'halton'
+        error_objetivo: Error estándar buscado para la estimación
+        replicas: Número R de desplazamientos aleatorios (al menos 2)
+        tamano_lote: Puntos por réplica en cada lote
+        max_puntos: Tope de puntos por réplica
+        max_memoria: Bytes máximos para los arrays de un lote
+        semilla: Semilla de los desplazamientos (None = aleatoria)
+
     Returns:
-        Dict con resultado, polinomio y pasos detallados
+        Dict con resultado, error_estimado, puntos (por réplica), evaluaciones,
+        replicas, lotes, convergio, historia, tiempo y pasos
     """
-    n = len(puntos)
-    
-    # Extraer coordenadas
-    x_vals = [p[0] for p in puntos]
-    f_vals = [p[1] for p in puntos]
-    df_vals = [p[2] for p in puntos]
-    
-    # Crear tabla de diferencias divididas
-    # Necesitamos 2n puntos (cada punto original se duplica)
-    z = []  # Puntos expandidos
-    Q = []  # Tabla de diferencias divididas
-    
-    # Expandir puntos
-    for i in range(n):
-        z.append(x_vals[i])
-        z.append(x_vals[i])
-    
-    # Inicializar primera columna de Q
-    Q = [[0.0 for _ in range(2*n)] for _ in range(2*n)]
-    
-    # Llenar primera columna
-    for i in range(n):
-        Q[2*i][0] = f_vals[i]
-        Q[2*i+1][0] = f_vals[i]
-    
-    # Llenar segunda columna
-    for i in range(n):
-        Q[2*i+1][1] = df_vals[i]
-        if i < n-1:
-            Q[2*i+2][1] = (Q[2*i+2][0] - Q[2*i+1][0]) / (z[2*i+2] - z[2*i+1])
-    
-    # Llenar resto de la tabla
-    for i in range(2, 2*n):
-        for j in range(2, i+1):
-            Q[i][j] = (Q[i][j-1] - Q[i-1][j-1]) / (z[i] - z[i-j])
-    
-    # Construir polinomio
-    x = symbols('x')
-    polinomio = Q[0][0]
+    if secuencia not in _SECUENCIAS_QMC:
+        raise ValueError("La secuencia debe ser 'sobol' o 'halton'")
+    limites = [(float(a), float(b)) for a, b in limites]
+    d = len(limites)
+    if not 1 <= d <= DIMENSION_QMC_MAXIMA:
+        raise ValueError(f"Se admiten de 1 a {DIMENSION_QMC_MAXIMA} dimensiones")
+    if any(not (math.isfinite(a) and math.isfinite(b)) or a >= b for a, b in limites):
+        raise ValueError("Cada límite inferior debe ser finito y menor que el superior")
+    if not error_objetivo > 0:
+        raise ValueError("El error objetivo debe ser positivo")
+    if replicas < 2:
+        raise ValueError("Se necesitan al menos 2 réplicas para estimar el error")
+    if tamano_lote <= 0 or max_puntos <= 0:
+        raise ValueError("El tamaño de lote y el máximo de puntos deben ser positivos")
 
-    pasos = []
-    pasos.append("=== INTERPOLACIÓN DE HERMITE ===")
-    pasos.append(f"Puntos dados: {puntos}")
-    pasos.append(f"Punto de evaluación: x = {x_eval}")
-    pasos.append("")
-    pasos.append("1. Tabla de diferencias divididas:")
-
-    # Mostrar tabla
-    pasos.append("   Xi    |  F[Xi]  |  Primera D.D  |  ...")
-    pasos.append("   " + "-"*50)
-    for i in range(2*n):
-        fila = f"  {z[i]:6.3f} |"
-        for j in range(min(i+1, 2*n)):
-            val = Q[i][j]
-            try:
-                fila += f"  {float(val):8.4f}  |"
-            except Exception:
-                fila += f"  {str(val):>8}  |"
-        pasos.append(fila)
+    inicio = time.perf_counter()
+    variables = tuple(f'x_{j}' for j in range(1, d + 1))
+    compilada = compilar_funcion(funcion_str, variables)
+    generar = _SECUENCIAS_QMC[secuencia]
+    a_vec = np.array([a for a, _ in limites])
+    ancho = np.array([b - a for a, b in limites])
+    volumen = float(np.prod(ancho))
 
-    pasos.append("")
-    pasos.append("2. Construcción del polinomio:")
-    try:
-        pasos.append(f"$$H(x) = {float(Q[0][0]):.4f}$$")
-        terminos_latex = [f"{float(Q[0][0]):.4f}"]
-    except Exception:
-        pasos.append(f"$$H(x) = {Q[0][0]}$$")
-        terminos_latex = [f"{Q[0][0]}"]
+    # Un lote ocupa los puntos base, los desplazados y los valores de f;
+    # se redondea a potencia de 2 porque así los prefijos de Sobol son redes.
+    por_punto = 8 * (2 * d + 2)
+    lote = min(tamano_lote, max_puntos, max(1, max_memoria // por_punto))
+    lote = 1 << (lote.bit_length() - 1)
 
-    # Construir términos del polinomio
-    termino_actual = 1
+    rng = np.random.default_rng(semilla)
+    desplazamientos = rng.random((replicas, d))
+    sumas = [SumaNeumaier() for _ in range(replicas)]
+    puntos = 0
+    historia = []
+    convergio = False
+    estimacion = error = float('nan')
+    while puntos < max_puntos:
+        tamano = min(lote, max_puntos - puntos)
+        base = generar(puntos, tamano, d)
+        for r in range(replicas):
+            u = base + desplazamientos[r]
+            u -= np.floor(u)
+            x = a_vec + ancho * u
+            with np.errstate(all='ignore'):
+                valores = np.broadcast_to(np.asarray(compilada.f(*x.T), dtype=float), (tamano,))
+            if not np.all(np.isfinite(valores)):
+                malo = x[np.argmax(~np.isfinite(valores))]
+                punto = ', '.join(f'{v:.6g}' for v in malo)
+                raise ValueError(f"f no es finita en ({punto})")
+            sumas[r].agregar(float(valores.sum()))
+        puntos += tamano
+        estimaciones = volumen * np.array([s.valor for s in sumas]) / puntos
+        estimacion = float(estimaciones.mean())
+        error = float(estimaciones.std(ddof=1) / math.sqrt(replicas))
+        historia.append({'puntos': puntos, 'resultado': estimacion, 'error': error})
+        if error <= error_objetivo:
+            convergio = True
+            break
+    tiempo = time.perf_counter() - inicio
+    evaluaciones = puntos * replicas
 
-    for k in range(1, 2*n):
-        termino_actual *= (x - z[k-1])
-        coef = Q[k][k]
-        polinomio += coef * termino_actual
-        
-        # Construir término en LaTeX
-        termino_str = ""
-        for j in range(k):
-            if j == 0:
-                termino_str = f"(x - {z[j]:.3f})"
-            else:
-                termino_str += f"(x - {z[j]:.3f})"
-        
-        if coef >= 0:
-            terminos_latex.append(f"+ {coef:.6f} \\cdot {termino_str}")
+    pasos = []
+    if con_pasos:
+        nombre = _NOMBRES_SECUENCIAS_QMC[secuencia]
+        caja = ' \\times '.join(f'[{a}, {b}]' for a, b in limites)
+        argumentos = ', '.join(f'x_{{{j}}}' for j in range(1, d + 1))
+        pasos.append(f"=== QUASI-MONTE CARLO - SECUENCIA DE {nombre.upper()} ===")
+        pasos.append(f"Función: $$f({argumentos}) = {compilada.latex}$$")
+        pasos.append(f"Región de dimensión {d}: $${caja}$$")
+        pasos.append(f"Volumen: $|V| = {volumen:.6g}$")
+        pasos.append("")
+        pasos.append(f"Réplicas con desplazamiento aleatorio $\\Delta_r$ (r = 1..{replicas}):")
+        pasos.append("$$\\hat I_r = \\frac{|V|}{N} \\sum_{k=0}^{N-1} f\\big(a + (b - a) \\odot ((u_k + \\Delta_r) \\bmod 1)\\big)$$")
+        pasos.append("$$\\hat I = \\frac{1}{R} \\sum_{r=1}^{R} \\hat I_r, \\qquad "
+                     "\\mathrm{EE} = \\frac{s(\\hat I_r)}{\\sqrt{R}}$$")
+        pasos.append(f"Lotes de {lote} puntos por réplica; error objetivo: {error_objetivo:.2e}")
+        pasos.append("")
+        pasos.extend(_lineas_acotadas((f"N = {h['puntos']}: Î = {h['resultado']:.10f}, EE = {h['error']:.3e}"
+                                       for h in historia), len(historia), k_extremos, 'lotes'))
+        pasos.append("")
+        if convergio:
+            pasos.append(f"✓ Error estándar {error:.3e} ≤ {error_objetivo:.2e} con N = {puntos} puntos por réplica")
         else:
-            terminos_latex.append(f"{coef:.6f} \\cdot {termino_str}")
-        
-        pasos.append(f"     {terminos_latex[-1]}")
+            pasos.append(f"⚠ Se alcanzó el máximo de {max_puntos} puntos por réplica con error estándar {error:.3e}")
+        pasos.append(f"Evaluaciones de la función: {evaluaciones} en {tiempo * 1000:.1f} ms")
+        pasos.append(f"$$\\mathrm{{Resultado}} = {estimacion:.10f} \\pm {error:.2e}$$")
+
+    return {
+        'resultado': estimacion,
+        'error_estimado': error,
+        'puntos': puntos,
+        'evaluaciones': evaluaciones,
+        'replicas': replicas,
+        'lotes': len(historia),
+        'convergio': convergio,
+        'secuencia': secuencia,
+        'dimension': d,
+        'funcion': compilada.texto,
+        'historia': historia,
+        'tiempo': tiempo,
+        'pasos': pasos,
+    }
+
+# Nodos y pesos de Gauss–Kronrod 7/15 en [-1, 1] (QUADPACK). Los nodos de
+# Kronrod en las posiciones impares son los de Gauss de 7 puntos.
+_GK15_NODOS = np.array([
+    0.991455371120812639206854697526329, 0.949107912342758524526189684047851,
+    0.864864423359769072789712788640926, 0.741531185599394439863864773280788,
+    0.586087235467691130294144845693013, 0.405845151377397166906606412076961,
+    0.207784955007898467600689403773245, 0.0])
+_GK15_PESOS_K = np.array([
+    0.022935322010529224963732008058970, 0.063092092629978553290700663189204,
+    0.104790010322250183839876322541518, 0.140653259715525918745189590510238,
+    0.169004726639267902826583426598550, 0.190350578064785409913256402421014,
+    0.204432940075298892414161999234649, 0.209482141084727828012999174891714])
+_GK15_PESOS_G = np.array([
+    0.129484966168869693270611432679082, 0.279705391489276667901467771423780,
+    0.381830050505118944950369775488975, 0.417959183673469387755102040816327])
+# 15 abscisas: -x_0..-x_6, 0, x_6..x_0 y sus pesos
+_GK15_T = np.concatenate([-_GK15_NODOS[:-1], [0.0], _GK15_NODOS[-2::-1]])
+_GK15_WK = np.concatenate([_GK15_PESOS_K[:-1], [_GK15_PESOS_K[-1]], _GK15_PESOS_K[-2::-1]])
+_GK15_WG = np.zeros(15)
+_GK15_WG[[1, 3, 5]] = _GK15_PESOS_G[:3]
+_GK15_WG[[13, 11, 9]] = _GK15_PESOS_G[:3]
+_GK15_WG[7] = _GK15_PESOS_G[3]
+
+def _gauss_kronrod(contexto, extremos):
+    """
+    Aplica Gauss–Kronrod 7/15 a varios intervalos con una sola evaluación de f
+
+    Args:
+        extremos: Arreglo (k, 2) con los intervalos [a_j, b_j]
+
+    Returns:
+        Tupla (kronrod, error) con un valor por intervalo; error = |K15 - G7|
+    """
+    centro = (extremos[:, 0] + extremos[:, 1]) / 2
+    radio = (extremos[:, 1] - extremos[:, 0]) / 2
+    x = centro[:, None] + radio[:, None] * _GK15_T
+    fx = contexto.evaluar(x.ravel()).reshape(x.shape)
+    kronrod = radio * (fx @ _GK15_WK)
+    gauss = radio * (fx @ _GK15_WG)
+    return kronrod, np.abs(kronrod - gauss)
+
+def _adaptativo_compuesto(contexto, a, b, n, pasos, tolerancia_abs, tolerancia_rel, max_evaluaciones):
+    """
+    Cuadratura adaptativa Gauss–Kronrod 7/15 con cola de prioridad global
+
+    Se parte de n subintervalos iguales y en cada iteración se divide a la
+    mitad el intervalo con mayor error estimado, hasta que el error total
+    cumple la tolerancia o se agota el máximo de evaluaciones.
+
+    Returns:
+        Dict con resultado, error_estimado, evaluaciones, malla y convergio
+    """
+    import heapq
+
+    bordes = np.linspace(a, b, n + 1)
+    extremos = np.column_stack([bordes[:-1], bordes[1:]])
+    with np.errstate(all='ignore'):
+        kronrod, errores = _gauss_kronrod(contexto, extremos)
+    evaluaciones = 15 * n
+    if not (np.all(np.isfinite(kronrod)) and np.all(np.isfinite(errores))):
+        raise ValueError("La función no es finita en los nodos de Gauss–Kronrod del intervalo.")
+    ancho_minimo = 1e-12 * (b - a)
 
-    # Simplificar polinomio
-    polinomio_expandido = sp.expand(polinomio)
+    # Montículo de máximos (error negado); el contador desempata de forma estable
+    cola = [(-e, i, ai, bi, k) for i, ((ai, bi), k, e) in enumerate(zip(extremos.tolist(), kronrod.tolist(), errores.tolist()))]
+    heapq.heapify(cola)
+    contador = len(cola)
+    terminados = []  # intervalos que ya no se pueden dividir
+    total = float(kronrod.sum())
+    error_total = float(errores.sum())
+    iteraciones = 0
 
-    pasos.append("")
-    pasos.append("3. Polinomio expandido:")
-    # Convertir el polinomio a LaTeX
-    polinomio_latex = sp.latex(polinomio_expandido)
-    pasos.append(f"$$H(x) = {polinomio_latex}$$")
+    while cola and error_total > max(tolerancia_abs, tolerancia_rel * abs(total)):
+        if evaluaciones + 30 > max_evaluaciones:
+            break
+        menos_error, _, ai, bi, k = heapq.heappop(cola)
+        medio = (ai + bi) / 2
+        if bi - ai < ancho_minimo:
+            # Dividir más solo acumularía error de redondeo
+            terminados.append((ai, bi, k, -menos_error))
+            continue
+        with np.errstate(all='ignore'):
+            k_hijos, e_hijos = _gauss_kronrod(contexto, np.array([[ai, medio], [medio, bi]]))
+        evaluaciones += 30
+        if not (np.all(np.isfinite(k_hijos)) and np.all(np.isfinite(e_hijos))):
+            # Un nodo cayó sobre una singularidad: se conserva la estimación del padre
+            terminados.append((ai, bi, k, -menos_error))
+            continue
+        iteraciones += 1
+        total += float(k_hijos.sum()) - k
+        error_total += float(e_hijos.sum()) + menos_error
+        for (ci, di), kc, ec in zip(((ai, medio), (medio, bi)), k_hijos.tolist(), e_hijos.tolist()):
+            heapq.heappush(cola, (-ec, contador, ci, di, kc))
+            contador += 1
 
-    # Evaluar en x_eval
-    resultado = float(polinomio_expandido.subs(x, x_eval))
+    intervalos = sorted([(ai, bi, k, -e) for e, _, ai, bi, k in cola] + terminados)
+    # Suma final sin el error de redondeo acumulado por las actualizaciones
+    resultado = math.fsum(k for _, _, k, _ in intervalos)
+    error_estimado = math.fsum(e for _, _, _, e in intervalos)
+    convergio = error_estimado <= max(tolerancia_abs, tolerancia_rel * abs(resultado))
+    malla = [intervalos[0][0]] + [bi for _, bi, _, _ in intervalos]
 
-    pasos.append("")
-    pasos.append("4. Evaluación:")
-    pasos.append(f"$$H({x_eval}) = {resultado:.8f}$$")
+    if pasos is not None:
+        pasos.append("Cuadratura adaptativa de Gauss–Kronrod 7/15:")
+        pasos.append("$$\\int_{a_j}^{b_j} f(x)dx \\approx \\frac{b_j-a_j}{2}\\sum_{k=1}^{15} w_k\\, f\\left(\\frac{a_j+b_j}{2} + \\frac{b_j-a_j}{2} t_k\\right)$$")
+        pasos.append("$$E_j = |K_{15} - G_7|$$")
+        pasos.append("")
+        pasos.append(f"Tolerancia: $$\\sum E_j \\le \\max({tolerancia_abs:.1e},\\ {tolerancia_rel:.1e} \\cdot |I|)$$")
+        pasos.append(f"Subintervalos iniciales: {n}, divisiones: {iteraciones}, subintervalos finales: {len(intervalos)}")
+        pasos.append("")
+        pasos.append("Subintervalos finales:")
+        pasos.append("   [a_j, b_j]                    |  K15            |  E_j")
+        pasos.append("   " + "-"*66)
+        limite = 40
+        for ai, bi, k, e in intervalos[:limite]:
+            pasos.append(f"   [{ai:.6f}, {bi:.6f}]".ljust(34) + f"|  {k:.10f}  |  {e:.2e}")
+        if len(intervalos) > limite:
+            pasos.append(f"   ... ({len(intervalos) - limite} subintervalos más)")
+        pasos.append("")
+        pasos.append(f"Evaluaciones de la función: {evaluaciones} (máximo {max_evaluaciones})")
+        if not convergio:
+            pasos.append("Se alcanzó el máximo de evaluaciones antes de cumplir la tolerancia")
+        pasos.append(f"$$\\mathrm{{Resultado}} = \\sum_j K_{{15,j}} = {resultado:.12f} \\pm {error_estimado:.2e}$$")
 
     return {
         'resultado': resultado,
-        'polinomio': str(polinomio_expandido),
-        'polinomio_latex': polinomio_latex,
-        'pasos': pasos,
-        'puntos': puntos
+        'error_estimado': error_estimado,
+        'evaluaciones': evaluaciones,
+        'malla': malla,
+        'convergio': convergio
     }
 
-def limpiar_funcion_mathlive(funcion_str):
+def _romberg_compuesto(contexto, a, b, n, pasos, tolerancia_abs, tolerancia_rel, max_evaluaciones, min_niveles=2):
     """
-    Limpia la cadena de entrada proveniente de MathLive para que sea compatible con sympy.sympify
+    Integración de Romberg a partir del trapecio compuesto con n subintervalos
+
+    En cada nivel se duplica la malla del trapecio evaluando solo los puntos
+    medios nuevos, y la tabla se completa con extrapolación de Richardson:
+    R(k, j) = R(k, j-1) + (R(k, j-1) - R(k-1, j-1)) / (4^j - 1).
+
+    Returns:
+        Dict con resultado, error_estimado, evaluaciones, evaluaciones_ahorradas,
+        tabla_romberg y convergio
     """
-    import re
-    
-    if not funcion_str:
-        return ""
-    
-    # Eliminar espacios extra
-    funcion_str = funcion_str.strip()
-    
-    # Conversiones básicas de LaTeX a Python
-    conversiones = [
-        # Funciones trigonométricas
-        (r'\\sin\s*\(', 'sin('),
-        (r'\\cos\s*\(', 'cos('),
-        (r'\\tan\s*\(', 'tan('),
-        (r'\\sec\s*\(', '1/cos('),
-        (r'\\csc\s*\(', '1/sin('),
-        (r'\\cot\s*\(', '1/tan('),
-        
-        # Funciones inversas
-        (r'\\arcsin\s*\(', 'asin('),
-        (r'\\arccos\s*\(', 'acos('),
-        (r'\\arctan\s*\(', 'atan('),
-        
-        # Funciones hiperbólicas
-        (r'\\sinh\s*\(', 'sinh('),
-        (r'\\cosh\s*\(', 'cosh('),
-        (r'\\tanh\s*\(', 'tanh('),
-        
-        # Funciones logarítmicas
-        (r'\\ln\s*\(', 'log('),
-        (r'\\log\s*\(', 'log10('),
-        
-        # Exponencial
-        (r'\\exp\s*\(', 'exp('),
-        (r'e\^', 'exp('),
-        
-        # Raíz cuadrada
-        (r'\\sqrt\s*\{([^}]+)\}', r'sqrt(\1)'),
-        (r'\\sqrt\s*\(', 'sqrt('),
-        
-        # Valor absoluto
-        (r'\\left\|([^|]+)\\right\|', r'abs(\1)'),
-        
-        # Limpiar comandos LaTeX
-        (r'\\left\(', '('),
-        (r'\\right\)', ')'),
-        (r'\\left\{', '('),
-        (r'\\right\}', ')'),
-        (r'\{', '('),
-        (r'\}', ')'),
-        
-        # Potencias
-        (r'\^', '**'),
-        
-        # Constantes matemáticas
-        (r'\\pi', 'pi'),
-        (r'\\e\b', 'E'),
-        
-        # Fracciones simples
-        (r'\\frac\s*\{([^}]+)\}\s*\{([^}]+)\}', r'(\1)/(\2)'),
-        
-        # Limpiar asteriscos múltiples (solo 3 o más, para no romper potencias)
-        (r'\*{3,}', '*'),
-        
-        # Multiplicación implícita
-        (r'(\d)([a-zA-Z])', r'\1*\2'),
-        (r'([a-zA-Z])(\d)', r'\1*\2'),
-        (r'\)\(', ')*('),
-        (r'\)([a-zA-Z])', r')*\1'),
-        (r'([a-zA-Z])\(', r'\1*('),
-    ]
-    
-    # Aplicar todas las conversiones
-    for patron, reemplazo in conversiones:
-        funcion_str = re.sub(patron, reemplazo, funcion_str)
-    
-    # Limpiar espacios finales
-    funcion_str = re.sub(r'\s+', '', funcion_str)
-    
-    return funcion_str
+    h = (b - a) / n
+    # Nivel 0: los mismos nodos que usa la gráfica
+    _, f_vals = contexto.nodos(a, h, n)
+    evaluaciones = n + 1
+    sin_reutilizar = n + 1
+    tabla = [[h / 2 * (float(f_vals[0] + f_vals[-1]) + 2 * float(f_vals[1:-1].sum()))]]
+    subintervalos = n
+    convergio = False
+    error_estimado = float('inf')
 
-def integracion_compuesta(funcion_str, a, b, n, metodo):
-    # Limpiar función de entrada
-    funcion_str = limpiar_funcion_mathlive(funcion_str)
-    
-    # Parsear función
-    x = symbols('x')
+    while evaluaciones + subintervalos <= max_evaluaciones:
+        # Puntos medios de la malla actual: una sola evaluación vectorizada
+        medios = a + (np.arange(subintervalos) + 0.5) * h
+        suma_medios = float(contexto.evaluar(medios).sum())
+        evaluaciones += subintervalos
+        subintervalos *= 2
+        sin_reutilizar += subintervalos + 1
+        h /= 2
+
+        fila = [tabla[-1][0] / 2 + h * suma_medios]
+        for j in range(1, len(tabla) + 1):
+            fila.append(fila[j-1] + (fila[j-1] - tabla[-1][j-1]) / (4**j - 1))
+        tabla.append(fila)
+
+        error_estimado = abs(fila[-1] - tabla[-2][-1])
+        if len(tabla) > min_niveles and error_estimado <= max(tolerancia_abs, tolerancia_rel * abs(fila[-1])):
+            convergio = True
+            break
+
+    resultado = tabla[-1][-1]
+    ahorradas = sin_reutilizar - evaluaciones
+
+    if pasos is not None:
+        pasos.append("Método de Romberg:")
+        pasos.append("$$R(k, 0) = \\frac{1}{2} R(k-1, 0) + h_k \\sum_{i=1}^{n_{k-1}} f\\left(a + (2i-1) h_k\\right)$$")
+        pasos.append("$$R(k, j) = R(k, j-1) + \\frac{R(k, j-1) - R(k-1, j-1)}{4^j - 1}$$")
+        pasos.append("")
+        pasos.append("Tabla de Romberg:")
+        pasos.append("   k |  subintervalos  |  R(k,0)  |  R(k,1)  |  ...")
+        pasos.append("   " + "-"*60)
+        for k, fila in enumerate(tabla):
+            pasos.append(f"   {k:2d} | {n * 2**k:14d}  |" + "|".join(f"  {valor:.10f}  " for valor in fila))
+        pasos.append("")
+        pasos.append(f"Error estimado: $|R(k, k) - R(k-1, k-1)| = {error_estimado:.2e}$")
+        pasos.append(f"Evaluaciones de la función: {evaluaciones} (sin reutilizar nodos: {sin_reutilizar}, ahorradas: {ahorradas})")
+        if not convergio:
+            pasos.append("Se alcanzó el máximo de evaluaciones antes de cumplir la tolerancia")
+        pasos.append(f"$$\\mathrm{{Resultado}} = R({len(tabla) - 1}, {len(tabla) - 1}) = {resultado:.12f}$$")
+
+    return {
+        'resultado': resultado,
+        'error_estimado': error_estimado,
+        'evaluaciones': evaluaciones,
+        'evaluaciones_ahorradas': ahorradas,
+        'tabla_romberg': tabla,
+        'convergio': convergio
+    }
+
+ORDEN_GAUSS_MAXIMO = 200
+# Nodos totales (n · orden) del Gauss–Legendre compuesto: se evalúan todos a la vez
+MAX_NODOS_GAUSS = 2**22
+
+_tabla_gauss_legendre = {}
+_lock_gauss_legendre = threading.Lock()
+
+def _golub_welsch(orden):
+    """
+    Nodos y pesos de Gauss–Legendre en [-1, 1] por el método de Golub–Welsch
+
+    Los nodos son los valores propios de la matriz de Jacobi (simétrica y
+    tridiagonal) de la recurrencia de Legendre, con subdiagonal
+    k / sqrt(4k² - 1); cada peso es 2 por el cuadrado de la primera
+    componente del vector propio normalizado.
+    """
+    k = np.arange(1, orden)
+    beta = k / np.sqrt(4.0 * k**2 - 1.0)
+    jacobi = np.diag(beta, 1) + np.diag(beta, -1)
+    nodos, vectores = np.linalg.eigh(jacobi)
+    pesos = 2.0 * vectores[0]**2
+    # Simetrizar para que los pares ±t tengan exactamente el mismo peso
+    nodos = (nodos - nodos[::-1]) / 2
+    pesos = (pesos + pesos[::-1]) / 2
+    return nodos, pesos
+
+def nodos_gauss_legendre(orden, directorio=None):
+    """
+    Tabla de nodos y pesos de Gauss–Legendre de un orden, calculada una sola vez
+
+    La tabla se guarda en memoria para todo el proceso. Si se indica un
+    directorio (o la variable de entorno GAUSS_LEGENDRE_CACHE_DIR) también se
+    persiste en disco como .npz, para que otros procesos no repitan el cálculo.
+
+    Args:
+        orden: Número de nodos (1..ORDEN_GAUSS_MAXIMO)
+        directorio: Carpeta de la cache en disco (opcional)
+
+    Returns:
+        Tupla (nodos, pesos) de arreglos de solo lectura en [-1, 1]
+    """
+    orden = int(orden)
+    if orden < 1 or orden > ORDEN_GAUSS_MAXIMO:
+        raise ValueError(f"El orden de Gauss–Legendre debe estar entre 1 y {ORDEN_GAUSS_MAXIMO}")
+
+    tabla = _tabla_gauss_legendre.get(orden)
+    if tabla is not None:
+        return tabla
+
+    with _lock_gauss_legendre:
+        tabla = _tabla_gauss_legendre.get(orden)
+        if tabla is not None:
+            return tabla
+
+        directorio = directorio or os.environ.get('GAUSS_LEGENDRE_CACHE_DIR')
+        ruta = os.path.join(directorio, f"gauss_legendre_{orden}.npz") if directorio else None
+        nodos = pesos = None
+        if ruta and os.path.exists(ruta):
+            try:
+                with np.load(ruta) as datos:
+                    nodos, pesos = datos['nodos'], datos['pesos']
+                if nodos.shape != (orden,) or pesos.shape != (orden,):
+                    nodos = pesos = None
+            except (OSError, KeyError, ValueError):
+                nodos = pesos = None
+
+        if nodos is None:
+            nodos, pesos = _golub_welsch(orden)
+            if ruta:
+                # La cache en disco es opcional: si no se puede escribir se sigue en memoria
+                try:
+                    os.makedirs(directorio, exist_ok=True)
+                    temporal = f"{ruta}.{os.getpid()}.tmp.npz"
+                    np.savez(temporal, nodos=nodos, pesos=pesos)
+                    os.replace(temporal, ruta)
+                except OSError:
+                    pass
+
+        nodos.setflags(write=False)
+        pesos.setflags(write=False)
+        tabla = (nodos, pesos)
+        _tabla_gauss_legendre[orden] = tabla
+        return tabla
+
+def _gauss_legendre_compuesto(contexto, a, b, n, h, pasos, orden, k_extremos=5):
+    """
+    Gauss–Legendre compuesto: la tabla de [-1, 1] se traslada a cada subintervalo
+
+    Todos los n*orden nodos (a lo sumo MAX_NODOS_GAUSS) se evalúan en una
+    sola llamada vectorizada.
+
+    Returns:
+        Dict con resultado, evaluaciones y orden_gauss
+    """
+    if n * orden > MAX_NODOS_GAUSS:
+        raise ValueError(f"Gauss–Legendre con n = {n} y {orden} nodos por subintervalo supera el máximo de "
+                         f"{MAX_NODOS_GAUSS} evaluaciones; reduzca n o el orden")
+    t, w = nodos_gauss_legendre(orden)
+    _, f_vals = contexto.nodos_gauss(a, b, n, orden)
+    sumas = f_vals @ w
+    resultado = float(h / 2 * math.fsum(sumas.tolist()))
+    evaluaciones = n * orden
+
+    if pasos is not None:
+        pasos.append(f"Gauss–Legendre compuesto con {orden} nodos por subintervalo:")
+        pasos.append("$$\\int_a^b f(x)\\,dx \\approx \\frac{h}{2} \\sum_{i=0}^{n-1} \\sum_{j=1}^{m} w_j\\, f\\left(c_i + \\frac{h}{2} t_j\\right), \\quad c_i = a + \\left(i + \\tfrac{1}{2}\\right) h$$")
+        pasos.append("")
+        pasos.append("Nodos y pesos en [-1, 1] (Golub–Welsch):")
+        pasos.append("   j |        t_j        |        w_j")
+        pasos.append("   " + "-"*45)
+        for j, (t_j, w_j) in enumerate(zip(t.tolist(), w.tolist()), 1):
+            pasos.append(f"   {j:2d} | {t_j: .14f} | {w_j:.14f}")
+        pasos.append("")
+        pasos.append("Suma ponderada en cada subintervalo:")
+        pasos.extend(_lineas_acotadas(
+            (f"$[{a + i * h:.4f}, {a + (i + 1) * h:.4f}]: \\sum_j w_j f(x_{{ij}}) = {suma:.6f}$"
+             for i, suma in enumerate(sumas.tolist())),
+            n, k_extremos, 'subintervalos'))
+        pasos.append("")
+        pasos.append(f"Evaluaciones de la función: {evaluaciones}")
+        pasos.append(f"$$\\mathrm{{Resultado}} = \\frac{{{h:.6f}}}{{2}} \\cdot {float(sumas.sum()):.6f} = {resultado:.6f}$$")
+
+    return {
+        'resultado': resultado,
+        'evaluaciones': evaluaciones,
+        'orden_gauss': orden
+    }
+
+def _bloques_de_lineas(archivo, tamano_bloque):
+    """
+    Lee un archivo (subido con Django o abierto en modo binario) por bloques de bytes
+
+    Cada bloque termina en un salto de línea; el resto de la última línea
+    incompleta pasa al bloque siguiente.
+    """
+    if hasattr(archivo, 'chunks'):
+        trozos = archivo.chunks(tamano_bloque)
+    else:
+        trozos = iter(lambda: archivo.read(tamano_bloque), b'' if 'b' in getattr(archivo, 'mode', 'b') else '')
+    resto = b''
+    for trozo in trozos:
+        if isinstance(trozo, str):
+            trozo = trozo.encode()
+        trozo = resto + trozo
+        corte = trozo.rfind(b'\n') + 1
+        resto = trozo[corte:]
+        if corte:
+            yield trozo[:corte]
+    if resto.strip():
+        yield resto
+
+def _quitar_encabezado(bloque):
+    """Quita la primera fila de datos del bloque si no es numérica (encabezado)"""
+    inicio = 0
+    while inicio < len(bloque):
+        fin = bloque.find(b'\n', inicio)
+        fin = len(bloque) if fin < 0 else fin
+        linea = bloque[inicio:fin].strip()
+        if linea and not linea.startswith(b'#'):
+            try:
+                if len([float(v) for v in linea.replace(b',', b' ').replace(b';', b' ').split()[:2]]) == 2:
+                    return bloque
+            except ValueError:
+                pass
+            return bloque[fin + 1:]
+        inicio = fin + 1
+    return bloque
+
+def _parsear_bloque_tabulado(bloque):
+    """Columnas x, y de un bloque de texto separado por comas, punto y coma o espacios"""
+    bloque = bloque.replace(b',', b' ').replace(b';', b' ')
     try:
-        # Intentar parsear la función
-        funcion_sym = sympify(funcion_str)
-        f = lambdify(x, funcion_sym, ['numpy', 'math'])
-        
-        # Crear LaTeX para mostrar
-        try:
-            funcion_latex = sp.latex(funcion_sym)
-        except:
-            funcion_latex = str(funcion_sym)
-            
-    except Exception as e:
-        # Si falla el parsing, intentar con algunas correcciones adicionales
-        try:
-            # Correcciones adicionales para casos problemáticos
-            funcion_corregida = funcion_str
-            
-            # Asegurar que las funciones matemáticas estén bien formateadas
-            import re
-            funcion_corregida = re.sub(r'(\w+)\*\(', r'\1(', funcion_corregida)
-            
-            funcion_sym = sympify(funcion_corregida)
-            f = lambdify(x, funcion_sym, ['numpy', 'math'])
-            funcion_latex = sp.latex(funcion_sym)
-            
-        except Exception as e2:
-            raise ValueError(f"No se pudo parsear la función '{funcion_str}'. Error: {str(e2)}")
-    
-    h = (b - a) / n
+        with warnings.catch_warnings():
+            # Un bloque solo con comentarios no es un error
+            warnings.simplefilter('ignore', UserWarning)
+            datos = np.loadtxt(io.BytesIO(bloque), usecols=(0, 1), ndmin=2, comments='#')
+    except (ValueError, IndexError) as e:
+        raise ValueError(f"Datos tabulados no válidos: cada fila debe tener al menos dos números (x, y) ({e})")
+    return datos[:, 0], datos[:, 1]
+
+def _trapecio_no_uniforme(x, y):
+    """Suma de los trapecios de la malla no uniforme x"""
+    return float(np.dot(np.diff(x), (y[:-1] + y[1:]) / 2))
+
+def _simpson_no_uniforme(x, y):
+    """
+    Simpson para malla no uniforme sobre los paneles (x₀, x₁, x₂), (x₂, x₃, x₄), ...
+
+    En cada panel se integra la parábola que pasa por los tres puntos:
+    (h₀+h₁)/6 [(2 - h₁/h₀) y₀ + (h₀+h₁)²/(h₀h₁) y₁ + (2 - h₀/h₁) y₂]
+    """
+    h0 = x[1:-1:2] - x[0:-2:2]
+    h1 = x[2::2] - x[1:-1:2]
+    suma = h0 + h1
+    return float(np.sum(suma / 6 * ((2 - h1 / h0) * y[0:-2:2] + suma**2 / (h0 * h1) * y[1:-1:2]
+                                    + (2 - h0 / h1) * y[2::2])))
+
+def _ultimo_intervalo_parabola(x, y):
+    """∫ de x₁ a x₂ de la parábola por (x₀, y₀), (x₁, y₁), (x₂, y₂)"""
+    h0 = x[1] - x[0]
+    h1 = x[2] - x[1]
+    return float(h1 * (y[2] * (2 * h1 + 3 * h0) / (6 * (h0 + h1)) + y[1] * (h1 + 3 * h0) / (6 * h0)
+                       - y[0] * h1**2 / (6 * h0 * (h0 + h1))))
+
+def integracion_tabulada(archivo, metodo='trapecio', tamano_bloque=4 * 1024 * 1024, max_vista_previa=2000,
+                         con_pasos=True, k_extremos=5):
+    """
+    Integra datos tabulados (x, y) leídos por bloques de un archivo CSV o de texto
+
+    El archivo no se carga completo: cada bloque se convierte en arreglos de
+    NumPy, se integra con la regla vectorizada y se descarta, conservando solo
+    los puntos de frontera necesarios para enlazar con el bloque siguiente. La
+    malla puede ser no uniforme pero x debe ser estrictamente creciente. Una
+    primera fila no numérica se toma como encabezado.
+
+    Args:
+        archivo: Archivo subido (UploadedFile) o abierto en modo binario
+        metodo: 'trapecio' o 'simpson13' (Simpson no uniforme; si el número de
+            intervalos es impar, el último se integra con la parábola de los tres
+            últimos puntos)
+        tamano_bloque: Bytes por bloque
+        max_vista_previa: Puntos máximos de la serie reducida para la gráfica
+
+    Returns:
+        Dict con resultado, pasos, metodo, puntos, bloques, a, b, vista_previa_x
+        y vista_previa_y
+    """
+    if metodo not in ('trapecio', 'simpson13'):
+        raise ValueError("Los datos tabulados admiten trapecio y simpson13")
+
+    total = SumaNeumaier()
+    sumas_bloques = []
+    # Puntos pendientes: el último (trapecio) o los del panel incompleto (Simpson)
+    x_pend = np.empty(0)
+    y_pend = np.empty(0)
+    anterior = None          # punto previo al pendiente, para cerrar Simpson con un intervalo impar
+    puntos = 0
+    primeros = []
+    x_inicial = None
+    # Vista previa por diezmado: se conserva un punto de cada `paso` y el paso se
+    # duplica cuando se llena, así la memoria no depende del tamaño del archivo
+    paso = 1
+    vista_x = []
+    vista_y = []
+
+    for numero, bloque in enumerate(_bloques_de_lineas(archivo, tamano_bloque)):
+        if numero == 0:
+            bloque = _quitar_encabezado(bloque)
+        if not bloque.strip():
+            continue
+        x, y = _parsear_bloque_tabulado(bloque)
+        if x.size == 0:
+            continue
+        if not (np.all(np.isfinite(x)) and np.all(np.isfinite(y))):
+            raise ValueError(f"Hay valores no numéricos o infinitos cerca de la fila {puntos + 1}")
+
+        x = np.concatenate([x_pend, x])
+        y = np.concatenate([y_pend, y])
+        if np.any(np.diff(x) <= 0):
+            fila = puntos - x_pend.size + int(np.argmax(np.diff(x) <= 0)) + 2
+            raise ValueError(f"Los valores de x deben ser estrictamente crecientes (fila {fila} de datos)")
+
+        nuevos = x.size - x_pend.size
+        indices = puntos + np.arange(nuevos)
+        seleccion = indices % paso == 0
+        vista_x.extend(x[x_pend.size:][seleccion].tolist())
+        vista_y.extend(y[x_pend.size:][seleccion].tolist())
+        while len(vista_x) > max_vista_previa:
+            vista_x, vista_y = vista_x[::2], vista_y[::2]
+            paso *= 2
+        if x_inicial is None:
+            x_inicial = float(x[0])
+            primeros = list(zip(x[:k_extremos].tolist(), y[:k_extremos].tolist()))
+        puntos += nuevos
+
+        if metodo == 'trapecio':
+            suma = _trapecio_no_uniforme(x, y)
+            x_pend, y_pend = x[-1:], y[-1:]
+        else:
+            completos = 2 * ((x.size - 1) // 2)
+            suma = _simpson_no_uniforme(x[:completos + 1], y[:completos + 1]) if completos else 0.0
+            if completos:
+                anterior = (float(x[completos - 1]), float(y[completos - 1]))
+            x_pend, y_pend = x[completos:], y[completos:]
+        total.agregar(suma)
+        sumas_bloques.append(suma)
+
+    if puntos < 2:
+        raise ValueError("Se necesitan al menos 2 puntos (x, y)")
+    if metodo == 'simpson13' and x_pend.size == 2:
+        # Número impar de intervalos: el último con la parábola de los tres últimos puntos
+        if anterior is None:
+            suma = _trapecio_no_uniforme(x_pend, y_pend)
+        else:
+            suma = _ultimo_intervalo_parabola(np.array([anterior[0], *x_pend]), np.array([anterior[1], *y_pend]))
+        total.agregar(suma)
+        sumas_bloques[-1] += suma
+
+    x_final, y_final = float(x_pend[-1]), float(y_pend[-1])
+    if not vista_x or vista_x[-1] != x_final:
+        vista_x.append(x_final)
+        vista_y.append(y_final)
+    resultado = total.valor
+
     pasos = []
-    
-    pasos.append(f"=== INTEGRACIÓN NUMÉRICA COMPUESTA - {metodo.upper()} ===")
-    pasos.append(f"Función: $$f(x) = {funcion_latex}$$")
-    pasos.append(f"Intervalo: $[{a}, {b}]$")
-    pasos.append(f"Número de subintervalos: $n = {n}$")
-    pasos.append(f"Ancho de subintervalo: $$h = \\frac{{b-a}}{{n}} = \\frac{{{b}-{a}}}{{{n}}} = {h:.6f}$$")
-    pasos.append("")
-    
-    if metodo == 'trapecio':
-        resultado = _trapecio_compuesto(f, a, b, n, h, pasos)
-    elif metodo == 'simpson13':
-        if n % 2 != 0:
-            raise ValueError("Para Simpson 1/3, n debe ser par")
-        resultado = _simpson13_compuesto(f, a, b, n, h, pasos)
-    elif metodo == 'simpson38':
-        if n % 3 != 0:
-            raise ValueError("Para Simpson 3/8, n debe ser múltiplo de 3")
-        resultado = _simpson38_compuesto(f, a, b, n, h, pasos)
-    else:
-        raise ValueError(f"Método no reconocido: {metodo}")
-    
+    if con_pasos:
+        nombre = 'Trapecio' if metodo == 'trapecio' else 'Simpson 1/3'
+        pasos.append(f"=== INTEGRACIÓN DE DATOS TABULADOS - {nombre.upper()} ===")
+        pasos.append(f"Puntos leídos: {puntos} en {len(sumas_bloques)} bloques")
+        pasos.append(f"Intervalo: $[{x_inicial}, {x_final}]$")
+        pasos.append("")
+        if metodo == 'trapecio':
+            pasos.append("$$\\int_a^b y\\,dx \\approx \\sum_{i} \\frac{x_{i+1} - x_i}{2}\\left(y_i + y_{i+1}\\right)$$")
+        else:
+            pasos.append("$$\\int_{x_0}^{x_2} y\\,dx \\approx \\frac{h_0 + h_1}{6}\\left[\\left(2 - \\frac{h_1}{h_0}\\right) y_0 + \\frac{(h_0 + h_1)^2}{h_0 h_1} y_1 + \\left(2 - \\frac{h_0}{h_1}\\right) y_2\\right]$$")
+        pasos.append("")
+        pasos.append(f"Primeros {len(primeros)} puntos:")
+        pasos.extend(f"({x_val:.6g}, {y_val:.6g})" for x_val, y_val in primeros)
+        pasos.append("")
+        pasos.append("Suma de cada bloque:")
+        pasos.extend(_lineas_acotadas((f"Bloque {j + 1}: {suma:.10f}" for j, suma in enumerate(sumas_bloques)),
+                                      len(sumas_bloques), 2 * k_extremos, 'bloques'))
+        pasos.append("")
+        pasos.append(f"$$\\mathrm{{Resultado}} = {resultado:.10f}$$")
+
     return {
         'resultado': resultado,
         'pasos': pasos,
         'metodo': metodo,
-        'funcion': funcion_str
+        'puntos': puntos,
+        'bloques': len(sumas_bloques),
+        'a': x_inicial,
+        'b': x_final,
+        'vista_previa_x': vista_x,
+        'vista_previa_y': vista_y
     }
 
-def _trapecio_compuesto(f, a, b, n, h, pasos):
-    """Regla del trapecio compuesta"""
-    pasos.append("Fórmula del trapecio compuesto:")
-    pasos.append("$$\\int_a^b f(x)dx \\approx \\frac{h}{2}\\left[f(x_0) + 2\\sum_{i=1}^{n-1}f(x_i) + f(x_n)\\right]$$")
-    pasos.append("")
-    
-    # Calcular puntos
-    x_vals = [a + i*h for i in range(n+1)]
-    f_vals = [f(x) for x in x_vals]
-    
-    pasos.append("Evaluación de la función en los puntos:")
-    for i, (x_val, f_val) in enumerate(zip(x_vals, f_vals)):
-        pasos.append(f"f(x_{i}) = f({x_val:.4f}) = {f_val:.6f}")
-    
-    pasos.append("")
-    pasos.append("Aplicando la fórmula:")
-    
-    suma = f_vals[0] + f_vals[-1]  # f(x₀) + f(xₙ)
-    suma_intermedia = sum(f_vals[1:-1])  # ∑f(xᵢ) para i=1 a n-1
-    
-    pasos.append(f"f(x₀) + f(xₙ) = {f_vals[0]:.6f} + {f_vals[-1]:.6f} = {suma:.6f}")
-    pasos.append(f"2∑f(xᵢ) = 2 × {suma_intermedia:.6f} = {2*suma_intermedia:.6f}")
-    
-    suma += 2 * suma_intermedia
-    resultado = (h/2) * suma
-    
-    pasos.append(f"Suma total = {suma:.6f}")
-    pasos.append(f"$$\\mathrm{{Resultado}} = \\frac{{h}}{{2}} \\times \\text{{suma}} = \\frac{{{h:.6f}}}{{2}} \\times {suma:.6f} = {resultado:.8f}$$")
+def _muestreo_adaptativo(interpolante, x_min, x_max, presupuesto, factor_piloto=8, fraccion_uniforme=0.25):
+    """
+    Elige `presupuesto` abscisas en [x_min, x_max], más densas donde la curvatura es alta
 
-    return resultado
+    Se evalúa el interpolante (y su derivada) en una malla piloto uniforme y se
+    equidistribuye la densidad ρ(x) ∝ √κ(x), mezclada con una fracción uniforme
+    para no dejar vacías las zonas planas.
+    """
+    x_piloto = np.linspace(x_min, x_max, factor_piloto * presupuesto)
+    _, dy = interpolante.evaluar(x_piloto, derivada=True)
+    d2y = np.gradient(dy, x_piloto)
+    curvatura = np.abs(d2y) / (1 + dy**2) ** 1.5
 
-def _simpson13_compuesto(f, a, b, n, h, pasos):
-    """Regla de Simpson 1/3 compuesta"""
-    pasos.append("Fórmula de Simpson 1/3 compuesta:")
-    pasos.append("$$\\int_a^b f(x)dx \\approx \\frac{h}{3}\\left[f(x_0) + 4\\sum_{i=1}^{n/2}f(x_{2i-1}) + 2\\sum_{i=1}^{n/2-1}f(x_{2i}) + f(x_n)\\right]$$")
-    pasos.append("")
-    
-    # Calcular puntos
-    x_vals = [a + i*h for i in range(n+1)]
-    f_vals = [f(x) for x in x_vals]
-    
-    pasos.append("Evaluación de la función en los puntos:")
-    for i, (x_val, f_val) in enumerate(zip(x_vals, f_vals)):
-        pasos.append(f"f(x_{i}) = f({x_val:.4f}) = {f_val:.6f}")
-    
-    pasos.append("")
-    pasos.append("Aplicando la fórmula:")
-    
-    # Términos impares (coeficiente 4)
-    suma_impares = sum(f_vals[i] for i in range(1, n, 2))
-    # Términos pares intermedios (coeficiente 2)
-    suma_pares = sum(f_vals[i] for i in range(2, n-1, 2))
-    
-    pasos.append(f"f(x₀) + f(xₙ) = {f_vals[0]:.6f} + {f_vals[-1]:.6f} = {f_vals[0] + f_vals[-1]:.6f}")
-    pasos.append(f"4∑f(x₂ᵢ₋₁) = 4 × {suma_impares:.6f} = {4*suma_impares:.6f}")
-    pasos.append(f"2∑f(x₂ᵢ) = 2 × {suma_pares:.6f} = {2*suma_pares:.6f}")
-    
-    suma_total = f_vals[0] + f_vals[-1] + 4*suma_impares + 2*suma_pares
-    resultado = (h/3) * suma_total
-    
-    pasos.append(f"Suma total = {suma_total:.6f}")
-    pasos.append(f"$$\\mathrm{{Resultado}} = \\frac{{h}}{{3}} \\times \\text{{suma}} = \\frac{{{h:.6f}}}{{3}} \\times {suma_total:.6f} = {resultado:.8f}$$")
-    
-    return resultado
+    densidad = np.sqrt(curvatura)
+    media = densidad.mean()
+    if not np.isfinite(media) or media == 0:
+        return np.linspace(x_min, x_max, presupuesto)
+    densidad = (1 - fraccion_uniforme) * densidad / media + fraccion_uniforme
 
-def _simpson38_compuesto(f, a, b, n, h, pasos):
-    """Regla de Simpson 3/8 compuesta"""
-    pasos.append("Fórmula de Simpson 3/8 compuesta:")
-    pasos.append("$$\\int_a^b f(x)dx \\approx \\frac{3h}{8}\\left[f(x_0) + 3\\sum_{i=1}^{n/3}f(x_{3i-2}) + 3\\sum_{i=1}^{n/3}f(x_{3i-1}) + 2\\sum_{i=1}^{n/3-1}f(x_{3i}) + f(x_n)\\right]$$")
-    pasos.append("")
-    
-    # Calcular puntos
-    x_vals = [a + i*h for i in range(n+1)]
-    f_vals = [f(x) for x in x_vals]
-    
-    pasos.append("Evaluación de la función en los puntos:")
-    for i, (x_val, f_val) in enumerate(zip(x_vals, f_vals)):
-        pasos.append(f"f(x_{i}) = f({x_val:.4f}) = {f_val:.6f}")
-    
-    pasos.append("")
-    pasos.append("Aplicando la fórmula:")
-    
-    # Coeficientes según posición
-    suma_3_tipo1 = sum(f_vals[i] for i in range(1, n, 3))  # x₁, x₄, x₇, ...
-    suma_3_tipo2 = sum(f_vals[i] for i in range(2, n, 3))  # x₂, x₅, x₈, ...
-    suma_2 = sum(f_vals[i] for i in range(3, n-2, 3))      # x₃, x₆, x₉, ...
-    
-    pasos.append(f"f(x₀) + f(xₙ) = {f_vals[0]:.6f} + {f_vals[-1]:.6f} = {f_vals[0] + f_vals[-1]:.6f}")
-    pasos.append(f"3∑f(x₃ᵢ₋₂) = 3 × {suma_3_tipo1:.6f} = {3*suma_3_tipo1:.6f}")
-    pasos.append(f"3∑f(x₃ᵢ₋₁) = 3 × {suma_3_tipo2:.6f} = {3*suma_3_tipo2:.6f}")
-    pasos.append(f"2∑f(x₃ᵢ) = 2 × {suma_2:.6f} = {2*suma_2:.6f}")
-    
-    suma_total = f_vals[0] + f_vals[-1] + 3*suma_3_tipo1 + 3*suma_3_tipo2 + 2*suma_2
-    resultado = (3*h/8) * suma_total
-    
-    pasos.append(f"Suma total = {suma_total:.6f}")
-    pasos.append(f"$$\\mathrm{{Resultado}} = \\frac{{3h}}{{8}} \\times \\text{{suma}} = \\frac{{3\\times{h:.6f}}}{{8}} \\times {suma_total:.6f} = {resultado:.8f}$$")
-    
-    return resultado
+    # Invertir la densidad acumulada para repartir los puntos
+    acumulada = np.concatenate(([0.0], np.cumsum((densidad[1:] + densidad[:-1]) / 2 * np.diff(x_piloto))))
+    objetivos = np.linspace(0, acumulada[-1], presupuesto)
+    return np.interp(objetivos, acumulada, x_piloto)
 
-def generar_datos_grafica_hermite(puntos, polinomio_str, x_eval):
+def _redondear_lista(valores, cifras=7):
+    """Convierte un arreglo a lista con `cifras` significativas para aligerar el JSON"""
+    return [float(f"{v:.{cifras}g}") for v in valores]
+
+# Puntos de la curva de Hermite: el mínimo, cuántos por tramo y el tope del JSON
+PRESUPUESTO_GRAFICA_HERMITE = 120
+PUNTOS_POR_TRAMO_GRAFICA = 8
+MAX_PRESUPUESTO_GRAFICA = 4000
+
+def generar_datos_grafica_hermite(puntos, interpolante, x_eval, presupuesto=None):
     """
     Genera datos para la gráfica de interpolación de Hermite
+
+    Args:
+        puntos: Lista de tuplas (x_i, f(x_i), f'(x_i))
+        interpolante: InterpolanteHermite o HermiteCubicoPorTramos ya construido
+        x_eval: Punto de evaluación
+        presupuesto: Número de puntos de la curva (muestreo adaptativo); por
+            defecto crece con el número de tramos hasta MAX_PRESUPUESTO_GRAFICA
     """
     import numpy as np
-    from sympy import symbols, sympify, lambdify
     
     try:
         # Extraer coordenadas de los puntos
@@ -397,26 +2632,25 @@ def generar_datos_grafica_hermite(puntos, polinomio_str, x_eval):
         x_min = min(x_vals) - 1
         x_max = max(x_vals) + 1
         
-        # Crear puntos para evaluar el polinomio (curva suave)
-        x_curve = np.linspace(x_min, x_max, 200)
-        
-        # Convertir polinomio a función evaluable
-        x = symbols('x')
-        polinomio_sym = sympify(polinomio_str)
-        f_poly = lambdify(x, polinomio_sym, 'numpy')
+        # Puntos de la curva: más densos donde la curvatura es alta
+        if presupuesto is None:
+            num_tramos = getattr(interpolante, 'num_tramos', 1)
+            presupuesto = min(max(PRESUPUESTO_GRAFICA_HERMITE, PUNTOS_POR_TRAMO_GRAFICA * num_tramos),
+                              MAX_PRESUPUESTO_GRAFICA)
+        x_curve = _muestreo_adaptativo(interpolante, x_min, x_max, presupuesto)
         
-        # Evaluar polinomio
-        y_curve = f_poly(x_curve)
+        # Evaluar el interpolante numérico (sin volver a parsear el polinomio)
+        y_curve = interpolante.evaluar(x_curve)
         
         # Punto de evaluación
-        y_eval = f_poly(x_eval)
+        y_eval = interpolante.evaluar(x_eval)
         
         return {
             'puntos_x': x_vals,
             'puntos_y': f_vals,
             'derivadas': df_vals,
-            'curva_x': x_curve.tolist(),
-            'curva_y': y_curve.tolist(),
+            'curva_x': _redondear_lista(x_curve),
+            'curva_y': _redondear_lista(y_curve),
             'eval_x': x_eval,
             'eval_y': float(y_eval),
             'x_min': float(x_min),
@@ -427,35 +2661,50 @@ def generar_datos_grafica_hermite(puntos, polinomio_str, x_eval):
     except Exception as e:
         return None
 
-def generar_datos_grafica_integracion(funcion_str, a, b, n, metodo, resultado):
+def generar_datos_grafica_integracion(funcion_str, a, b, n, metodo, resultado, contexto=None, malla=None,
+                                      orden_gauss=None, max_nodos_gauss=2000, max_intervalos=2000,
+                                      integral_acumulada=None):
     """
     Genera datos para la gráfica de integración numérica
+
+    Con el contexto de integracion_compuesta se reutilizan la función compilada
+    y los valores en los nodos ya calculados. `malla` son los extremos de los
+    subintervalos finales del método adaptativo; con `orden_gauss` se marcan
+    los nodos de Gauss–Legendre (a lo sumo max_nodos_gauss). Con más de
+    max_intervalos subintervalos solo se grafica una muestra de los nodos.
+    Con integral_acumulada se agrega la curva F(x) = ∫ₐˣ f.
     """
-    import numpy as np
-    from sympy import symbols, sympify, lambdify
-    
     try:
-        # Limpiar y parsear función
-        funcion_str = limpiar_funcion_mathlive(funcion_str)
-        x = symbols('x')
-        funcion_sym = sympify(funcion_str)
-        f = lambdify(x, funcion_sym, 'numpy')
+        if contexto is None:
+            contexto = ContextoEvaluacion(funcion_str)
         
         # Puntos para la curva suave de la función
         x_curve = np.linspace(a - 0.5, b + 0.5, 300)
-        y_curve = f(x_curve)
+        y_curve = contexto.evaluar(x_curve)
         
         # Puntos para el área de integración
         x_area = np.linspace(a, b, 100)
-        y_area = f(x_area)
+        y_area = contexto.evaluar(x_area)
         
         # Puntos de los subintervalos según el método
-        h = (b - a) / n
-        x_intervals = [a + i * h for i in range(n + 1)]
-        y_intervals = [f(x) for x in x_intervals]
+        if malla is not None:
+            x_nodos = np.asarray(malla, dtype=float)
+            y_nodos = contexto.evaluar(x_nodos)
+            n = len(malla) - 1
+            h = float(np.diff(x_nodos).min())
+        elif n > max_intervalos:
+            # Malla grande: se muestrean los nodos sin materializar la malla completa
+            h = (b - a) / n
+            x_nodos = a + np.unique(np.linspace(0, n, max_intervalos + 1).round()) * h
+            y_nodos = contexto.evaluar(x_nodos)
+        else:
+            h = (b - a) / n
+            x_nodos, y_nodos = contexto.nodos(a, h, n)
+        x_intervals = x_nodos.tolist()
+        y_intervals = y_nodos.tolist()
         
         # Datos específicos del método
-        if metodo == 'trapecio':
+        if metodo == 'trapecio' and n <= max_intervalos:
             # Líneas de los trapecios
             trap_x = []
             trap_y = []
@@ -465,6 +2714,16 @@ def generar_datos_grafica_integracion(funcion_str, a, b, n, metodo, resultado):
         else:
             trap_x = []
             trap_y = []
+
+        acumulada_x, acumulada_y = integral_acumulada.muestra() if integral_acumulada is not None else ([], [])
+
+        gauss_x = []
+        gauss_y = []
+        if metodo == 'gauss_legendre' and orden_gauss:
+            x_gauss, y_gauss = contexto.nodos_gauss(a, b, n, orden_gauss)
+            paso = max(1, -(-x_gauss.size // max_nodos_gauss))
+            gauss_x = x_gauss.ravel()[::paso].tolist()
+            gauss_y = y_gauss.ravel()[::paso].tolist()
         
         return {
             'curva_x': x_curve.tolist(),
@@ -475,6 +2734,10 @@ def generar_datos_grafica_integracion(funcion_str, a, b, n, metodo, resultado):
             'intervalos_y': y_intervals,
             'trapecio_x': trap_x,
             'trapecio_y': trap_y,
+            'nodos_gauss_x': gauss_x,
+            'nodos_gauss_y': gauss_y,
+            'acumulada_x': acumulada_x,
+            'acumulada_y': acumulada_y,
             'a': a,
             'b': b,
             'resultado': resultado,
@@ -485,6 +2748,81 @@ def generar_datos_grafica_integracion(funcion_str, a, b, n, metodo, resultado):
     except Exception as e:
         return None
 
+def generar_datos_grafica_tabulada(resultado):
+    """
+    Datos de la gráfica de integración para datos tabulados
+
+    Usa la serie reducida de integracion_tabulada, con las mismas claves que
+    generar_datos_grafica_integracion.
+    """
+    try:
+        intervalos = resultado['puntos'] - 1
+        return {
+            'curva_x': resultado['vista_previa_x'],
+            'curva_y': resultado['vista_previa_y'],
+            'area_x': resultado['vista_previa_x'],
+            'area_y': resultado['vista_previa_y'],
+            'intervalos_x': [],
+            'intervalos_y': [],
+            'trapecio_x': [],
+            'trapecio_y': [],
+            'a': resultado['a'],
+            'b': resultado['b'],
+            'resultado': resultado['resultado'],
+            'metodo': 'tabulado',
+            'regla': resultado['metodo'],
+            'n': intervalos,
+            'h': (resultado['b'] - resultado['a']) / intervalos
+        }
+    except Exception as e:
+        return None
+
+def generar_datos_grafica_doble(resultado, a, b, c, d, nx, ny):
+    """Datos de la superficie z = f(x, y) para la gráfica de la integral doble"""
+    try:
+        return {
+            'tipo': 'superficie',
+            'x': resultado['muestra']['x'],
+            'y': resultado['muestra']['y'],
+            'z': resultado['muestra']['z'],
+            'a': a,
+            'b': b,
+            'c': c,
+            'd': d,
+            'nx': nx,
+            'ny': ny,
+            'resultado': resultado['resultado'],
+            'metodo': resultado['metodo'],
+            'evaluaciones': resultado['evaluaciones'],
+            'tiempo': resultado['tiempo']
+        }
+    except Exception as e:
+        return None
+
+def resolver_integracion(funcion_str, a, b, n, metodo, referencia=None, **opciones):
+    """
+    Integración compuesta y datos de su gráfica en una sola llamada
+
+    Es el trabajo que la vista manda al sandbox: el valor de referencia se
+    parsea aquí y la función compilada no sale del proceso; solo vuelven
+    datos serializables.
+
+    Args:
+        referencia: Texto del valor exacto (p. ej. '\\pi') o None
+        **opciones: Se pasan a integracion_compuesta
+
+    Returns:
+        Tupla (resultado, datos_grafica)
+    """
+    opciones['valor_referencia'] = evaluar_constante(referencia) if referencia else None
+    contexto = ContextoEvaluacion(funcion_str)
+    resultado = integracion_compuesta(funcion_str, a, b, n, metodo, contexto=contexto, **opciones)
+    datos_grafica = generar_datos_grafica_integracion(funcion_str, a, b, n, metodo, resultado['resultado'],
+                                                      contexto=contexto, malla=resultado.get('malla'),
+                                                      orden_gauss=resultado.get('orden_gauss'),
+                                                      integral_acumulada=resultado.get('integral_acumulada'))
+    return resultado, datos_grafica
+
 def generar_datos_grafica_simplex(funcion_objetivo, restricciones, solucion, nombres_variables, tipo_optimizacion):
     """
     Genera datos para la gráfica del método Simplex (solo para 2 variables)
@@ -1,11 +1,13 @@
 from django.shortcuts import redirect, render
+from django.conf import settings
 from django.contrib import messages
 from django.contrib.auth import authenticate, login, logout
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth.forms import AuthenticationForm
 from .forms import FormCrearUsuario
 from .models import Ejercicio
-from .utils import interpolacion_hermite, integracion_compuesta, metodo_simplex
+from .utils import interpolacion_hermite, interpolacion_hermite_por_tramos, interpolante_hermite_incremental, hermite_desde_funcion, resolver_integracion, integracion_tabulada, generar_datos_grafica_tabulada, integracion_doble, generar_datos_grafica_doble, metodo_simplex
+from .sandbox import LimiteExcedido, ejecutar_aislado
 import json
 from django.utils import timezone
 
@@ -25,35 +27,65 @@ def hermite_view(request, id_ejercicio=None):
             # Obtener datos del formulario
             puntos_data = request.POST.get('puntos', '')
             x_eval = float(request.POST.get('x_eval', 0))
+            modo = request.POST.get('modo', 'global')
 
-            # Parsear puntos (formato: x1,f1,df1;x2,f2,df2;...)
-            puntos = []
-            if puntos_data.strip():
-                for punto_str in puntos_data.strip().split(';'):
-                    if punto_str.strip():
-                        try:
-                            x, f, df = map(float, punto_str.split(','))
-                            puntos.append((x, f, df))
-                        except ValueError:
-                            messages.error(request, f'Formato inválido en punto: {punto_str}')
-                            return render(request, 'metodos_numericos/hermite.html', context)
-
-            if len(puntos) < 2:
-                messages.error(request, 'Se necesitan al menos 2 puntos para la interpolación.')
-                return render(request, 'metodos_numericos/hermite.html', context)
-
-            # Validar que no hay x duplicados
-            x_values = [p[0] for p in puntos]
-            if len(set(x_values)) != len(x_values):
-                messages.error(request, 'Los valores de x deben ser únicos.')
-                return render(request, 'metodos_numericos/hermite.html', context)
+            if modo == 'funcion':
+                # Los puntos se generan muestreando la función en los nodos elegidos
+                funcion = request.POST.get('funcion', '')
+                a = float(request.POST.get('a', -1))
+                b = float(request.POST.get('b', 1))
+                n_nodos = int(request.POST.get('n_nodos', 5))
+                estrategia = request.POST.get('estrategia', 'equiespaciado')
+                context.update({'funcion_input': funcion, 'a': a, 'b': b, 'n_nodos': n_nodos, 'estrategia': estrategia})
+
+                # La función del usuario se evalúa en el sandbox
+                resultado = ejecutar_aislado(hermite_desde_funcion, funcion, a, b, n_nodos, x_eval, estrategia=estrategia,
+                                             con_pasos=request.user.is_authenticated)
+                puntos = resultado['puntos']
+                puntos_data = ";".join(f"{x},{f},{df}" for x, f, df in puntos)
+            else:
+                # Parsear puntos (formato: x1,f1,df1;x2,f2,df2;...)
+                puntos = []
+                if puntos_data.strip():
+                    for punto_str in puntos_data.strip().split(';'):
+                        if punto_str.strip():
+                            try:
+                                x, f, df = map(float, punto_str.split(','))
+                                puntos.append((x, f, df))
+                            except ValueError:
+                                messages.error(request, f'Formato inválido en punto: {punto_str}')
+                                return render(request, 'metodos_numericos/hermite.html', context)
+
+                if len(puntos) < 2:
+                    messages.error(request, 'Se necesitan al menos 2 puntos para la interpolación.')
+                    return render(request, 'metodos_numericos/hermite.html', context)
+
+                # Validar que no hay x duplicados
+                x_values = [p[0] for p in puntos]
+                if len(set(x_values)) != len(x_values):
+                    messages.error(request, 'Los valores de x deben ser únicos.')
+                    return render(request, 'metodos_numericos/hermite.html', context)
             
-            # Calcular interpolación de Hermite
-            resultado = interpolacion_hermite(puntos, x_eval)
+                if modo == 'tramos':
+                    # Hermite cúbico por tramos para conjuntos grandes de puntos
+                    resultado = interpolacion_hermite_por_tramos(puntos, x_eval, con_pasos=request.user.is_authenticated)
+                else:
+                    # Para un ejercicio guardado se reutiliza el interpolante de la sesión
+                    # y solo se agregan los puntos nuevos
+                    interpolante = None
+                    clave_sesion = f'hermite_interpolante_{id_ejercicio}' if id_ejercicio else None
+                    if clave_sesion:
+                        interpolante = interpolante_hermite_incremental(puntos, request.session.get(clave_sesion),
+                                                                        tabla=request.user.is_authenticated)
+
+                    # Calcular interpolación de Hermite (los pasos solo se muestran a usuarios autenticados)
+                    resultado = interpolacion_hermite(puntos, x_eval, con_pasos=request.user.is_authenticated, interpolante=interpolante)
+                    if clave_sesion:
+                        request.session[clave_sesion] = resultado['interpolante'].a_dict()
             
             # Generar datos para gráfica
             from .utils import generar_datos_grafica_hermite
-            datos_grafica = generar_datos_grafica_hermite(puntos, resultado['polinomio'], x_eval)
+            datos_grafica = generar_datos_grafica_hermite(puntos, resultado['interpolante'], x_eval)
             if datos_grafica:
                 context['datos_grafica'] = json.dumps(datos_grafica)
 
@@ -62,10 +94,13 @@ def hermite_view(request, id_ejercicio=None):
             context.update(resultado)
             context['puntos_input'] = puntos_data
             context['x_eval'] = x_eval
+            context['modo'] = modo
             if(request.user.is_authenticated):
                 guardar_ejercicio(request.user.id, 'hermite', "|".join([puntos_data, str(x_eval)]), resultado['polinomio_latex'])
         except ValueError as e:
             messages.error(request, f'Error en los datos de entrada: {str(e)}')
+        except LimiteExcedido as e:
+            messages.error(request, str(e))
         except Exception as e:
             messages.error(request, f'Error en el cálculo: {str(e)}')
 
@@ -112,6 +147,30 @@ def integracion_view(request, id_ejercicio=None):
             b = float(request.POST.get('b', 1))
             n = int(request.POST.get('n', 4))
             metodo = request.POST.get('metodo', 'trapecio')
+
+            # Datos tabulados: el archivo se integra por bloques, sin función
+            archivo = request.FILES.get('archivo')
+            if archivo:
+                resultado = integracion_tabulada(archivo, metodo, con_pasos=request.user.is_authenticated)
+                datos_grafica = generar_datos_grafica_tabulada(resultado)
+                if datos_grafica:
+                    context['datos_grafica'] = json.dumps(datos_grafica)
+                context.update(resultado)
+                context.update({
+                    'funcion_latex': 'y',
+                    'n': resultado['puntos'] - 1,
+                    'h': (resultado['b'] - resultado['a']) / (resultado['puntos'] - 1),
+                    'tabulado': True,
+                    'archivo_nombre': archivo.name
+                })
+                return render(request, 'metodos_numericos/integracion.html', context)
+
+            tolerancia = float(request.POST.get('tolerancia') or 1e-8)
+            orden_gauss = int(request.POST.get('orden_gauss') or 5)
+            referencia_input = request.POST.get('valor_referencia', '').strip()
+            acumulada = request.POST.get('acumulada') == 'on'
+            consulta_input = request.POST.get('x_consulta', '').strip()
+            x_consulta = [float(v) for v in consulta_input.replace(';', ',').split(',') if v.strip()]
             
             if n <= 0:
                 messages.error(request, 'El número de subintervalos debe ser positivo.')
@@ -121,12 +180,40 @@ def integracion_view(request, id_ejercicio=None):
                 messages.error(request, 'El límite inferior debe ser menor que el superior.')
                 return render(request, 'metodos_numericos/integracion.html', context)
             
-            # Calcular integración
-            resultado = integracion_compuesta(funcion, a, b, n, metodo)
+            # Integral doble sobre [a, b] × [c, d]
+            if request.POST.get('doble') == 'on':
+                c_lim = float(request.POST.get('c', 0))
+                d_lim = float(request.POST.get('d', 1))
+                m = int(request.POST.get('m') or n)
+                resultado = ejecutar_aislado(integracion_doble, funcion, a, b, c_lim, d_lim, n, m, metodo,
+                                             con_pasos=request.user.is_authenticated)
+                datos_grafica = generar_datos_grafica_doble(resultado, a, b, c_lim, d_lim, n, m)
+                if datos_grafica:
+                    context['datos_grafica'] = json.dumps(datos_grafica)
+                resultado.pop('muestra')
+                context.update(resultado)
+                context.update({
+                    'funcion_input': funcion,
+                    'a': a,
+                    'b': b,
+                    'c': c_lim,
+                    'd': d_lim,
+                    'n': n,
+                    'm': m,
+                    'h': (b - a) / n,
+                    'doble': True,
+                    'tiempo_ms': resultado['tiempo'] * 1000
+                })
+                return render(request, 'metodos_numericos/integracion.html', context)
 
-            # Generar datos para gráfica
-            from .utils import generar_datos_grafica_integracion
-            datos_grafica = generar_datos_grafica_integracion(funcion, a, b, n, metodo, resultado['resultado'])
+            # Calcular integración y gráfica en el sandbox (la gráfica reutiliza la función compilada y los nodos)
+            resultado, datos_grafica = ejecutar_aislado(resolver_integracion, funcion, a, b, n, metodo,
+                                                        referencia=referencia_input,
+                                                        con_pasos=request.user.is_authenticated,
+                                                        tolerancia_abs=tolerancia, tolerancia_rel=tolerancia,
+                                                        orden_gauss=orden_gauss,
+                                                        procesos=getattr(settings, 'INTEGRACION_PROCESOS', 0),
+                                                        acumulada=acumulada, x_consulta=x_consulta)
             if datos_grafica:
                 context['datos_grafica'] = json.dumps(datos_grafica)
 
@@ -138,12 +225,19 @@ def integracion_view(request, id_ejercicio=None):
                 'b': b,
                 'n': n,
                 'metodo': metodo,
-                'h': h  
+                'h': h,
+                'tolerancia': tolerancia,
+                'orden_gauss': orden_gauss,
+                'referencia_input': referencia_input,
+                'acumulada': acumulada,
+                'consulta_input': consulta_input
             })
             if(request.user.is_authenticated):
                 guardar_integracion(request.user.id, 'integracion', f"{funcion}!{a},{b},{n}!{metodo}", resultado['resultado'])
         except ValueError as e:
             messages.error(request, f'Error en los datos de entrada: {str(e)}')
+        except LimiteExcedido as e:
+            messages.error(request, str(e))
         except Exception as e:
             messages.error(request, f'Error en el cálculo: {str(e)}')
         return render(request, 'metodos_numericos/integracion.html', context)
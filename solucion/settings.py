@@ -173,3 +173,14 @@ EMAIL_USE_TLS = True
 EMAIL_HOST_USER = os.getenv('GMAIL_USER')
 EMAIL_HOST_PASSWORD = os.getenv('GMAIL_PASSWORD')
 
+
+# Procesos para repartir la integración por bloques (0: en el mismo proceso)
+INTEGRACION_PROCESOS = int(os.getenv('INTEGRACION_PROCESOS', '0'))
+
+# Sandbox de cálculo: procesos trabajadores con límites por trabajo (0 trabajadores: sin sandbox)
+SANDBOX_TRABAJADORES = int(os.getenv('SANDBOX_TRABAJADORES', '2'))
+SANDBOX_LIMITE_CPU = int(os.getenv('SANDBOX_LIMITE_CPU', '10'))
+# Segundos de CPU por encima del límite hasta que el sistema mata al trabajador
+SANDBOX_MARGEN_CPU = int(os.getenv('SANDBOX_MARGEN_CPU', '5'))
+SANDBOX_LIMITE_TIEMPO = int(os.getenv('SANDBOX_LIMITE_TIEMPO', '15'))
+SANDBOX_LIMITE_MEMORIA_MB = int(os.getenv('SANDBOX_LIMITE_MEMORIA_MB', '1024'))